@@ -0,0 +1,149 @@
+import numpy as np
+
+# 캠 프로파일 / 밸브 리프트 모델
+# 크랭크각별 흡·배기 리프트 곡선에서 흡기 유동 손실, 늦은 흡기 닫힘에 의한 역류, 오버랩 역류를 구해
+# RPM별 체적효율 곡선을 만듦. 크랭크각에 대한 계산은 캠 정의마다 한 번만 하고 캐시에 둠
+#   duration: 작동각 (크랭크 °), lift: 최대 리프트 (mm)
+#   lsa: 로브 분리각, icl: 흡기 중심각 (상사점 후 크랭크 °), 배기 중심각 = 2 × lsa - icl (상사점 전)
+CAM_PROFILES = {
+    "stock": {"duration": 236.0, "lift": 9.0, "lsa": 114.0, "icl": 110.0},
+    "street": {"duration": 252.0, "lift": 10.0, "lsa": 112.0, "icl": 108.0},
+    "sport": {"duration": 268.0, "lift": 11.0, "lsa": 110.0, "icl": 106.0},
+    "race": {"duration": 292.0, "lift": 12.5, "lsa": 106.0, "icl": 104.0},
+}
+# VVL 고회전 로브 (vvl_profile), 전환 RPM 이후 저회전 로브(cam_profile) 대신 사용
+VVL_LOBES = {
+    "mild": {"duration": 264.0, "lift": 11.0, "lsa": 112.0, "icl": 108.0},
+    "aggressive": {"duration": 288.0, "lift": 12.5, "lsa": 108.0, "icl": 106.0},
+}
+
+ANGLES = np.arange(-360.0, 360.0, 1.0)       # 크랭크각, 0 = 흡기 상사점 (오버랩 중심)
+SUCTION = (ANGLES > 0) & (ANGLES < 180)      # 흡기 행정
+SPEED_AXIS = np.linspace(0.0, 0.12, 97)      # 평균 피스톤 속도 / 음속
+BORE_AXIS = np.linspace(40.0, 140.0, 41)     # mm
+
+SOUND_SPEED = 343.0     # m/s
+VALVES = 2              # 실린더당 흡기 밸브 수
+VALVE_RATIO = 0.36      # 흡기 밸브 직경 / 보어
+DISCHARGE = 0.6         # 밸브 커튼 유량 계수
+FLOW_LOSS = 0.6         # 흡기 마하수 제곱 평균 → 충전 손실
+RAM_TIME = 0.0015       # s, 하사점 이후 흡기 관성이 실린더를 계속 채우는 시간
+OVERLAP_LOSS = 0.12     # 오버랩 면적 100 mm·° 당 저회전 역류 손실
+OVERLAP_RPM = 2000.0    # 이 RPM 이상에서는 오버랩 역류가 빠르게 줄어듦
+
+_cache = {}
+
+
+# 크랭크각별 리프트 (코사인 형태), lift/duration/center는 angles와 브로드캐스트
+def lobe_lift(angles, lift, duration, center):
+    u = (angles - center) / (duration / 2)
+    return np.where(np.abs(u) < 1, lift * (1 + np.cos(np.pi * u)) / 2, 0.0)
+
+
+# (흡기, 배기) 리프트 곡선
+def lift_curves(cam, angles=ANGLES):
+    intake = lobe_lift(angles, cam["lift"], cam["duration"], cam["icl"])
+    exhaust = lobe_lift(angles, cam["lift"], cam["duration"], -(2 * cam["lsa"] - cam["icl"]))
+    return intake, exhaust
+
+
+# 작동각 기준 밸브 타이밍 (°)
+def cam_timing(cam):
+    half = cam["duration"] / 2
+    ecl = 2 * cam["lsa"] - cam["icl"]
+    return {
+        "ivo": half - cam["icl"],          # 상사점 전
+        "ivc": cam["icl"] + half - 180,    # 하사점 후
+        "evo": ecl + half - 180,           # 하사점 전
+        "evc": half - ecl,                 # 상사점 후
+        "overlap": cam["duration"] - 2 * cam["lsa"],
+    }
+
+
+def _cam_key(cam):
+    return tuple(sorted((key, float(val)) for key, val in cam.items()))
+
+
+# 캠 하나에 대한 크랭크각 계산 (캐시)
+# restriction: (피스톤 속도, 보어) 격자에서 흡기 행정 동안의 마하수 제곱 평균 (피스톤 속도 가중)
+def cam_data(cam):
+    key = _cam_key(cam)
+    if key in _cache:
+        return _cache[key]
+
+    intake, exhaust = lift_curves(cam)
+    theta = np.radians(ANGLES[SUCTION])
+    weight = np.sin(theta)
+    # (피스톤 속도, 보어, 크랭크각): 밸브 커튼 면적은 포트 면적(리프트 = 밸브 직경 / 4)에서 포화
+    bore = BORE_AXIS[None, :, None]
+    lift = np.minimum(intake[SUCTION][None, None, :], VALVE_RATIO * bore / 4)
+    area_ratio = bore / (4 * VALVES * VALVE_RATIO * DISCHARGE * np.maximum(lift, 1e-3))
+    mach = SPEED_AXIS[:, None, None] * (np.pi / 2) * weight * area_ratio
+    restriction = np.sum(np.minimum(mach, 1.0) ** 2 * weight, axis=-1) / np.sum(weight)
+
+    data = {
+        "restriction": restriction,
+        "ivc": cam_timing(cam)["ivc"],
+        "overlap_area": np.sum(np.minimum(intake, exhaust)) * (ANGLES[1] - ANGLES[0]),
+    }
+    _cache[key] = data
+    return data
+
+
+# 캠 정의 목록 → 쌓은 표 (캠 번호로 조회)
+def cam_tables(cams):
+    data = [cam_data(cam) for cam in cams]
+    return {
+        "restriction": np.stack([d["restriction"] for d in data]),
+        "ivc": np.array([d["ivc"] for d in data]),
+        "overlap_area": np.array([d["overlap_area"] for d in data]),
+    }
+
+
+# 이름 배열 → (캠 정의 목록, 행별 캠 번호), 모르는 이름은 default
+def resolve_cams(names, profiles, default):
+    names = np.asarray(names)
+    keys, inverse = np.unique(names, return_inverse=True)
+    cams = [profiles.get(key, profiles[default]) for key in keys]
+    return cams, inverse.reshape(names.shape)
+
+
+# RPM별 체적효율 (N, P)
+# cams: 캠 정의 목록, kind: (N,) 행별 캠 번호, bore / stroke: (N,) mm, rpm: (N, P)
+def volumetric_efficiency(cams, kind, bore, stroke, rpm):
+    tables = cam_tables(cams)
+    kind = np.asarray(kind)
+
+    # 보어는 행마다 하나이므로 보어 방향을 먼저 보간해 행별 (피스톤 속도,) 표를 만든 뒤 RPM 방향 보간
+    pos = np.clip((np.asarray(bore, dtype=float) - BORE_AXIS[0]) / (BORE_AXIS[1] - BORE_AXIS[0]), 0, len(BORE_AXIS) - 1)
+    j = np.minimum(pos.astype(np.int64), len(BORE_AXIS) - 2)
+    fb = (pos - j)[:, None]
+    restriction = tables["restriction"]
+    row_table = restriction[kind, :, j] * (1 - fb) + restriction[kind, :, j + 1] * fb
+
+    piston_speed = 2 * np.asarray(stroke, dtype=float)[:, None] / 1000 * rpm / 60
+    pos = np.clip(piston_speed / SOUND_SPEED / (SPEED_AXIS[1] - SPEED_AXIS[0]), 0, len(SPEED_AXIS) - 1)
+    i = np.minimum(pos.astype(np.int64), len(SPEED_AXIS) - 2)
+    left = np.take_along_axis(row_table, i, axis=1)
+    right = np.take_along_axis(row_table, i + 1, axis=1)
+    flow = 1 - FLOW_LOSS * (left + (right - left) * (pos - i))
+    kind = kind[:, None]
+
+    # 늦게 닫히는 흡기 밸브: 흡기 관성이 채우지 못한 구간만큼 피스톤이 혼합기를 되밀어냄
+    late = np.clip(tables["ivc"][kind] - 6 * rpm * RAM_TIME, 0.0, 180.0)
+    backflow = (1 - np.cos(np.radians(late))) / 2
+
+    overlap = OVERLAP_LOSS * tables["overlap_area"][kind] / 100 / (1 + (rpm / OVERLAP_RPM) ** 2)
+    return flow * (1 - backflow) * (1 - overlap)
+
+
+# 리프트 곡선 그래프 (흡기 실선, 배기 점선)
+def plot_lift(ax, cam, label, color):
+    intake, exhaust = lift_curves(cam)
+    timing = cam_timing(cam)
+    ax.plot(ANGLES, intake, color=color, label=f"{label} intake (IVC {timing['ivc']:.0f}° ABDC)")
+    ax.plot(ANGLES, exhaust, color=color, linestyle="--", label=f"{label} exhaust (overlap {timing['overlap']:.0f}°)")
+    ax.set_xlabel("Crank angle (° ATDC)")
+    ax.set_ylabel("Lift (mm)")
+    ax.set_xlim(-360, 360)
+    ax.grid(True)
@@ -0,0 +1,87 @@
+import numpy as np
+
+# 과급기 컴프레서 맵 (압력비 × 정규화 유량 → 단열 효율)
+# 맵은 모듈을 불러올 때 한 번만 표로 만들어 두고, 계산 시에는 쌍선형 보간만 함
+PR_AXIS = np.linspace(1.0, 4.0, 61)
+FLOW_AXIS = np.linspace(0.0, 1.2, 49)   # 레드라인 / 목표 부스트에서의 공기 유량 = 1.0
+REFERENCE_EFFICIENCY = 0.72             # 이 효율에서 기존 고정 계수(boost_multiplier)와 같은 출력
+INLET_TEMP = 298.0                      # K
+
+# forced_type별 맵 모양과 부스트 형성 방식
+#   peak: 최고 효율, center: 최고 효율 지점 (압력비, 유량), width: 효율 섬 크기
+#   drive: "exhaust" (터보, spool 구간에서 부스트 형성), "positive" (용적형), "centrifugal" (rpm^2 비례)
+#   spool: 레드라인 대비 (부스트 시작, 최대 부스트 도달) 비율
+COMPRESSORS = {
+    "single": {"peak": 0.76, "center": (2.2, 0.65), "width": (1.6, 0.55), "drive": "exhaust", "spool": (0.25, 0.50)},
+    "twin-scroll": {"peak": 0.77, "center": (2.1, 0.60), "width": (1.6, 0.55), "drive": "exhaust", "spool": (0.20, 0.42)},
+    "variable-geometry": {"peak": 0.75, "center": (2.0, 0.55), "width": (1.8, 0.65), "drive": "exhaust", "spool": (0.15, 0.35)},
+    "roots": {"peak": 0.58, "center": (1.5, 0.50), "width": (1.2, 0.90), "drive": "positive", "spool": (0.0, 0.10)},
+    "twin-screw": {"peak": 0.70, "center": (1.8, 0.55), "width": (1.6, 0.85), "drive": "positive", "spool": (0.0, 0.10)},
+    "centrifugal": {"peak": 0.78, "center": (2.0, 0.80), "width": (1.6, 0.50), "drive": "centrifugal", "spool": (0.0, 1.0)},
+}
+TYPE_NAMES = list(COMPRESSORS)
+MIN_EFFICIENCY = 0.35
+
+
+def _build_table(params):
+    pr, flow = np.meshgrid(PR_AXIS, FLOW_AXIS, indexing="ij")
+    pr_c, flow_c = params["center"]
+    pr_w, flow_w = params["width"]
+    distance = ((pr - pr_c) / pr_w) ** 2 + ((flow - flow_c) / flow_w) ** 2
+    return np.clip(params["peak"] * (1 - 0.5 * distance), MIN_EFFICIENCY, None)
+
+
+# (종류, 압력비, 유량) 효율 표와 종류별 부스트 형성 계수
+EFFICIENCY_TABLES = np.stack([_build_table(COMPRESSORS[name]) for name in TYPE_NAMES])
+CENTRIFUGAL = np.array([COMPRESSORS[name]["drive"] == "centrifugal" for name in TYPE_NAMES])
+SPOOL_START = np.array([COMPRESSORS[name]["spool"][0] for name in TYPE_NAMES])
+SPOOL_FULL = np.array([COMPRESSORS[name]["spool"][1] for name in TYPE_NAMES])
+
+
+# 균등 격자 표의 쌍선형 보간 (tables: (종류, A, B), kind: 행별 종류 번호)
+def bilinear(tables, kind, x, x_axis, y, y_axis):
+    def locate(v, axis):
+        pos = np.clip((v - axis[0]) / (axis[1] - axis[0]), 0, len(axis) - 1)
+        idx = np.minimum(pos.astype(np.int64), len(axis) - 2)
+        return idx, pos - idx
+
+    i, fx = locate(x, x_axis)
+    j, fy = locate(y, y_axis)
+    k = np.broadcast_to(kind, i.shape)
+    return ((tables[k, i, j] * (1 - fx) + tables[k, i + 1, j] * fx) * (1 - fy)
+            + (tables[k, i, j + 1] * (1 - fx) + tables[k, i + 1, j + 1] * fx) * fy)
+
+
+def type_index(forced_type):
+    forced_type = np.asarray(forced_type)
+    names, inverse = np.unique(forced_type, return_inverse=True)
+    lookup = np.array([TYPE_NAMES.index(name) if name in COMPRESSORS else -1 for name in names])
+    return lookup[inverse].reshape(forced_type.shape)
+
+
+# RPM별 실제 부스트(bar)와 컴프레서 효율
+# forced_type, redline: (N,), boost: (N,) 또는 RPM별 목표 부스트 (N, P), rpm: (N, P)
+def boost_curve(forced_type, boost, rpm, redline):
+    boost = np.broadcast_to(boost[:, None] if np.ndim(boost) == 1 else boost, rpm.shape)
+    kind = type_index(forced_type)
+    known = kind >= 0
+    kind = np.where(known, kind, 0)[:, None]
+    fraction = rpm / redline[:, None]
+
+    # 부스트 형성
+    start = SPOOL_START[kind]
+    full = SPOOL_FULL[kind]
+    ramp = np.clip((fraction - start) / (full - start), 0.0, 1.0)
+    spool = ramp * ramp * (3 - 2 * ramp)
+    build = np.where(CENTRIFUGAL[kind], fraction ** 2, spool)
+    delivered = boost * build
+
+    # 압력비와 정규화 유량으로 맵 조회
+    pressure_ratio = 1 + delivered / 1.013
+    target_ratio = 1 + np.maximum(boost.max(axis=1, keepdims=True), 1e-6) / 1.013
+    flow = fraction * pressure_ratio / target_ratio
+    efficiency = bilinear(EFFICIENCY_TABLES, kind, pressure_ratio, PR_AXIS, flow, FLOW_AXIS)
+
+    delivered = np.where(known[:, None], delivered, boost)
+    efficiency = np.where(known[:, None], efficiency, REFERENCE_EFFICIENCY)
+    return delivered, efficiency
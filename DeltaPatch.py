@@ -0,0 +1,189 @@
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+import zlib
+
+# 바이너리 델타 패치 (Updater용)
+# 패치 파일 = zlib 압축된 명령 스트림
+#   b"C" + offset(8) + length(4) : 이전 파일의 offset부터 length 바이트 복사
+#   b"A" + length(4) + data      : data를 그대로 추가
+#   b"E"                         : 끝
+MAGIC = b"ESDP1"
+BLOCK_SIZE = 2048
+MAX_ADD = 64 * 1024
+READ_SIZE = 1024 * 1024
+_MOD = 1 << 16
+
+
+class PatchError(Exception):
+    pass
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(READ_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# 1. 패치 적용 (chunks: 패치 파일 바이트 조각들, 예: response.iter_content())
+# 결과는 임시 파일에 쓰면서 해시를 계산하고, 해시가 맞을 때만 out_path로 교체함
+def apply_patch(old_path, chunks, out_path, expected_sha256):
+    decompressor = zlib.decompressobj()
+    buffer = bytearray()
+    digest = hashlib.sha256()
+    header_done = False
+    finished = False
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(out_path) or ".", suffix=".part")
+    try:
+        with open(old_path, "rb") as old, os.fdopen(fd, "wb") as out:
+            def emit(data):
+                digest.update(data)
+                out.write(data)
+
+            def feed(data):
+                nonlocal header_done, finished
+                buffer.extend(data)
+                if not header_done:
+                    if len(buffer) < len(MAGIC):
+                        return
+                    if bytes(buffer[:len(MAGIC)]) != MAGIC:
+                        raise PatchError("패치 파일 형식이 아닙니다.")
+                    del buffer[:len(MAGIC)]
+                    header_done = True
+
+                pos = 0
+                while pos < len(buffer) and not finished:
+                    op = buffer[pos:pos + 1]
+                    if op == b"C":
+                        if len(buffer) - pos < 13:
+                            break
+                        offset, length = struct.unpack_from("<QI", buffer, pos + 1)
+                        old.seek(offset)
+                        while length:
+                            piece = old.read(min(length, READ_SIZE))
+                            if not piece:
+                                raise PatchError("이전 버전 파일이 패치와 맞지 않습니다.")
+                            emit(piece)
+                            length -= len(piece)
+                        pos += 13
+                    elif op == b"A":
+                        if len(buffer) - pos < 5:
+                            break
+                        (length,) = struct.unpack_from("<I", buffer, pos + 1)
+                        if len(buffer) - pos < 5 + length:
+                            break
+                        emit(bytes(buffer[pos + 5:pos + 5 + length]))
+                        pos += 5 + length
+                    elif op == b"E":
+                        finished = True
+                        pos += 1
+                    else:
+                        raise PatchError("알 수 없는 패치 명령입니다.")
+                del buffer[:pos]
+
+            for chunk in chunks:
+                feed(decompressor.decompress(chunk))
+            feed(decompressor.flush())
+
+        if not finished:
+            raise PatchError("패치 파일이 중간에 끊겼습니다.")
+        if digest.hexdigest() != expected_sha256.lower():
+            raise PatchError("패치 결과의 해시가 일치하지 않습니다.")
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# 2. 패치 생성 (배포용, rsync 방식의 롤링 체크섬으로 이전 파일의 블록을 찾음)
+def make_patch(old_path, new_path, patch_path, block_size=BLOCK_SIZE):
+    with open(old_path, "rb") as f:
+        old = f.read()
+    with open(new_path, "rb") as f:
+        new = f.read()
+
+    index = {}
+    for offset in range(0, len(old) - block_size + 1, block_size):
+        index.setdefault(_weak_checksum(old[offset:offset + block_size]), []).append(offset)
+
+    compressor = zlib.compressobj(9)
+    with open(patch_path, "wb") as out:
+        def write(data):
+            out.write(compressor.compress(data))
+
+        def write_add(data):
+            for start in range(0, len(data), MAX_ADD):
+                piece = data[start:start + MAX_ADD]
+                write(b"A" + struct.pack("<I", len(piece)) + piece)
+
+        write(MAGIC)
+        pos = 0
+        literal_start = 0
+        a = b = None
+        while pos + block_size <= len(new):
+            if a is None:
+                a, b = _checksum_parts(new[pos:pos + block_size])
+            match = None
+            for offset in index.get(a | (b << 16), ()):
+                if old[offset:offset + block_size] == new[pos:pos + block_size]:
+                    match = offset
+                    break
+
+            if match is None:
+                # 한 바이트 이동하며 체크섬 갱신
+                out_byte = new[pos]
+                in_byte = new[pos + block_size] if pos + block_size < len(new) else 0
+                a = (a - out_byte + in_byte) % _MOD
+                b = (b - block_size * out_byte + a) % _MOD
+                pos += 1
+                continue
+
+            # 일치 구간을 가능한 만큼 앞으로 확장
+            length = block_size
+            while match + length < len(old) and pos + length < len(new):
+                step = min(READ_SIZE, len(old) - match - length, len(new) - pos - length)
+                if old[match + length:match + length + step] == new[pos + length:pos + length + step]:
+                    length += step
+                    continue
+                while old[match + length] == new[pos + length]:
+                    length += 1
+                break
+
+            write_add(new[literal_start:pos])
+            write(b"C" + struct.pack("<QI", match, length))
+            pos += length
+            literal_start = pos
+            a = b = None
+
+        write_add(new[literal_start:])
+        write(b"E")
+        out.write(compressor.flush())
+    return file_sha256(new_path)
+
+
+def _checksum_parts(data):
+    a = sum(data) % _MOD
+    b = sum((len(data) - i) * x for i, x in enumerate(data)) % _MOD
+    return a, b
+
+
+def _weak_checksum(data):
+    a, b = _checksum_parts(data)
+    return a | (b << 16)
+
+
+# 사용법: python DeltaPatch.py <이전 exe> <새 exe> <패치 파일>
+# 출력된 sha256과 패치 URL을 version.json의 "patches"에 기록
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("사용법: python DeltaPatch.py <old> <new> <patch>")
+        sys.exit(1)
+    sha256 = make_patch(sys.argv[1], sys.argv[2], sys.argv[3])
+    print(f"patch: {sys.argv[3]} ({os.path.getsize(sys.argv[3])} bytes)")
+    print(f"sha256: {sha256}")
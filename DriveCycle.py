@@ -0,0 +1,177 @@
+import csv
+
+import numpy as np
+
+from LossModel import REF_BORE, REF_STROKE, REF_CYLINDERS, LAYOUT_FRICTION_MODIFIER, friction_mep
+from Vehicle import DEFAULT_VEHICLE, AIR_DENSITY, GRAVITY, INERTIA_FACTOR, interp_curve, gear_table
+
+# 주행 모드(속도 기록) 시뮬레이션
+# 속도 기록을 차량/기어 모델로 엔진 RPM·요구 토크로 바꾼 뒤 전부하 토크 곡선에 대한 부하와 연료량을 계산
+SAMPLE_RATE = 10.0   # Hz
+CHUNK_SAMPLES = 4096
+IDLE_RPM = 800.0
+MIN_RPM = 1100.0     # 이보다 낮게 떨어지는 기어는 사용하지 않음
+INDICATED_EFFICIENCY = 0.36
+IDLE_FUEL = 0.25     # g/s
+
+# 연료별 저위발열량 (MJ/kg) 및 밀도 (kg/L)
+FUEL_LHV = {
+    "gasoline": 43.0, "high-octane": 43.0, "diesel": 42.8,
+    "e85": 29.2, "methanol": 19.9, "lpg": 46.0
+}
+FUEL_DENSITY = {
+    "gasoline": 0.745, "high-octane": 0.755, "diesel": 0.835,
+    "e85": 0.781, "methanol": 0.792, "lpg": 0.54
+}
+LOAD_BINS = np.array([0.0, 0.2, 0.4, 0.6, 0.8, 1.0001])
+
+
+# CSV 속도 기록을 묶음 단위로 읽음 (전체를 메모리에 올리지 않음, km/h 단위)
+def read_speed_trace(path, column="speed", chunk_samples=CHUNK_SAMPLES):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        buffer = []
+        for row in reader:
+            buffer.append(float(row[column]))
+            if len(buffer) >= chunk_samples:
+                yield np.array(buffer)
+                buffer = []
+        if buffer:
+            yield np.array(buffer)
+
+
+class CycleAccumulator:
+    def __init__(self, engines):
+        self.samples = 0
+        self.distance = np.zeros(engines)
+        self.fuel = np.zeros(engines)
+        self.load_sum = np.zeros(engines)
+        self.rpm_sum = np.zeros(engines)
+        self.rpm_max = np.zeros(engines)
+        self.missed = np.zeros(engines)
+        self.load_hist = np.zeros((engines, len(LOAD_BINS) - 1))
+
+
+# 마찰 손실 계산용 엔진 형상 (엔진 수,) 배열들: bore / stroke (mm), cylinders, 레이아웃 배율
+# bore / stroke가 없으면 기준 4기통을 배기량에 맞게 같은 비율로 키운 형상 사용
+def friction_geometry(engines, displacement, bore=None, stroke=None, cylinders=None, layout=None):
+    if cylinders is None:
+        cylinders = REF_CYLINDERS
+    cylinders = np.broadcast_to(np.asarray(cylinders, dtype=float), (engines,))
+    if bore is None or stroke is None:
+        ref_volume = np.pi / 4 * REF_BORE ** 2 * REF_STROKE / 1e6   # L
+        scale = np.cbrt(displacement / cylinders / ref_volume)
+        bore, stroke = REF_BORE * scale, REF_STROKE * scale
+    bore = np.broadcast_to(np.asarray(bore, dtype=float), (engines,))
+    stroke = np.broadcast_to(np.asarray(stroke, dtype=float), (engines,))
+    layout = np.broadcast_to(np.asarray("inline" if layout is None else layout), (engines,))
+    modifier = np.array([LAYOUT_FRICTION_MODIFIER.get(key, 1.0) for key in layout])
+    return bore, stroke, cylinders, modifier
+
+
+# 주행 모드 계산
+# rpm_grid, torque: (엔진 수, 지점) 전부하 곡선 (simulate_batch 결과), displacement: (엔진 수,) L
+# speed_chunks: km/h 속도 배열 묶음들 (하나의 배열이나 read_speed_trace 결과)
+# bore / stroke (mm), cylinders, layout: 엔진별 형상, 마찰 손실(연료량)에 사용
+def run_cycle(rpm_grid, torque, displacement, fuel_type, speed_chunks, vehicle=DEFAULT_VEHICLE,
+              sample_rate=SAMPLE_RATE, bore=None, stroke=None, cylinders=None, layout=None):
+    rpm_grid = np.atleast_2d(rpm_grid)
+    torque = np.atleast_2d(torque)
+    engines = len(rpm_grid)
+    redline = rpm_grid[:, -1]
+    displacement = np.broadcast_to(np.asarray(displacement, dtype=float), (engines,))
+    bore, stroke, cylinders, friction_modifier = friction_geometry(engines, displacement, bore, stroke, cylinders, layout)
+    fuel_type = np.broadcast_to(np.asarray(fuel_type), (engines,))
+    lhv = np.array([FUEL_LHV.get(f, 43.0) for f in fuel_type]) * 1e6
+    density = np.array([FUEL_DENSITY.get(f, 0.745) for f in fuel_type])
+    if isinstance(speed_chunks, np.ndarray):
+        speed_chunks = [speed_chunks]
+
+    gears = gear_table([vehicle["gear_ratios"]])[0]
+    mass = vehicle["mass"]
+    radius = vehicle["tire_radius"]
+    drive_ratio = vehicle["final_drive"] / radius
+    rpm_per_speed = drive_ratio * 60 / (2 * np.pi)
+    rolling = vehicle["rolling_resistance"] * mass * GRAVITY
+    drag = 0.5 * AIR_DENSITY * vehicle["drag_coefficient"] * vehicle["frontal_area"]
+    dt = 1.0 / sample_rate
+
+    acc = CycleAccumulator(engines)
+    previous = None
+    for chunk in speed_chunks:
+        speed = np.asarray(chunk, dtype=float) / 3.6
+        if not len(speed):
+            continue
+        before = speed[0] if previous is None else previous
+        accel = np.diff(speed, prepend=before) / dt
+        previous = speed[-1]
+        samples = len(speed)
+
+        # 바퀴 요구 구동력 → 기어별 엔진 RPM / 요구 토크 (시간, 기어)
+        force = mass * INERTIA_FACTOR * accel + np.where(speed > 0, rolling, 0.0) + drag * speed ** 2
+        rpm = speed[:, None] * gears[None, :] * rpm_per_speed
+        demand = force[:, None] / (gears[None, :] * drive_ratio * vehicle["drivetrain_efficiency"])
+        rpm = np.maximum(rpm, IDLE_RPM)
+
+        # 엔진별 전부하 토크 (엔진, 시간 × 기어)
+        wot = interp_curve(rpm_grid, torque, np.broadcast_to(rpm.reshape(1, -1), (engines, rpm.size)))
+        wot = wot.reshape(engines, samples, len(gears))
+
+        # 레드라인 안에서 감당 가능한 가장 높은 기어 선택
+        # 없으면 레드라인 안의 가장 낮은 기어(가장 큰 구동력), 모든 기어가 레드라인을 넘으면 가장 높은 기어
+        within = rpm[None] <= redline[:, None, None]
+        usable = within & (rpm[None] >= MIN_RPM) & (demand[None] <= wot)
+        fallback = np.where(within.any(axis=2), np.argmax(within, axis=2), len(gears) - 1)
+        highest = len(gears) - 1 - np.argmax(usable[:, :, ::-1], axis=2)
+        choice = np.where(usable.any(axis=2), highest, fallback)
+        t_idx = np.arange(samples)
+        engine_rpm = np.where(speed[None] > 0.5, rpm[t_idx, choice], IDLE_RPM)
+        engine_torque = np.where(speed[None] > 0.5, demand[t_idx, choice], 0.0)
+        full_torque = np.take_along_axis(wot, choice[:, :, None], axis=2)[:, :, 0]
+
+        acc.missed += np.sum(engine_torque > full_torque, axis=1)
+        engine_torque = np.minimum(engine_torque, full_torque)
+        load = np.clip(engine_torque / full_torque, 0.0, 1.0)
+
+        # 연료량: (제동 출력 + 마찰 손실) / (도시 효율 × 발열량), 감속 중에는 연료 차단
+        brake_power = engine_torque * engine_rpm * 2 * np.pi / 60
+        fmep = friction_mep(engine_rpm, bore[:, None], stroke[:, None], cylinders[:, None], friction_modifier[:, None])
+        friction_power = fmep * 1e5 * displacement[:, None] / 1000 * engine_rpm / 120
+        fuel_rate = np.where(brake_power > 0, (brake_power + friction_power) / (INDICATED_EFFICIENCY * lhv[:, None]) * 1000, 0.0)
+        fuel_rate = np.where(speed[None] > 0.5, fuel_rate, IDLE_FUEL)
+
+        acc.samples += samples
+        acc.distance += np.sum(speed) * dt
+        acc.fuel += np.sum(fuel_rate, axis=1) * dt
+        acc.load_sum += np.sum(load, axis=1)
+        acc.rpm_sum += np.sum(engine_rpm, axis=1)
+        acc.rpm_max = np.maximum(acc.rpm_max, np.max(engine_rpm, axis=1))
+        bins = np.clip(np.searchsorted(LOAD_BINS, load, side="right") - 1, 0, len(LOAD_BINS) - 2)
+        for b in range(len(LOAD_BINS) - 1):
+            acc.load_hist[:, b] += np.sum(bins == b, axis=1)
+
+    samples = max(acc.samples, 1)
+    liters = acc.fuel / 1000 / density
+    km = acc.distance / 1000
+    return {
+        "duration": acc.samples * dt,
+        "distance_km": km,
+        "fuel_l": liters,
+        "l_per_100km": np.where(km > 0, liters / np.maximum(km, 1e-9) * 100, np.nan),
+        "mean_load": acc.load_sum / samples,
+        "mean_rpm": acc.rpm_sum / samples,
+        "max_rpm": acc.rpm_max,
+        "load_share": acc.load_hist / samples,
+        "missed_share": acc.missed / samples,
+    }
+
+
+# 여러 주행 모드 × 여러 엔진 (결과는 주행 모드별 목록)
+# batch: 결과를 만든 설정 배치 (make_batch 결과 등), 있으면 bore / stroke / cylinders / layout을 마찰 손실에 사용
+def run_cycles(result, fuel_type, cycles, vehicle=DEFAULT_VEHICLE, sample_rate=SAMPLE_RATE, batch=None):
+    geometry = {}
+    if batch is not None:
+        geometry = {key: batch[key] for key in ("bore", "stroke", "cylinders", "layout") if key in batch}
+    return [run_cycle(result["rpm"], result["torque"], result["displacement"], fuel_type, cycle, vehicle, sample_rate,
+                      **geometry)
+            for cycle in cycles]
@@ -0,0 +1,177 @@
+import argparse
+import csv
+import itertools
+import os
+import sys
+
+import numpy as np
+
+from EngineModel import (RPM_MIN, MODEL_CONSTANTS, CALIBRATION_DIR, LAYOUT_TORQUE_RPM_MODIFIER, parse_config,
+                         make_batch, simulate_batch)
+from PresetSchema import load_eng, write_eng
+
+# 실측 dyno 로그로 모델 형상 상수 보정
+# 로그(CSV)는 묶음 단위로 읽어 RPM 격자에 평균으로 모으고(전체를 메모리에 올리지 않음),
+# 여러 로그를 한 번에 최소제곱으로 맞춤
+#   peak_torque_ratio, sigma_divisor: 격자 탐색 (후보 × 로그 × RPM 배열로 한 번에 계산, 점점 좁힘)
+#   base_hp: 후보마다 닫힌 해 (토크가 base_hp에 비례)
+# peak_hp_ratio는 토크 크기에 base_hp / peak_hp_ratio 형태로만 들어가 base_hp와 구별되지 않으므로 고정
+FIT_POINTS = 200
+CHUNK_ROWS = 100000
+SEARCH_RANGES = {"peak_torque_ratio": (0.3, 1.0), "sigma_divisor": (1.0, 10.0)}
+SEARCH_STEPS = 41
+SEARCH_LEVELS = 4
+MAX_CANDIDATE_CELLS = 4000000   # 한 번에 계산하는 후보 × 로그 × RPM 개수
+
+
+# dyno 로그를 RPM 격자(RPM_MIN ~ redline, points개)에 모음 → (rpm, 평균 토크, 표본 수)
+# 격자 칸 밖의 표본은 버림, 표본이 없는 칸은 토크 nan
+def read_dyno_log(path, redline, points=FIT_POINTS, rpm_column="rpm", torque_column="torque", chunk_rows=CHUNK_ROWS):
+    grid = np.linspace(RPM_MIN, redline, points)
+    step = grid[1] - grid[0]
+    total = np.zeros(points)
+    count = np.zeros(points)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        header = next(csv.reader([f.readline()]))
+        columns = [name.strip().lower() for name in header]
+        if rpm_column not in columns or torque_column not in columns:
+            raise ValueError(f"{path}: '{rpm_column}', '{torque_column}' 열이 필요합니다 ({header})")
+        usecols = (columns.index(rpm_column), columns.index(torque_column))
+        while True:
+            lines = list(itertools.islice(f, chunk_rows))
+            if not lines:
+                break
+            data = np.loadtxt(lines, delimiter=",", usecols=usecols, ndmin=2)
+            idx = np.rint((data[:, 0] - RPM_MIN) / step).astype(np.int64)
+            keep = (idx >= 0) & (idx < points) & np.isfinite(data[:, 1])
+            total += np.bincount(idx[keep], weights=data[keep, 1], minlength=points)
+            count += np.bincount(idx[keep], minlength=points)
+    with np.errstate(invalid="ignore"):
+        return grid, total / count, count
+
+
+# 가우시안 토크 모양 (후보, 로그, RPM), redline / layout_modifier: (로그,), 상수: (후보,)
+def _shape(rpm, redline, layout_modifier, peak_torque_ratio, sigma_divisor):
+    peak = np.trunc(redline[None, :] * peak_torque_ratio[:, None] * layout_modifier[None, :])
+    sigma = (redline[None, :] - RPM_MIN) / sigma_divisor[:, None]
+    return np.exp(-((rpm[None] - peak[:, :, None]) ** 2) / (2 * sigma[:, :, None] ** 2))
+
+
+# 후보별 최적 base_hp와 가중 제곱오차 (후보 배열은 같은 길이)
+def _score(candidates, rpm, redline, layout_modifier, unit, torque, weight):
+    cells = max(unit.size, 1)
+    chunk = max(MAX_CANDIDATE_CELLS // cells, 1)
+    count = len(candidates["peak_torque_ratio"])
+    base_hp = np.empty(count)
+    sse = np.empty(count)
+    for start in range(0, count, chunk):
+        part = slice(start, start + chunk)
+        model = unit[None] * _shape(rpm, redline, layout_modifier,
+                                    candidates["peak_torque_ratio"][part], candidates["sigma_divisor"][part])
+        mm = np.sum(weight * model * model, axis=(1, 2))
+        my = np.sum(weight * model * torque, axis=(1, 2))
+        k = my / np.maximum(mm, 1e-300)
+        base_hp[part] = k
+        sse[part] = np.sum(weight * (torque - k[:, None, None] * model) ** 2, axis=(1, 2))
+    return base_hp, sse
+
+
+# 여러 로그에 공통 상수를 맞춤
+# configs: 로그별 엔진 설정, logs: read_dyno_log 결과 목록 (같은 points)
+def fit_constants(configs, logs, peak_hp_ratio=MODEL_CONSTANTS["peak_hp_ratio"]):
+    configs = [dict(config) for config in configs]
+    for config in configs:
+        if config.get("torque_model", "gaussian") != "gaussian":
+            raise ValueError("가우시안 토크 모델 설정만 보정할 수 있습니다.")
+        config.pop("calibration", None)
+    rpm = np.stack([log[0] for log in logs])
+    torque = np.stack([log[1] for log in logs])
+    weight = np.stack([log[2] for log in logs])
+    torque = np.where(weight > 0, torque, 0.0)
+
+    # 기본 상수로 계산한 토크에서 가우시안 모양과 base_hp를 빼 둠 (과급/VVL/공명 등 나머지 배율은 그대로)
+    batch = make_batch(configs)
+    base = simulate_batch(batch, rpm=rpm)["torque"]
+    redline = np.asarray(batch["redline"], dtype=float)
+    layout_modifier = np.array([LAYOUT_TORQUE_RPM_MODIFIER.get(config["layout"], 1.0) for config in configs])
+    default_shape = _shape(rpm, redline, layout_modifier, np.array([MODEL_CONSTANTS["peak_torque_ratio"]]),
+                           np.array([MODEL_CONSTANTS["sigma_divisor"]]))[0]
+    scale = (np.trunc(redline * MODEL_CONSTANTS["peak_hp_ratio"]) / np.trunc(redline * peak_hp_ratio))[:, None]
+    unit = base / default_shape / MODEL_CONSTANTS["base_hp"] * scale
+
+    # 격자 탐색: 최적 후보 주변으로 범위를 좁혀 가며 반복
+    ranges = dict(SEARCH_RANGES)
+    for level in range(SEARCH_LEVELS):
+        axes = {key: np.linspace(lo, hi, SEARCH_STEPS) for key, (lo, hi) in ranges.items()}
+        grid = np.meshgrid(axes["peak_torque_ratio"], axes["sigma_divisor"], indexing="ij")
+        candidates = {"peak_torque_ratio": grid[0].ravel(), "sigma_divisor": grid[1].ravel()}
+        base_hp, sse = _score(candidates, rpm, redline, layout_modifier, unit, torque, weight)
+        best = int(np.argmin(sse))
+        for key, (lo, hi) in ranges.items():
+            span = (hi - lo) / (SEARCH_STEPS - 1) * 2
+            center = candidates[key][best]
+            ranges[key] = (max(center - span, SEARCH_RANGES[key][0]), min(center + span, SEARCH_RANGES[key][1]))
+
+    constants = {
+        "base_hp": float(base_hp[best]),
+        "peak_hp_ratio": float(peak_hp_ratio),
+        "peak_torque_ratio": float(candidates["peak_torque_ratio"][best]),
+        "sigma_divisor": float(candidates["sigma_divisor"][best]),
+    }
+    best_candidate = {key: val[best:best + 1] for key, val in candidates.items()}
+    fitted = base_hp[best] * unit * _shape(rpm, redline, layout_modifier, best_candidate["peak_torque_ratio"],
+                                           best_candidate["sigma_divisor"])[0]
+    samples = np.maximum(weight.sum(axis=1), 1)
+    return {
+        "constants": constants,
+        "logs": len(logs),
+        "samples": int(weight.sum()),
+        "rms": float(np.sqrt(sse[best] / max(weight.sum(), 1))),
+        "default_rms": float(np.sqrt(np.sum(weight * (torque - base) ** 2) / max(weight.sum(), 1))),
+        "log_rms": np.sqrt(np.sum(weight * (torque - fitted) ** 2, axis=1) / samples).tolist(),
+    }
+
+
+# calibrations/<이름>.json 저장 (simulate에서 config["calibration"] = 이름으로 사용)
+def save_calibration(name, fit, sources=()):
+    name = name.lower()
+    os.makedirs(CALIBRATION_DIR, exist_ok=True)
+    path = os.path.join(CALIBRATION_DIR, f"{name}.json")
+    write_eng(path, dict(fit, name=name, sources=list(sources)))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="dyno 로그로 모델 상수 보정")
+    parser.add_argument("name", help="저장할 보정 이름 (calibrations/<name>.json)")
+    parser.add_argument("--log", nargs=2, action="append", required=True, metavar=("CSV", "PRESET"),
+                        help="dyno 로그 CSV와 해당 엔진 .eng 프리셋 (여러 번 지정 가능)")
+    parser.add_argument("--points", type=int, default=FIT_POINTS)
+    parser.add_argument("--rpm-column", default="rpm")
+    parser.add_argument("--torque-column", default="torque")
+    args = parser.parse_args()
+
+    configs = []
+    logs = []
+    for log_path, preset_path in args.log:
+        data, problems = load_eng(preset_path)
+        if problems:
+            print(f"{preset_path}: 프리셋에 문제가 있습니다")
+            for problem in problems:
+                print(f"  - {problem}")
+            sys.exit(1)
+        config = parse_config(data)
+        configs.append(config)
+        logs.append(read_dyno_log(log_path, config["redline"], args.points, args.rpm_column.lower(),
+                                  args.torque_column.lower()))
+
+    fit = fit_constants(configs, logs)
+    path = save_calibration(args.name, fit, [log_path for log_path, _ in args.log])
+    for key, val in fit["constants"].items():
+        print(f"{key}: {MODEL_CONSTANTS[key]:g} → {val:.4f}")
+    print(f"RMS 오차: {fit['default_rms']:.2f} → {fit['rms']:.2f} Nm ({fit['logs']}개 로그, {fit['samples']}개 표본)")
+    print(f"저장: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from EngineModel import (RPM_MIN, RPM_POINTS, AMBIENT_DEFAULTS, ambient_correction, compute_dtype, make_batch,
+                         parse_config, simulate_batch, simulate_config)
+from PresetSchema import load_eng
+
+# 민감도 분석 대상 항목과 기준값이 0일 때 쓰는 절대 변화량
+SENSITIVITY_FIELDS = ["bore", "stroke", "compression_ratio", "boost", "redline", "vvl_rpm"]
+SENSITIVITY_ABS_STEP = {
+    "bore": 1.0, "stroke": 1.0, "compression_ratio": 0.1,
+    "boost": 0.05, "redline": 100.0, "vvl_rpm": 100.0
+}
+
+
+# 민감도 분석: 각 입력을 ±step 만큼 바꾼 설정을 한 번의 배치로 계산
+# 결과는 항목별 최고 출력/토크 변화율(%)
+def sensitivity_analysis(config, fields=SENSITIVITY_FIELDS, rel_step=0.05):
+    fields = list(fields)
+    count = 2 * len(fields) + 1
+
+    batch = {key: np.repeat(np.asarray([val]), count, axis=0) for key, val in config.items()}
+    steps = {}
+    for i, field in enumerate(fields):
+        base = float(config[field])
+        step = abs(base) * rel_step if base != 0 else SENSITIVITY_ABS_STEP.get(field, rel_step)
+        steps[field] = step
+        column = batch[field].astype(float)
+        column[1 + 2 * i] = base - step
+        column[2 + 2 * i] = base + step
+        batch[field] = column
+
+    result = simulate_batch(batch)
+    base_hp = result["max_hp"][0]
+    base_torque = result["max_torque"][0]
+
+    report = {
+        "base_hp": base_hp,
+        "base_torque": base_torque,
+        "fields": fields,
+        "steps": steps,
+        "hp_low": (result["max_hp"][1::2] / base_hp - 1) * 100,
+        "hp_high": (result["max_hp"][2::2] / base_hp - 1) * 100,
+        "torque_low": (result["max_torque"][1::2] / base_torque - 1) * 100,
+        "torque_high": (result["max_torque"][2::2] / base_torque - 1) * 100,
+    }
+    return report
+
+
+# 토네이도 차트 (변화폭이 큰 항목이 위로)
+def plot_tornado(ax, report, output="hp", low_color="tab:blue", high_color="tab:red"):
+    low = report[f"{output}_low"]
+    high = report[f"{output}_high"]
+    order = np.argsort(np.abs(high - low))
+    labels = [report["fields"][i] for i in order]
+    y = np.arange(len(order))
+
+    ax.barh(y, low[order], color=low_color, label="- step")
+    ax.barh(y, high[order], color=high_color, label="+ step")
+    ax.axvline(0, color="gray", linewidth=0.8)
+    ax.set_yticks(y)
+    ax.set_yticklabels(labels)
+    ax.set_xlabel(f"Peak {'HP' if output == 'hp' else 'Torque'} change (%)")
+    ax.legend(fontsize=8)
+
+
+# 몬테카를로 공차 분석 기본값: 항목 -> (분포, 크기)
+# normal: 표준편차, uniform/triangular: 반폭 (모두 입력 단위 그대로)
+MC_TOLERANCES = {
+    "bore": ("normal", 0.02),
+    "stroke": ("normal", 0.02),
+    "compression_ratio": ("normal", 0.05),
+    "boost": ("normal", 0.03),
+    "redline": ("normal", 25.0),
+}
+MC_PERCENTILES = (5, 50, 95)
+
+
+def _sample_field(rng, dist, center, scale, size):
+    if dist == "normal":
+        return rng.normal(center, scale, size)
+    if dist == "uniform":
+        return rng.uniform(center - scale, center + scale, size)
+    if dist == "triangular":
+        return rng.triangular(center - scale, center, center + scale, size)
+    raise ValueError(f"알 수 없는 분포입니다: {dist}")
+
+
+# RPM 지점별 고정 구간 히스토그램 (표본 수와 무관하게 메모리 일정)
+class StreamingPercentiles:
+    def __init__(self, points, bins=2000):
+        self.points = points
+        self.bins = bins
+        self.lo = None
+        self.hi = None
+        self.counts = np.zeros((points, bins), dtype=np.int64)
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float).reshape(-1, self.points)
+        if self.lo is None:
+            # 첫 묶음으로 범위를 정하고 여유를 둠 (범위 밖 값은 양 끝 구간에 누적)
+            lo = np.nanmin(values, axis=0)
+            hi = np.nanmax(values, axis=0)
+            margin = (hi - lo) * 0.5 + np.abs(hi) * 0.01 + 1e-9
+            self.lo = np.nan_to_num(lo - margin)
+            self.hi = np.nan_to_num(hi + margin, nan=1.0)
+
+        valid = ~np.isnan(values)
+        scaled = (np.where(valid, values, 0.0) - self.lo) / (self.hi - self.lo) * self.bins
+        idx = np.clip(scaled.astype(np.int64), 0, self.bins - 1)
+        flat = (idx + np.arange(self.points) * self.bins)[valid]
+        self.counts += np.bincount(flat, minlength=self.points * self.bins).reshape(self.points, self.bins)
+
+    def percentile(self, q):
+        cum = np.cumsum(self.counts, axis=1)
+        total = cum[:, -1]
+        target = q / 100 * total
+        idx = np.argmax(cum >= target[:, None], axis=1)
+        rows = np.arange(self.points)
+        before = np.where(idx > 0, cum[rows, np.maximum(idx - 1, 0)], 0)
+        frac = (target - before) / np.maximum(self.counts[rows, idx], 1)
+        width = (self.hi - self.lo) / self.bins
+        value = self.lo + (idx + frac) * width
+        return np.where(total > 0, value, np.nan)
+
+
+# 몬테카를로 공차 분석: 표본을 chunk_size 단위로 나눠 계산하고 분위수만 누적
+def monte_carlo(config, tolerances=MC_TOLERANCES, samples=100000, chunk_size=2000, points=200,
+                percentiles=MC_PERCENTILES, seed=None):
+    rng = np.random.default_rng(seed)
+    rpm = np.linspace(RPM_MIN, config["redline"], points)
+    curves = {"torque": StreamingPercentiles(points), "hp": StreamingPercentiles(points)}
+    peaks = {"max_hp": StreamingPercentiles(1), "max_torque": StreamingPercentiles(1)}
+
+    done = 0
+    while done < samples:
+        size = min(chunk_size, samples - done)
+        batch = dict(config)
+        for field, (dist, scale) in tolerances.items():
+            batch[field] = _sample_field(rng, dist, float(config[field]), scale, size)
+        for field in ("bore", "stroke", "compression_ratio"):
+            batch[field] = np.maximum(np.broadcast_to(batch[field], (size,)), 1e-3)
+        batch["boost"] = np.maximum(batch["boost"], 0.0)
+        batch["redline"] = np.maximum(np.broadcast_to(batch["redline"], (size,)), RPM_MIN + 100)
+
+        result = simulate_batch(batch, rpm=rpm)
+        # 표본의 레드라인을 넘는 구간은 제외
+        beyond = rpm[None, :] > batch["redline"][:, None]
+        for key, acc in curves.items():
+            acc.add(np.where(beyond, np.nan, result[key]))
+        for key, acc in peaks.items():
+            acc.add(result[key])
+        done += size
+
+    report = {"rpm": rpm, "samples": samples}
+    for key, acc in list(curves.items()) + list(peaks.items()):
+        report[key] = {q: acc.percentile(q) for q in percentiles}
+    for key in peaks:
+        report[key] = {q: val[0] for q, val in report[key].items()}
+    return report
+
+
+# 중앙값과 P5/P95 밴드 그리기
+def plot_bands(ax, report, hp_color="red", torque_color="blue"):
+    rpm = report["rpm"]
+    for key, label, color in (("hp", "Horsepower (HP)", hp_color), ("torque", "Torque (Nm)", torque_color)):
+        bands = report[key]
+        ax.fill_between(rpm, bands[5], bands[95], color=color, alpha=0.2, label=f"{label} P5-P95")
+        ax.plot(rpm, bands[50], color=color, label=f"{label} median")
+    ax.set_xlabel("RPM")
+    ax.set_ylabel("Horsepower (HP) / Torque (Nm)")
+    ax.legend(fontsize=8)
+
+
+# 고도 × 온도 출력 감소 곡면
+# 대기 보정은 출력 전체에 곱해지는 배율이므로 기준 조건에서 한 번만 계산하고 배율 격자를 곱함
+def derate_surface(config, altitudes, temps, humidity=AMBIENT_DEFAULTS["humidity"]):
+    altitudes = np.asarray(altitudes, dtype=float)
+    temps = np.asarray(temps, dtype=float)
+    base = simulate_config(dict(config, ambient="normal", ambient_condition="normal"))
+    factor = ambient_correction(temps[None, :], 0.0, humidity, altitudes[:, None])
+    return {
+        "altitude": altitudes,
+        "temp": temps,
+        "factor": factor,
+        "max_hp": base["max_hp"] * factor,
+        "max_torque": base["max_torque"] * factor,
+    }
+
+
+def plot_derate(figure, ax, surface):
+    image = ax.contourf(surface["temp"], surface["altitude"], surface["factor"] * 100, levels=20, cmap="RdYlGn")
+    lines = ax.contour(surface["temp"], surface["altitude"], surface["max_hp"], levels=8, colors="black", linewidths=0.5)
+    ax.clabel(lines, fmt="%d HP", fontsize=7)
+    figure.colorbar(image, ax=ax, label="Power (%)")
+    ax.set_xlabel("Ambient temperature (°C)")
+    ax.set_ylabel("Altitude (m)")
+
+
+# 러너 길이 스윕: 흡기 × 배기 러너 길이 조합을 한 번의 배치로 계산
+# 토크 폭(spread): 최고 토크의 SPREAD_THRESHOLD 이상을 내는 RPM 구간 길이
+SPREAD_THRESHOLD = 0.9
+RUNNER_TARGETS = {"spread": "Torque spread (rpm)", "mean_torque": "Mean torque (Nm)", "max_hp": "Peak HP"}
+
+
+def runner_sweep(config, intake_lengths, exhaust_lengths=None, points=200, target="spread"):
+    intake_lengths = np.asarray(intake_lengths, dtype=float)
+    if exhaust_lengths is None:
+        exhaust_lengths = [config.get("exhaust_runner_length", 0.0)]
+    exhaust_lengths = np.asarray(exhaust_lengths, dtype=float)
+    intake_grid, exhaust_grid = np.meshgrid(intake_lengths, exhaust_lengths, indexing="ij")
+
+    batch = {key: np.repeat(np.asarray([val]), intake_grid.size, axis=0) for key, val in config.items()}
+    batch["intake_runner_length"] = intake_grid.ravel()
+    batch["exhaust_runner_length"] = exhaust_grid.ravel()
+    rpm = np.linspace(RPM_MIN, config["redline"], points)
+    result = simulate_batch(batch, rpm=rpm)
+
+    torque = result["torque"]
+    scores = {
+        "spread": np.sum(torque >= SPREAD_THRESHOLD * result["max_torque"][:, None], axis=1) * (rpm[1] - rpm[0]),
+        "mean_torque": torque.mean(axis=1),
+        "max_hp": result["max_hp"],
+    }
+    best = int(np.argmax(scores[target]))
+    report = {key: val.reshape(intake_grid.shape) for key, val in scores.items()}
+    report.update({
+        "target": target,
+        "intake_lengths": intake_lengths,
+        "exhaust_lengths": exhaust_lengths,
+        "best_intake": intake_grid.ravel()[best],
+        "best_exhaust": exhaust_grid.ravel()[best],
+        "rpm": rpm,
+        "best_torque": torque[best],
+    })
+    return report
+
+
+# 배기 길이가 하나면 선 그래프, 여러 개면 흡기 × 배기 히트맵 (최적 조합 표시)
+def plot_runner_sweep(figure, ax, report):
+    target = report["target"]
+    values = report[target]
+    if len(report["exhaust_lengths"]) == 1:
+        ax.plot(report["intake_lengths"], values[:, 0])
+        ax.axvline(report["best_intake"], color="gray", linestyle=":")
+        ax.set_ylabel(RUNNER_TARGETS[target])
+        ax.grid(True)
+    else:
+        intake = report["intake_lengths"]
+        exhaust = report["exhaust_lengths"]
+        image = ax.imshow(values.T, origin="lower", aspect="auto", cmap="viridis",
+                          extent=(intake[0], intake[-1], exhaust[0], exhaust[-1]))
+        figure.colorbar(image, ax=ax, label=RUNNER_TARGETS[target])
+        ax.plot(report["best_intake"], report["best_exhaust"], marker="x", color="red")
+        ax.set_ylabel("Exhaust runner length (mm)")
+    ax.set_xlabel("Intake runner length (mm)")
+
+
+# 계산 정밀도 검증: 같은 설정을 float64와 dtype으로 계산해 최고값 오차 / 결과 메모리 / 계산 시간 비교
+# 출력·토크 최고값은 상대 오차, 최고값 RPM은 절대 오차(rpm)와 격자 칸이 바뀐 비율
+PRECISION_PEAKS = ["max_hp", "max_torque"]
+PRECISION_PEAK_RPMS = ["max_hp_rpm", "max_torque_rpm"]
+
+
+def precision_report(configs, dtype="float32", points=RPM_POINTS, chunk_size=2000, losses=False):
+    dtype = compute_dtype(dtype)
+    errors = {key: [] for key in PRECISION_PEAKS + PRECISION_PEAK_RPMS}
+    curve_error = 0.0
+    seconds = {"float64": 0.0, dtype.name: 0.0}
+    nbytes = {"float64": 0, dtype.name: 0}
+
+    for start in range(0, len(configs), chunk_size):
+        batch = make_batch(configs[start:start + chunk_size])
+        started = time.perf_counter()
+        reference = simulate_batch(batch, points=points, losses=losses)
+        seconds["float64"] += time.perf_counter() - started
+        started = time.perf_counter()
+        result = simulate_batch(batch, points=points, losses=losses, dtype=dtype)
+        seconds[dtype.name] += time.perf_counter() - started
+        nbytes["float64"] += sum(val.nbytes for val in reference.values())
+        nbytes[dtype.name] += sum(val.nbytes for val in result.values())
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for key in PRECISION_PEAKS:
+                errors[key].append(np.abs(result[key] / reference[key] - 1))
+            for key in ("torque", "hp"):
+                scale = np.abs(reference[key]).max(axis=1, keepdims=True)
+                curve_error = max(curve_error, float(np.nanmax(np.abs(result[key] - reference[key]) / scale)))
+        for key in PRECISION_PEAK_RPMS:
+            errors[key].append(np.abs(result[key].astype(float) - reference[key]))
+
+    report = {"dtype": dtype.name, "samples": len(configs), "points": points, "curve_max_rel": curve_error,
+              "seconds": seconds, "bytes": nbytes}
+    for key, parts in errors.items():
+        values = np.concatenate(parts)
+        report[key] = {"max": float(np.nanmax(values)), "p99": float(np.nanpercentile(values, 99)),
+                       "mean": float(np.nanmean(values))}
+        if key in PRECISION_PEAK_RPMS:
+            report[key]["moved"] = float(np.mean(values > 0.5))
+    report["speedup"] = seconds["float64"] / max(seconds[dtype.name], 1e-12)
+    report["memory_ratio"] = nbytes[dtype.name] / max(nbytes["float64"], 1)
+    return report
+
+
+def format_precision_report(report):
+    name = report["dtype"]
+    lines = [f"{name} vs float64: {report['samples']}개 설정, RPM {report['points']}지점"]
+    for key in PRECISION_PEAKS:
+        err = report[key]
+        lines.append(f"  {key:<15} 상대 오차 최대 {err['max']:.2e}, P99 {err['p99']:.2e}, 평균 {err['mean']:.2e}")
+    for key in PRECISION_PEAK_RPMS:
+        err = report[key]
+        lines.append(f"  {key:<15} 오차 최대 {err['max']:.1f} rpm, P99 {err['p99']:.1f} rpm, "
+                     f"격자 칸 바뀜 {err['moved'] * 100:.2f}%")
+    lines.append(f"  곡선 최대 오차 (최고값 대비) {report['curve_max_rel']:.2e}")
+    lines.append(f"  결과 메모리 {report['bytes']['float64'] / 1e6:.1f} → {report['bytes'][name] / 1e6:.1f} MB "
+                 f"({report['memory_ratio'] * 100:.0f}%)")
+    lines.append(f"  계산 시간 {report['seconds']['float64']:.2f} → {report['seconds'][name]:.2f}초 "
+                 f"({report['speedup']:.2f}배)")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="계산 정밀도 검증 보고서")
+    parser.add_argument("base", help="표본의 기준 .eng 프리셋")
+    parser.add_argument("--dtype", default="float32")
+    parser.add_argument("--samples", type=int, default=20000)
+    parser.add_argument("--points", type=int, default=RPM_POINTS)
+    parser.add_argument("--method", default="sobol")
+    parser.add_argument("--categories", nargs="*", default=["engine_type", "layout", "fuel_type"])
+    args = parser.parse_args()
+
+    from SweepSampler import sample_configs
+    data, problems = load_eng(args.base)
+    if problems:
+        print(f"{args.base}: 프리셋에 문제가 있습니다")
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(1)
+    configs = []
+    for chunk in sample_configs(parse_config(data), args.method, args.samples, categories=args.categories):
+        configs.extend(chunk)
+    print(format_precision_report(precision_report(configs, args.dtype, args.points)))
+
+
+if __name__ == "__main__":
+    main()
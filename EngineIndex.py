@@ -0,0 +1,296 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from EngineModel import parse_config, make_batch, simulate_batch
+from PresetSchema import load_eng
+
+# "비슷한 엔진 찾기" 최근접 이웃 색인
+# simulate 결과에서 특징 벡터(최고 출력/토크와 그 RPM, 배기량, 토크 곡선 모양)를 만들고 고정 배율로 정규화해
+# KD 트리에 넣음. 추가는 로그 방식(Bentley-Saxe): 작은 버퍼가 차면 트리로 만들고, 크기가 같거나 작은
+# 트리끼리 합쳐 다시 만듦 → 트리는 log(N)개 이하, 질의는 각 트리 + 버퍼를 찾아 k개를 합침
+INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "engine_index.npz")
+INDEX_POINTS = 200     # 특징을 만들 때의 RPM 지점 수 (색인과 질의가 같아야 함)
+SHAPE_POINTS = 8       # 토크 곡선 모양: RPM_MIN ~ redline 사이 균등 지점의 토크 / 최고 토크
+LEAF_SIZE = 32
+BUFFER_SIZE = 1024
+
+# 특징별 (변환, 1 거리에 해당하는 크기): log는 비율 차이(0.1 ≈ 10%), 나머지는 절대 차이
+PEAK_FEATURES = {
+    "max_hp": ("log", 0.1),
+    "max_hp_rpm": ("linear", 500.0),
+    "max_torque": ("log", 0.1),
+    "max_torque_rpm": ("linear", 500.0),
+    "displacement": ("log", 0.1),
+}
+SHAPE_SCALE = 0.05
+FEATURE_NAMES = list(PEAK_FEATURES) + [f"shape_{i}" for i in range(SHAPE_POINTS)]
+
+
+# simulate 결과(배치 또는 한 행) → 특징 (N, F), 단위는 원래 값 그대로
+def feature_vectors(result):
+    torque = np.atleast_2d(result["torque"])
+    columns = [np.atleast_1d(result[key]).astype(float) for key in PEAK_FEATURES]
+    idx = np.rint(np.linspace(0, torque.shape[1] - 1, SHAPE_POINTS)).astype(np.int64)
+    shape = torque[:, idx] / np.atleast_1d(result["max_torque"])[:, None]
+    return np.column_stack(columns + [shape])
+
+
+# 특징 → 거리 계산용 정규화 벡터
+def normalize_features(features):
+    features = np.atleast_2d(np.asarray(features, dtype=float))
+    vectors = np.empty_like(features)
+    for j, (kind, scale) in enumerate(PEAK_FEATURES.values()):
+        column = features[:, j]
+        vectors[:, j] = (np.log(np.maximum(column, 1e-9)) if kind == "log" else column) / scale
+    vectors[:, len(PEAK_FEATURES):] = features[:, len(PEAK_FEATURES):] / SHAPE_SCALE
+    return vectors
+
+
+# 정적 KD 트리 (잎마다 최대 leaf_size개, 분할 축은 폭이 가장 넓은 축, 분할 값은 중앙값)
+class KDTree:
+    def __init__(self, points, ids, leaf_size=LEAF_SIZE):
+        self.points = np.array(points, dtype=float)
+        self.ids = np.array(ids, dtype=np.int64)
+        self.size = len(self.ids)
+        dims, splits, lefts, rights, starts, ends = [], [], [], [], [], []
+
+        def new_node(start, end):
+            dims.append(0)
+            splits.append(0.0)
+            lefts.append(-1)
+            rights.append(-1)
+            starts.append(start)
+            ends.append(end)
+            return len(starts) - 1
+
+        stack = [new_node(0, self.size)]
+        while stack:
+            node = stack.pop()
+            start, end = starts[node], ends[node]
+            if end - start <= leaf_size:
+                continue
+            part = self.points[start:end]
+            spread = part.max(axis=0) - part.min(axis=0)
+            dim = int(np.argmax(spread))
+            if spread[dim] == 0:
+                continue   # 모두 같은 점이면 잎으로 둠
+            mid = (end - start) // 2
+            order = np.argpartition(part[:, dim], mid)
+            self.points[start:end] = part[order]
+            self.ids[start:end] = self.ids[start:end][order]
+            dims[node] = dim
+            splits[node] = float(self.points[start + mid, dim])
+            lefts[node] = new_node(start, start + mid)
+            rights[node] = new_node(start + mid, end)
+            stack += [lefts[node], rights[node]]
+
+        self.dims, self.splits, self.lefts, self.rights, self.starts, self.ends = dims, splits, lefts, rights, starts, ends
+
+    # best: (거리², id) 배열 쌍 (오름차순, 길이 k), 더 가까운 점으로 갱신해 반환
+    def search(self, x, best_dist, best_ids):
+        k = len(best_dist)
+        stack = [(0, 0.0)]
+        while stack:
+            node, gap = stack.pop()
+            if gap >= best_dist[-1]:
+                continue
+            left = self.lefts[node]
+            if left < 0:
+                start, end = self.starts[node], self.ends[node]
+                dist = np.sum((self.points[start:end] - x) ** 2, axis=1)
+                best_dist, best_ids = _merge(best_dist, best_ids, dist, self.ids[start:end], k)
+                continue
+            diff = x[self.dims[node]] - self.splits[node]
+            near, far = (left, self.rights[node]) if diff < 0 else (self.rights[node], left)
+            stack.append((far, diff * diff))
+            stack.append((near, gap))
+        return best_dist, best_ids
+
+
+def _merge(best_dist, best_ids, dist, ids, k):
+    dist = np.concatenate([best_dist, dist])
+    ids = np.concatenate([best_ids, ids])
+    if len(dist) > k:
+        keep = np.argpartition(dist, k - 1)[:k]
+        dist, ids = dist[keep], ids[keep]
+    order = np.argsort(dist, kind="stable")
+    return dist[order], ids[order]
+
+
+class EngineIndex:
+    def __init__(self):
+        self.features = []      # 추가한 묶음별 특징 (원래 단위)
+        self.labels = []
+        self.configs = []       # 엔진 설정 (실측 엔진 등 설정이 없으면 None)
+        self.trees = []         # 크기 내림차순
+        self.buffer = []        # 아직 트리에 넣지 않은 (정규화 벡터, id)
+        self._all = None
+
+    def __len__(self):
+        return len(self.labels)
+
+    # 특징 (N, F)과 이름 목록 추가 → 새 id 배열
+    def insert(self, features, labels, configs=None):
+        features = np.atleast_2d(np.asarray(features, dtype=float))
+        ids = np.arange(len(self.labels), len(self.labels) + len(features))
+        self.features.append(features)
+        self.labels.extend(str(label) for label in labels)
+        self.configs.extend(configs if configs is not None else [None] * len(features))
+        self._all = None
+
+        vectors = normalize_features(features)
+        if len(vectors) >= BUFFER_SIZE:
+            self._add_tree(vectors, ids)
+        else:
+            self.buffer.extend(zip(vectors, ids))
+            if len(self.buffer) >= BUFFER_SIZE:
+                vectors, ids = self._take_buffer()
+                self._add_tree(vectors, ids)
+        return ids
+
+    # simulate 결과(배치)를 그대로 추가
+    def insert_results(self, result, labels, configs=None):
+        return self.insert(feature_vectors(result), labels, configs)
+
+    def _take_buffer(self):
+        vectors = np.array([vector for vector, _ in self.buffer])
+        ids = np.array([i for _, i in self.buffer], dtype=np.int64)
+        self.buffer = []
+        return vectors, ids
+
+    def _add_tree(self, vectors, ids):
+        while self.trees and self.trees[-1].size <= len(ids):
+            tree = self.trees.pop()
+            vectors = np.concatenate([tree.points, vectors])
+            ids = np.concatenate([tree.ids, ids])
+        self.trees.append(KDTree(vectors, ids))
+
+    # 가까운 k개 → (거리, id) 오름차순, 거리는 정규화 공간의 유클리드 거리
+    def query(self, features, k=5):
+        x = normalize_features(features)[0]
+        k = max(1, min(k, len(self)))
+        best_dist = np.full(k, np.inf)
+        best_ids = np.full(k, -1, dtype=np.int64)
+        for tree in self.trees:
+            best_dist, best_ids = tree.search(x, best_dist, best_ids)
+        if self.buffer:
+            vectors = np.array([vector for vector, _ in self.buffer])
+            ids = np.array([i for _, i in self.buffer], dtype=np.int64)
+            best_dist, best_ids = _merge(best_dist, best_ids, np.sum((vectors - x) ** 2, axis=1), ids, k)
+        found = best_ids >= 0
+        return np.sqrt(best_dist[found]), best_ids[found]
+
+    def all_features(self):
+        if self._all is None:
+            self._all = np.concatenate(self.features) if self.features else np.empty((0, len(FEATURE_NAMES)))
+            self.features = [self._all]
+        return self._all
+
+    def entry(self, i):
+        return {
+            "label": self.labels[i],
+            "features": dict(zip(FEATURE_NAMES, self.all_features()[i].tolist())),
+            "config": self.configs[i],
+        }
+
+    # 이름과 설정(JSON)은 줄바꿈으로 이은 UTF-8 바이트로 저장 (numpy 고정 폭 문자열은 가장 긴 항목 크기로 늘어남)
+    def save(self, path=INDEX_FILE):
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, features=self.all_features(), labels=_pack_lines(self.labels),
+                 configs=_pack_lines(json.dumps(config) for config in self.configs))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        index = cls()
+        with np.load(path) as data:
+            features = data["features"]
+            labels = _unpack_lines(data["labels"], len(features))
+            configs = [json.loads(text) for text in _unpack_lines(data["configs"], len(features))]
+        if features.shape[1:] != (len(FEATURE_NAMES),) or not len(features) == len(labels) == len(configs):
+            raise ValueError(f"색인 파일 형식이 다릅니다: {path}")
+        if len(labels):
+            index.insert(features, labels, configs)
+        return index
+
+
+def _pack_lines(texts):
+    return np.frombuffer("\n".join(text.replace("\n", " ") for text in texts).encode("utf-8"), dtype=np.uint8)
+
+
+def _unpack_lines(data, count):
+    return data.tobytes().decode("utf-8").split("\n") if count else []
+
+
+# 설정 목록을 계산해 색인에 추가 (묶음 단위)
+def index_configs(index, configs, labels, batch_size=4096):
+    for start in range(0, len(configs), batch_size):
+        part = configs[start:start + batch_size]
+        result = simulate_batch(make_batch(part), points=INDEX_POINTS)
+        index.insert_results(result, labels[start:start + batch_size], part)
+
+
+def _load_presets(paths):
+    configs = []
+    for path in paths:
+        data, problems = load_eng(path)
+        if problems:
+            print(f"{path}: 프리셋에 문제가 있습니다")
+            for problem in problems:
+                print(f"  - {problem}")
+            sys.exit(1)
+        configs.append(parse_config(data))
+    return configs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="비슷한 엔진 찾기 색인")
+    parser.add_argument("--index", default=INDEX_FILE)
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="표본 엔진으로 새 색인 만들기")
+    build.add_argument("base", help="표본의 기준 .eng 프리셋")
+    build.add_argument("--samples", type=int, default=100000)
+    build.add_argument("--method", default="sobol")
+    build.add_argument("--categories", nargs="*", default=["engine_type", "layout", "fuel_type"])
+    add = commands.add_parser("add", help="프리셋 엔진 추가")
+    add.add_argument("presets", nargs="+")
+    query = commands.add_parser("query", help="프리셋과 비슷한 엔진 찾기")
+    query.add_argument("preset")
+    query.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == "build":
+        from SweepSampler import sample_configs
+        base = _load_presets([args.base])[0]
+        index = EngineIndex()
+        for chunk in sample_configs(base, args.method, args.samples, categories=args.categories):
+            index_configs(index, chunk, [f"{args.method}-{len(index) + i}" for i in range(len(chunk))])
+        index.save(args.index)
+        print(f"{len(index)}개 엔진 색인 저장: {args.index} ({time.perf_counter() - started:.1f}초)")
+    elif args.command == "add":
+        index = EngineIndex.load(args.index) if os.path.exists(args.index) else EngineIndex()
+        labels = [os.path.splitext(os.path.basename(path))[0] for path in args.presets]
+        index_configs(index, _load_presets(args.presets), labels)
+        index.save(args.index)
+        print(f"{len(args.presets)}개 추가, 전체 {len(index)}개")
+    else:
+        index = EngineIndex.load(args.index)
+        config = _load_presets([args.preset])[0]
+        features = feature_vectors(simulate_batch(make_batch([config]), points=INDEX_POINTS))
+        loaded = time.perf_counter()
+        distances, ids = index.query(features, args.k)
+        print(f"{len(index)}개 중 가까운 {len(ids)}개 ({(time.perf_counter() - loaded) * 1000:.2f} ms)")
+        for distance, i in zip(distances, ids):
+            entry = index.entry(i)["features"]
+            print(f"  {index.labels[i]:<24} 거리 {distance:6.2f}  {entry['max_hp']:7.1f} HP @ {entry['max_hp_rpm']:.0f}  "
+                  f"{entry['max_torque']:7.1f} Nm @ {entry['max_torque_rpm']:.0f}  {entry['displacement']:.2f} L")
+
+
+if __name__ == "__main__":
+    main()
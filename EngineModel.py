@@ -0,0 +1,519 @@
+import json
+import os
+
+import numpy as np
+
+import CamModel
+import Compressor
+import LossModel
+import RunnerModel
+import TorqueSpline
+
+# 숫자 입력 항목
+FLOAT_FIELDS = [
+    "bore", "stroke", "compression_ratio", "boost", "redline", "vvl_rpm", "crossover_rpm", "crossover_width",
+    "ambient_temp", "ambient_pressure", "humidity", "altitude",
+    "intake_runner_length", "intake_runner_diameter", "exhaust_runner_length", "exhaust_runner_diameter"
+]
+INT_FIELDS = ["cylinders"]
+
+# 선택형 입력 항목
+COMBO_OPTIONS = {
+    "engine_type": ["na", "turbo", "supercharger", "twin-turbo", "twincharged"],
+    "forced_type": ["na", "single", "twin-scroll", "variable-geometry", "roots", "centrifugal", "twin-screw", "sequential"],
+    "layout": ["inline", "v", "boxer"],
+    "fuel_type": ["gasoline", "high-octane", "diesel", "e85", "methanol", "lpg"],
+    "ambient": ["normal", "cold", "hot", "custom"],
+    "use_vvl": ["yes", "no"],
+    "vvl_profile": ["mild", "aggressive"],
+    "boost_model": ["flat", "map"],
+    "cam_model": ["simple", "profile"],
+    "cam_profile": list(CamModel.CAM_PROFILES),
+    "torque_model": ["gaussian", "spline"]
+}
+
+# 연료 및 온도 계수
+FUEL_HP_MODIFIER = {
+    "gasoline": 1.00, "high-octane": 1.05, "diesel": 0.85,
+    "e85": 1.10, "methanol": 1.12, "lpg": 0.92
+}
+AMBIENT_POWER_MODIFIER = {"normal": 1.0, "cold": 0.92, "hot": 0.95}
+
+# ambient "custom": 온도(°C), 기압(kPa, 0이면 고도로 계산), 습도(%), 고도(m)로 SAE J1349 보정
+AMBIENT_DEFAULTS = {"ambient_temp": 25.0, "ambient_pressure": 0.0, "humidity": 0.0, "altitude": 0.0}
+SAE_DRY_PRESSURE = 99.0   # kPa
+SAE_TEMPERATURE = 298.0   # K
+
+# 레이아웃 계수
+LAYOUT_HP_MODIFIER = {"inline": 1.0, "v": 1.05, "boxer": 0.97}
+LAYOUT_TORQUE_RPM_MODIFIER = {"inline": 1.0, "v": 1.1, "boxer": 0.85}
+
+# VVL 프로파일별 (출력, 토크) 증가량
+VVL_GAIN = {"mild": (0.05, 0.05), "aggressive": (0.10, 0.08)}
+VVL_RAMP_RPM = 300
+
+# cam_model "profile": 캠 모델의 체적효율을 이 값으로 나눠 토크 배율로 사용 (VVL_GAIN 대신)
+CAM_REFERENCE_VE = 0.9
+
+RPM_MIN = 1000
+RPM_POINTS = 1000
+
+# RPM별 곡선 계산 정밀도: float32는 메모리가 절반, 최고값 오차는 EngineAnalysis.precision_report로 확인
+# 설정별 값(N,)은 항상 float64로 계산하고 곡선과 만날 때 변환, 보조 모델(컴프레서 맵 / 캠 / 러너 / 스플라인 / 손실)은
+# 내부를 float64로 계산한 뒤 결과만 변환
+COMPUTE_DTYPES = ("float64", "float32")
+
+# 모델 버전 (앱 current_version과 같게 유지), 계산식이 바뀌면 올려서 디스크 결과 캐시를 무효화
+MODEL_VERSION = "2.4"
+
+# 모델 형상 상수 (DynoFit으로 실측 dyno 로그에 맞춘 값을 calibrations/<이름>.json에 저장해 둠)
+#   base_hp: na_base_hp = 배기량 × 압축비 × base_hp × 계수들
+#   peak_hp_ratio / peak_torque_ratio: 레드라인 대비 최고 출력 / 최고 토크 RPM
+#   sigma_divisor: 토크 곡선 폭 = (레드라인 - 1000) / sigma_divisor
+MODEL_CONSTANTS = {"base_hp": 10.0, "peak_hp_ratio": 0.85, "peak_torque_ratio": 0.65, "sigma_divisor": 3.5}
+CALIBRATION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "calibrations")
+
+_calibrations = {}
+
+# (rpm, 값) 쌍 목록으로 입력하는 표 항목 (예: boost_curve = [[2500, 0.6], [4000, 1.2]])
+# torque_curve: torque_model "spline"의 제어점, 값은 기본 모델 최대 토크(가우시안 정점) 대비 비율
+TABLE_FIELDS = ["boost_curve", "torque_curve"]
+# make_batch가 미리 계산해 두는 torque_curve 스플라인 계수
+SPLINE_KEYS = ("torque_knots", "torque_coeffs", "torque_count")
+
+
+# 표 입력 해석: "2500:0.6, 4000:1.2" 문자열 또는 [[2500, 0.6], ...] 목록 → rpm 순으로 정렬된 목록
+def parse_table(val):
+    if isinstance(val, str):
+        pairs = [item.split(":") for item in val.replace(";", ",").split(",") if item.strip()]
+    else:
+        pairs = val or []
+    table = sorted([float(x), float(y)] for x, y in pairs)
+    return table
+
+
+def format_table(table):
+    return ", ".join(f"{x:g}:{y:g}" for x, y in table)
+
+
+# 입력값 전처리 (GUI 입력 / .eng 파일 공통)
+def parse_config(raw):
+    config = {}
+    for key, val in raw.items():
+        if key in FLOAT_FIELDS:
+            config[key] = float(val)
+        elif key in INT_FIELDS:
+            config[key] = int(val)
+        elif key in TABLE_FIELDS:
+            config[key] = parse_table(val)
+        elif isinstance(val, str):
+            config[key] = val.lower()
+        else:
+            config[key] = val
+
+    config["vvl_enabled"] = (config["use_vvl"] == "yes")
+    config["ambient_condition"] = config["ambient"]
+    return config
+
+
+# 보정 상수 세트 불러오기 ("" 또는 "default"는 기본값), 파일이 바뀌면 다시 읽음
+def load_calibration(name):
+    if name in ("", "default"):
+        return MODEL_CONSTANTS
+    path = os.path.join(CALIBRATION_DIR, f"{name}.json")
+    if not os.path.exists(path):
+        raise ValueError(f"보정 상수 파일이 없습니다: {path}")
+    mtime = os.path.getmtime(path)
+    if name in _calibrations and _calibrations[name][0] == mtime:
+        return _calibrations[name][1]
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    constants = dict(MODEL_CONSTANTS)
+    for key, val in data.get("constants", {}).items():
+        if key not in MODEL_CONSTANTS or isinstance(val, bool) or not isinstance(val, (int, float)) or not val > 0:
+            raise ValueError(f"잘못된 보정 상수입니다: {key} = {val!r}")
+        constants[key] = float(val)
+    _calibrations[name] = (mtime, constants)
+    return constants
+
+
+# 행별 형상 상수 (calibration 항목이 없으면 기본값 스칼라)
+def model_constants(batch, n):
+    if "calibration" not in batch:
+        return MODEL_CONSTANTS
+    names, inverse = np.unique(_column(batch, "calibration", n), return_inverse=True)
+    sets = [load_calibration(name) for name in names]
+    return {key: np.array([constants[key] for constants in sets])[inverse] for key in MODEL_CONSTANTS}
+
+
+# 고도(m) → 표준 대기압(kPa)
+def altitude_pressure(altitude):
+    return 101.325 * (1 - 2.25577e-5 * np.asarray(altitude, dtype=float)) ** 5.25588
+
+
+# 대기 조건별 출력 배율 (SAE J1349 보정계수의 역수, 배열 입력은 서로 브로드캐스트)
+def ambient_correction(temp, pressure, humidity, altitude):
+    temp = np.asarray(temp, dtype=float)
+    pressure = np.asarray(pressure, dtype=float)
+    pressure = np.where(pressure > 0, pressure, altitude_pressure(altitude))
+    vapor = 0.61078 * np.exp(17.27 * temp / (temp + 237.3)) * np.asarray(humidity, dtype=float) / 100
+    dry = pressure - vapor
+    factor = 1.18 * (SAE_DRY_PRESSURE / dry) * np.sqrt((temp + 273.15) / SAE_TEMPERATURE) - 0.18
+    return 1 / factor
+
+
+# 선택형 값 배열을 계수 배열로 변환
+def _lookup(values, table, default=1.0):
+    values = np.asarray(values)
+    keys, inverse = np.unique(values, return_inverse=True)
+    mapped = np.array([table.get(key, default) for key in keys], dtype=float)
+    return mapped[inverse].reshape(values.shape)
+
+
+# 배치 크기 계산 (스칼라 값은 배치 전체에 적용)
+def _batch_size(batch):
+    size = 1
+    for key, val in batch.items():
+        arr = np.asarray(val)
+        if arr.ndim == (3 if key in TABLE_FIELDS else 1):
+            size = max(size, len(arr))
+    return size
+
+
+def _column(batch, key, n, dtype=None):
+    arr = np.asarray(batch[key], dtype=dtype)
+    return np.broadcast_to(arr, (n,))
+
+
+def compute_dtype(dtype):
+    dtype = np.dtype(dtype)
+    if dtype.name not in COMPUTE_DTYPES:
+        raise ValueError(f"지원하지 않는 계산 정밀도입니다: {dtype.name} (가능: {', '.join(COMPUTE_DTYPES)})")
+    return dtype
+
+
+# 표 항목 열: (N, 지점 수, 2), 지점 수가 다른 표는 nan으로 채움
+def _table_column(batch, key, n):
+    arr = np.asarray(batch[key], dtype=float)
+    if arr.size == 0:
+        return np.full((n, 0, 2), np.nan)
+    return np.broadcast_to(arr, (n,) + arr.shape[-2:])
+
+
+def pad_tables(tables):
+    count = max([len(table) for table in tables] + [0])
+    padded = np.full((len(tables), count, 2), np.nan)
+    for i, table in enumerate(tables):
+        if len(table):
+            padded[i, :len(table)] = table
+    return padded
+
+
+# 설정 목록을 열(column) 단위 배치로 변환
+def make_batch(configs):
+    configs = list(configs)
+    batch = {}
+    for key in configs[0]:
+        if key in TABLE_FIELDS:
+            batch[key] = pad_tables([config[key] for config in configs])
+        else:
+            batch[key] = np.array([config[key] for config in configs])
+    if "torque_curve" in batch:
+        batch.update(zip(SPLINE_KEYS, TorqueSpline.spline_coefficients(batch["torque_curve"])))
+    return batch
+
+
+# 행마다 다른 표를 한 번에 선형 보간 (표 범위 밖은 양 끝 값 유지, np.interp와 동일)
+# tables: (N, K, 2) nan 채움 표, x: (N, P)
+def interp_tables(tables, x):
+    knots = tables[:, :, 0]
+    values = tables[:, :, 1]
+    count = np.sum(~np.isnan(knots), axis=1)
+    last = np.maximum(count - 1, 0)[:, None]
+    idx = np.sum(x[:, :, None] >= knots[:, None, :], axis=2) - 1
+    idx = np.clip(idx, 0, np.maximum(last - 1, 0))
+    x0 = np.take_along_axis(knots, idx, axis=1)
+    x1 = np.take_along_axis(knots, np.minimum(idx + 1, last), axis=1)
+    y0 = np.take_along_axis(values, idx, axis=1)
+    y1 = np.take_along_axis(values, np.minimum(idx + 1, last), axis=1)
+    span = np.where(x1 > x0, x1 - x0, 1.0)
+    frac = np.clip((x - x0) / span, 0.0, 1.0)
+    return y0 + (y1 - y0) * frac
+
+
+# 과급 방식별 부스트 1bar당 출력 증가 계수
+def boost_factor(engine_type, forced_type):
+    engine_type = np.asarray(engine_type)
+    forced_type = np.asarray(forced_type)
+    return np.select(
+        [
+            engine_type == "turbo",
+            engine_type == "supercharger",
+            engine_type == "twin-turbo",
+            engine_type == "twincharged",
+        ],
+        [
+            np.where(forced_type == "twin-scroll", 0.95, 1.0),
+            np.where(forced_type == "roots", 0.85, 0.9),
+            0.97,
+            1.05,
+        ],
+        default=0.0,
+    )
+
+
+# 트윈차저 순차 과급 (forced_type "sequential"): 저회전은 슈퍼차저, 고회전은 터보가 담당하고
+# crossover_rpm 중심, crossover_width 폭의 구간에서 두 과급기의 기여가 부드럽게 바뀜
+HANDOFF_SUPERCHARGER = "twin-screw"
+HANDOFF_TURBO = "single"
+CROSSOVER_RPM_RATIO = 0.45  # crossover_rpm이 0이거나 없을 때 레드라인 대비 위치
+CROSSOVER_WIDTH = 1000.0
+
+
+# 터보 기여 비율 (N, P), 0 = 슈퍼차저만, 1 = 터보만
+def handoff_blend(batch, n, redline, rpm):
+    crossover = _column(batch, "crossover_rpm", n, float) if "crossover_rpm" in batch else np.zeros(n)
+    crossover = np.where(crossover > 0, crossover, redline * CROSSOVER_RPM_RATIO)
+    width = _column(batch, "crossover_width", n, float) if "crossover_width" in batch else np.full(n, CROSSOVER_WIDTH)
+    width = np.maximum(width, 1.0)
+    ramp = np.clip((rpm - (crossover - width / 2)[:, None]) / width[:, None], 0.0, 1.0)
+    return ramp * ramp * (3 - 2 * ramp)
+
+
+# 과급 부스트 반영
+def boost_multiplier(engine_type, forced_type, boost):
+    return 1 + np.asarray(boost, dtype=float) * boost_factor(engine_type, forced_type)
+
+
+# RPM별 목표 부스트 (N, P): boost_curve 표가 있으면 표를 보간, 없으면 boost 값 그대로
+def boost_target(batch, n, boost, rpm):
+    target = np.broadcast_to(boost[:, None].astype(rpm.dtype, copy=False), rpm.shape)
+    if "boost_curve" not in batch:
+        return target
+    tables = _table_column(batch, "boost_curve", n)
+    has_table = np.sum(~np.isnan(tables[:, :, 0]), axis=1) > 0
+    if not has_table.any():
+        return target
+    target = np.array(target)
+    target[has_table] = interp_tables(tables[has_table], rpm[has_table])
+    return target
+
+
+# RPM별 부스트 배율 (N, P)
+# boost_model "flat": 목표 부스트를 그대로 사용, "map": 컴프레서 맵으로 부스트 형성과 효율 반영
+def boost_multiplier_curve(batch, n, engine_type, forced_type, boost, redline, rpm):
+    factor = boost_factor(engine_type, forced_type)
+    target = boost_target(batch, n, boost, rpm)
+    curve = 1 + target * factor[:, None].astype(rpm.dtype, copy=False)
+
+    sequential = (engine_type == "twincharged") & (forced_type == "sequential")
+    if sequential.any():
+        blend = handoff_blend(batch, n, redline, rpm)[sequential]
+        sc_factor = boost_factor("supercharger", HANDOFF_SUPERCHARGER)
+        turbo_factor = boost_factor("turbo", HANDOFF_TURBO)
+        curve[sequential] = 1 + target[sequential] * (sc_factor * (1 - blend) + turbo_factor * blend)
+
+    if "boost_model" not in batch:
+        return curve
+    use_map = _column(batch, "boost_model", n) == "map"
+    if not use_map.any():
+        return curve
+
+    single = use_map & ~sequential
+    if single.any():
+        delivered, efficiency = Compressor.boost_curve(forced_type[single], target[single], rpm[single], redline[single])
+        curve[single] = 1 + delivered * factor[single, None] * efficiency / Compressor.REFERENCE_EFFICIENCY
+
+    handoff = use_map & sequential
+    if handoff.any():
+        blend = handoff_blend(batch, n, redline, rpm)[handoff]
+        parts = []
+        for engine, compressor in (("supercharger", HANDOFF_SUPERCHARGER), ("turbo", HANDOFF_TURBO)):
+            kinds = np.full(int(handoff.sum()), compressor)
+            delivered, efficiency = Compressor.boost_curve(kinds, target[handoff], rpm[handoff], redline[handoff])
+            parts.append(1 + delivered * boost_factor(engine, compressor) * efficiency / Compressor.REFERENCE_EFFICIENCY)
+        curve[handoff] = parts[0] * (1 - blend) + parts[1] * blend
+    return curve
+
+
+# 캠 모델 토크 배율 (rows 행만, (행 수, P))
+# 저회전 로브(cam_profile)와 VVL 고회전 로브(vvl_profile)의 체적효율을 VVL 전환 비율(scale)로 섞음
+def cam_gain_curve(batch, n, bore, stroke, vvl_profile, scale, rpm, rows):
+    names = _column(batch, "cam_profile", n)[rows] if "cam_profile" in batch else np.full(int(rows.sum()), "stock")
+    cams, kind = CamModel.resolve_cams(names, CamModel.CAM_PROFILES, "stock")
+    ve = CamModel.volumetric_efficiency(cams, kind, bore[rows], stroke[rows], rpm[rows])
+
+    switched = scale[rows].any(axis=1)
+    if switched.any():
+        cams, kind = CamModel.resolve_cams(vvl_profile[rows][switched], CamModel.VVL_LOBES, "mild")
+        high = CamModel.volumetric_efficiency(cams, kind, bore[rows][switched], stroke[rows][switched], rpm[rows][switched])
+        blend = scale[rows][switched]
+        ve[switched] = ve[switched] * (1 - blend) + high * blend
+    return ve / CAM_REFERENCE_VE
+
+
+# 흡·배기 러너 공명 토크 배율 (N, P), 러너 길이가 모두 0이거나 없으면 None
+# 러너 직경이 0이면 보어 기준 최적 직경 사용
+def runner_resonance(batch, n, bore, rpm):
+    runners = []
+    for side, ratio in (("intake", RunnerModel.INTAKE_DIAMETER_RATIO), ("exhaust", RunnerModel.EXHAUST_DIAMETER_RATIO)):
+        length = _column(batch, f"{side}_runner_length", n, float) if f"{side}_runner_length" in batch else np.zeros(n)
+        diameter = _column(batch, f"{side}_runner_diameter", n, float) if f"{side}_runner_diameter" in batch else np.zeros(n)
+        runners += [length, np.where(diameter > 0, diameter, ratio * bore)]
+    if not (runners[0] > 0).any() and not (runners[2] > 0).any():
+        return None
+    return RunnerModel.resonance_curve(rpm, bore, *runners)
+
+
+# 토크 곡선 모양 (N, P): 기본은 가우시안, torque_model "spline" 행은 제어점 스플라인 (제어점이 없으면 가우시안)
+def torque_shape(batch, n, rpm, peak_torque_rpm, sigma):
+    use = np.zeros(n, dtype=bool)
+    if "torque_model" in batch and "torque_curve" in batch:
+        use = _column(batch, "torque_model", n) == "spline"
+    if not use.any():
+        return np.exp(-((rpm - peak_torque_rpm[:, None]) ** 2) / (2 * sigma[:, None] ** 2))
+
+    if SPLINE_KEYS[0] in batch:
+        knots, coeffs, count = (batch[key] for key in SPLINE_KEYS)
+    else:
+        knots, coeffs, count = TorqueSpline.spline_coefficients(_table_column(batch, "torque_curve", n))
+    use = use & (count > 0)
+    if use.all():
+        return TorqueSpline.evaluate_spline(knots, coeffs, count, rpm)
+    shape = np.exp(-((rpm - peak_torque_rpm[:, None]) ** 2) / (2 * sigma[:, None] ** 2))
+    if use.any():
+        shape[use] = TorqueSpline.evaluate_spline(knots[use], coeffs[use], count[use], rpm[use])
+    return shape
+
+
+# 과급 방식별 (배기 구동, 크랭크 구동) 부스트 비율 — 펌핑 손실 계산용
+BOOST_DRIVE = {
+    "turbo": (1.0, 0.0), "twin-turbo": (1.0, 0.0), "supercharger": (0.0, 1.0), "twincharged": (0.5, 0.5)
+}
+
+
+# 마찰 / 펌핑 손실과 도시 토크·출력 (N, P), 모델의 토크 곡선은 제동 토크로 봄
+def loss_curves(batch, n, bore, stroke, cylinders, layout, engine_type, boost, displacement, rpm, torque):
+    layout_modifier = _lookup(layout, LossModel.LAYOUT_FRICTION_MODIFIER)
+    fmep = LossModel.friction_mep(rpm, bore[:, None], stroke[:, None], cylinders[:, None], layout_modifier[:, None])
+
+    target = boost_target(batch, n, boost, rpm)
+    turbo = _lookup(engine_type, {key: drive[0] for key, drive in BOOST_DRIVE.items()}, 0.0)[:, None]
+    supercharger = _lookup(engine_type, {key: drive[1] for key, drive in BOOST_DRIVE.items()}, 0.0)[:, None]
+    pmep = LossModel.pumping_mep(rpm, stroke[:, None], target * turbo, target * supercharger)
+
+    friction_torque = LossModel.mep_torque(fmep, displacement[:, None])
+    pumping_torque = LossModel.mep_torque(pmep, displacement[:, None])
+    indicated_torque = torque + friction_torque + pumping_torque
+    to_hp = rpm / 7127
+    return {
+        "fmep": fmep,
+        "pmep": pmep,
+        "friction_torque": friction_torque,
+        "pumping_torque": pumping_torque,
+        "indicated_torque": indicated_torque,
+        "friction_hp": friction_torque * to_hp,
+        "pumping_hp": pumping_torque * to_hp,
+        "indicated_hp": indicated_torque * to_hp,
+    }
+
+
+# 여러 설정을 한 번에 계산 (simulate의 벡터화 버전)
+# batch: 항목별 배열(또는 스칼라) 딕셔너리, rpm: 공통 RPM 격자 (없으면 설정별 1000~redline)
+# dtype: 결과 배열 정밀도 (COMPUTE_DTYPES)
+def simulate_batch(batch, rpm=None, points=RPM_POINTS, losses=False, dtype=np.float64):
+    dtype = compute_dtype(dtype)
+    n = _batch_size(batch)
+
+    bore = _column(batch, "bore", n, float) / 1000
+    stroke = _column(batch, "stroke", n, float) / 1000
+    cylinders = _column(batch, "cylinders", n, float)
+    compression = _column(batch, "compression_ratio", n, float)
+    redline = _column(batch, "redline", n, float)
+    boost = _column(batch, "boost", n, float)
+    vvl_rpm = _column(batch, "vvl_rpm", n, float)
+    engine_type = _column(batch, "engine_type", n)
+    forced_type = _column(batch, "forced_type", n)
+    layout = _column(batch, "layout", n)
+    vvl_profile = _column(batch, "vvl_profile", n)
+    if "vvl_enabled" in batch:
+        vvl_enabled = _column(batch, "vvl_enabled", n, bool)
+    else:
+        vvl_enabled = _column(batch, "use_vvl", n) == "yes"
+    ambient = _column(batch, "ambient_condition" if "ambient_condition" in batch else "ambient", n)
+
+    fuel_hp_modifier = _lookup(_column(batch, "fuel_type", n), FUEL_HP_MODIFIER)
+    temp_power_modifier = _lookup(ambient, AMBIENT_POWER_MODIFIER)
+    custom = ambient == "custom"
+    if custom.any():
+        conditions = [
+            _column(batch, key, n, float)[custom] if key in batch else default
+            for key, default in AMBIENT_DEFAULTS.items()
+        ]
+        temp_power_modifier = np.array(temp_power_modifier)
+        temp_power_modifier[custom] = ambient_correction(*conditions)
+
+    # 기본 계산
+    constants = model_constants(batch, n)
+    displacement = (np.pi / 4) * (bore ** 2) * stroke * cylinders * 1000
+    layout_hp_modifier = _lookup(layout, LAYOUT_HP_MODIFIER)
+    layout_torque_rpm_modifier = _lookup(layout, LAYOUT_TORQUE_RPM_MODIFIER)
+    na_base_hp = displacement * compression * constants["base_hp"] * layout_hp_modifier * fuel_hp_modifier * temp_power_modifier
+
+    if rpm is None:
+        rpm = np.linspace(RPM_MIN, redline, points, axis=-1, dtype=dtype)
+    else:
+        rpm = np.broadcast_to(np.asarray(rpm, dtype=dtype), (n, np.shape(rpm)[-1]))
+    boost_curve = boost_multiplier_curve(batch, n, engine_type, forced_type, boost, redline, rpm)
+
+    # VVL 반영 (전환 RPM 이후 300rpm 동안 선형 증가)
+    hp_gain = _lookup(vvl_profile, {key: gain[0] for key, gain in VVL_GAIN.items()}, 0.0)
+    torque_gain = _lookup(vvl_profile, {key: gain[1] for key, gain in VVL_GAIN.items()}, 0.0)
+    scale = np.clip((rpm - vvl_rpm.astype(dtype)[:, None]) / VVL_RAMP_RPM, 0.0, 1.0) * vvl_enabled[:, None]
+    vvl_hp_gain = 1 + scale * hp_gain.astype(dtype)[:, None]
+    vvl_torque_gain = 1 + scale * torque_gain.astype(dtype)[:, None]
+    if "cam_model" in batch:
+        use_cam = _column(batch, "cam_model", n) == "profile"
+        if use_cam.any():
+            vvl_hp_gain[use_cam] = 1.0
+            vvl_torque_gain[use_cam] = cam_gain_curve(batch, n, bore * 1000, stroke * 1000, vvl_profile, scale, rpm, use_cam)
+
+    # 토크 및 출력 계산
+    peak_hp_rpm = np.trunc(redline * constants["peak_hp_ratio"])
+    peak_torque_rpm = np.trunc(redline * constants["peak_torque_ratio"] * layout_torque_rpm_modifier)
+    na_max_torque = na_base_hp * 7127 / peak_hp_rpm
+
+    sigma = (redline - 1000) / constants["sigma_divisor"]
+    shape = torque_shape(batch, n, rpm, peak_torque_rpm.astype(dtype), sigma.astype(dtype)).astype(dtype, copy=False)
+    torque = na_max_torque.astype(dtype)[:, None] * boost_curve.astype(dtype, copy=False) * shape * vvl_torque_gain
+    resonance = runner_resonance(batch, n, bore * 1000, rpm)
+    if resonance is not None:
+        torque = torque * resonance.astype(dtype, copy=False)
+    hp = torque * rpm / 7127 * vvl_hp_gain
+
+    # 최고 출력 및 토크
+    rows = np.arange(n)
+    hp_idx = np.argmax(hp, axis=1)
+    torque_idx = np.argmax(torque, axis=1)
+    result = {
+        "rpm": rpm,
+        "torque": torque,
+        "hp": hp,
+        "displacement": displacement.astype(dtype, copy=False),
+        "max_hp": hp[rows, hp_idx],
+        "max_hp_rpm": rpm[rows, hp_idx],
+        "max_torque": torque[rows, torque_idx],
+        "max_torque_rpm": rpm[rows, torque_idx],
+    }
+    if losses:
+        curves = loss_curves(batch, n, bore * 1000, stroke * 1000, cylinders, layout, engine_type, boost,
+                             displacement, rpm, torque)
+        result.update((key, val.astype(dtype, copy=False)) for key, val in curves.items())
+    return result
+
+
+# 단일 설정 계산
+def simulate_config(config, rpm=None, points=RPM_POINTS, losses=False, dtype=np.float64):
+    result = simulate_batch({key: [val] for key, val in config.items()}, rpm=rpm, points=points, losses=losses,
+                            dtype=dtype)
+    return {key: val[0] for key, val in result.items()}
@@ -10,6 +10,21 @@ import os
 import requests
 import subprocess
 
+# 공용 계산 모듈은 저장소 최상위 폴더에 있음
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from EngineModel import FLOAT_FIELDS, INT_FIELDS, TABLE_FIELDS, COMBO_OPTIONS, parse_config, parse_table, format_table, simulate_config
+from EngineAnalysis import (sensitivity_analysis, plot_tornado, monte_carlo, plot_bands, derate_surface, plot_derate,
+                            runner_sweep, plot_runner_sweep)
+import VersionCheck
+from PresetSchema import SCHEMA_VERSION, load_eng
+from Vehicle import optimize_shifts
+from OperatingMap import MAP_KINDS, operating_map, plot_map
+from ThermalModel import simulate_thermal, lap_profile, plot_thermal
+import CamModel
+from LossModel import plot_losses
+from ResultCache import ResultCache, simulate_cached
+from EngineIndex import INDEX_FILE, INDEX_POINTS, EngineIndex, feature_vectors
+
 class DynoSimulatorApp:
     def __init__(self, root):
         self.root = root
@@ -21,6 +36,8 @@ class DynoSimulatorApp:
         self.canvas = None
         self.figure = plt.Figure(figsize=(7, 5), dpi=100)
         self.ax = self.figure.add_subplot(111)
+        self.result_cache = ResultCache()  # 창을 닫아도 남는 디스크 결과 캐시
+        self.engine_index = None  # 비슷한 엔진 색인 (처음 쓸 때 불러옴)
 
         self.build_gui()
 
@@ -30,56 +47,46 @@ class DynoSimulatorApp:
         if len(sys.argv) > 1:
             file_path = sys.argv[1]
             if os.path.exists(file_path):
-                with open(file_path, "r", encoding="utf-8") as f:
-                    try:
-                        data = json.load(f)
-                        for key, value in data.items():
-                            if key in self.inputs:
-                                widget = self.inputs[key]
-                                if isinstance(widget, ttk.Combobox):
-                                    widget.set(value)
-                                else:
-                                    widget.delete(0, tk.END)
-                                    widget.insert(0, str(value))
-                    except json.JSONDecodeError as e:
-                        messagebox.showerror("파일 형식 오류", f"유효한 .eng 파일이 아닙니다.\n{e}")
+                try:
+                    data, problems = load_eng(file_path)
+                    if problems:
+                        messagebox.showerror("파일 형식 오류", "유효한 .eng 파일이 아닙니다.\n" + "\n".join(problems))
+                    else:
+                        self.apply_preset(data)
+                except ValueError as e:
+                    messagebox.showerror("파일 형식 오류", f"유효한 .eng 파일이 아닙니다.\n{e}")
 
     def check_for_update_st(self):
         try:
-            url = "https://raw.githubusercontent.com/GreenRiceCake/PyEngineSimulator/main/version.json"
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = response.json()
-                latest_version = data["version"]
-
-                if self.current_version < latest_version:
-                    # 버전이 낮으면 업데이트 프로그램 실행
-                    subprocess.Popen(["Updater.exe"])
-                else:
-                    print("최신 버전입니다.")
+            data = VersionCheck.get_update_info()
+            latest_version = data["version"]
+
+            if self.current_version < latest_version:
+                # 버전이 낮으면 업데이트 프로그램 실행 (Updater는 방금 받은 캐시를 재사용)
+                subprocess.Popen(["Updater.exe"])
             else:
-                print("업데이트 서버에 연결할 수 없습니다.")
+                print("최신 버전입니다.")
 
+        except requests.RequestException:
+            print("업데이트 서버에 연결할 수 없습니다.")
         except Exception as e:
             print(f"업데이트 확인 중 오류 발생: {e}")
 
 
     def check_for_update(self):
         try:
-            url = "https://raw.githubusercontent.com/GreenRiceCake/PyEngineSimulator/main/version.json"
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = response.json()
-                latest_version = data["version"]
-
-                if self.current_version < latest_version:
-                    # 버전이 낮으면 업데이트 프로그램 실행
-                    subprocess.Popen(["Updater.exe"])
-                else:
-                    messagebox.showinfo("Updater", f"최신 버전입니다.")
+            # 수동 확인은 캐시 유효 시간과 관계없이 서버에 재검증 요청
+            data = VersionCheck.get_update_info(max_age=0)
+            latest_version = data["version"]
+
+            if self.current_version < latest_version:
+                # 버전이 낮으면 업데이트 프로그램 실행
+                subprocess.Popen(["Updater.exe"])
             else:
-                messagebox.showinfo("Updater", f"업데이트 서버에 연결할 수 없습니다.")
+                messagebox.showinfo("Updater", f"최신 버전입니다.")
 
+        except requests.RequestException:
+            messagebox.showinfo("Updater", f"업데이트 서버에 연결할 수 없습니다.")
         except Exception as e:
             messagebox.showerror("Updater", f"업데이트 확인 중 오류 발생:\n{e}")
 
@@ -101,6 +108,16 @@ class DynoSimulatorApp:
         # Edit 메뉴
         edit_menu = tk.Menu(menubar, tearoff=0)
         edit_menu.add_command(label="Simulate", command=self.simulate)
+        edit_menu.add_command(label="Sensitivity", command=self.open_sensitivity)
+        edit_menu.add_command(label="Monte Carlo", command=self.open_monte_carlo)
+        edit_menu.add_command(label="Acceleration", command=self.show_acceleration)
+        edit_menu.add_command(label="Operating Map", command=self.open_operating_map)
+        edit_menu.add_command(label="Altitude Sweep", command=self.open_altitude_sweep)
+        edit_menu.add_command(label="Thermal Run", command=self.open_thermal_run)
+        edit_menu.add_command(label="Cam Profile", command=self.open_cam_profile)
+        edit_menu.add_command(label="Runner Sweep", command=self.open_runner_sweep)
+        edit_menu.add_command(label="Loss Breakdown", command=self.open_loss_breakdown)
+        edit_menu.add_command(label="Similar Engines", command=self.open_similar_engines)
         edit_menu.add_command(label="Settings", command=self.open_settings)
         menubar.add_cascade(label="Edit", menu=edit_menu)
 
@@ -131,30 +148,58 @@ class DynoSimulatorApp:
             ("engine_type", "Engine Type (na/turbo/supercharger/...)"),
             ("forced_type", "Forced Induction Type"),
             ("boost", "Boost (bar)"),
+            ("boost_curve", "Boost Curve (rpm:bar, ...)"),
+            ("crossover_rpm", "Twincharged Crossover RPM (0 = auto)"),
+            ("crossover_width", "Twincharged Crossover Width (rpm)"),
             ("layout", "Layout (inline/v/boxer)"),
             ("fuel_type", "Fuel Type"),
-            ("ambient", "Ambient (normal/cold/hot)"),
+            ("ambient", "Ambient (normal/cold/hot/custom)"),
+            ("ambient_temp", "Ambient Temp (°C, custom)"),
+            ("ambient_pressure", "Ambient Pressure (kPa, 0 = from altitude)"),
+            ("humidity", "Humidity (%)"),
+            ("altitude", "Altitude (m)"),
             ("use_vvl", "Use VVL (yes/no)"),
             ("vvl_rpm", "VVL RPM"),
             ("vvl_profile", "VVL Profile (mild/aggressive)"),
+            ("boost_model", "Boost Model (flat/map)"),
+            ("cam_model", "Cam Model (simple/profile)"),
+            ("cam_profile", "Cam Profile (stock/street/sport/race)"),
+            ("intake_runner_length", "Intake Runner Length (mm, 0 = off)"),
+            ("intake_runner_diameter", "Intake Runner Diameter (mm, 0 = auto)"),
+            ("exhaust_runner_length", "Exhaust Runner Length (mm, 0 = off)"),
+            ("exhaust_runner_diameter", "Exhaust Runner Diameter (mm, 0 = auto)"),
+            ("torque_model", "Torque Model (gaussian/spline)"),
+            ("torque_curve", "Torque Curve (rpm:ratio, ...)"),
+            ("calibration", "Calibration (blank = default)"),
         ]
 
-        combo_options = {
-            "engine_type": ["na", "turbo", "supercharger", "twin-turbo", "twincharged"],
-            "forced_type": ["na", "single", "twin-scroll", "variable-geometry", "roots", "centrifugal", "twin-screw"],
-            "layout": ["inline", "v", "boxer"],
-            "fuel_type": ["gasoline", "high-octane", "diesel", "e85", "methanol", "lpg"],
-            "ambient": ["normal", "cold", "hot"],
-            "use_vvl": ["yes", "no"],
-            "vvl_profile": ["mild", "aggressive"]
+        combo_options = COMBO_OPTIONS  # 모델과 같은 선택지 목록 사용
+        combo_defaults = {"boost_model": "flat", "cam_model": "simple", "cam_profile": "stock", "torque_model": "gaussian"}
+
+        entry_defaults = {
+            "crossover_rpm": "0", "crossover_width": "1000",
+            "ambient_temp": "25", "ambient_pressure": "0", "humidity": "0", "altitude": "0",
+            "intake_runner_length": "0", "intake_runner_diameter": "0",
+            "exhaust_runner_length": "0", "exhaust_runner_diameter": "0"
         }
 
-        for key, label in fields:
-            ttk.Label(left_frame, text=label).pack()
+        # 입력 항목이 많아 두 줄로 배치
+        field_frame = ttk.Frame(left_frame)
+        field_frame.pack(fill=tk.X)
+        columns = [ttk.Frame(field_frame), ttk.Frame(field_frame)]
+        for column in columns:
+            column.pack(side=tk.LEFT, fill=tk.Y, anchor=tk.N, padx=5)
+        split = (len(fields) + 1) // 2
+
+        for i, (key, label) in enumerate(fields):
+            parent = columns[0] if i < split else columns[1]
+            ttk.Label(parent, text=label).pack()
             if key in combo_options:
-                cb = ttk.Combobox(left_frame, values=combo_options[key], state="readonly")
+                cb = ttk.Combobox(parent, values=combo_options[key], state="readonly")
                 cb.pack(fill=tk.X)
                 self.inputs[key] = cb
+                if key in combo_defaults:
+                    cb.set(combo_defaults[key])
 
                 if key == "use_vvl":
                     cb.bind("<<ComboboxSelected>>", lambda e: self.update_vvl_fields())
@@ -162,9 +207,11 @@ class DynoSimulatorApp:
                     cb.bind("<<ComboboxSelected>>", lambda e: self.update_forced_type_field())
                     cb.bind("<<ComboboxSelected>>", self.on_engine_type_change)
             else:
-                entry = ttk.Entry(left_frame)
+                entry = ttk.Entry(parent)
                 entry.pack(fill=tk.X)
                 self.inputs[key] = entry
+                if key in entry_defaults:
+                    entry.insert(0, entry_defaults[key])
 
         ttk.Button(left_frame, text="Simulate", command=self.simulate).pack(fill=tk.X, pady=5)        
 
@@ -200,21 +247,28 @@ class DynoSimulatorApp:
             except Exception as e:
                 messagebox.showerror("저장 실패", f"그래프 저장 중 오류 발생:\n{e}")
 
+    def apply_preset(self, preset_data):
+        for key, value in preset_data.items():
+            if key in self.inputs:
+                widget = self.inputs[key]
+                if key in TABLE_FIELDS:
+                    value = format_table(value)
+                if isinstance(widget, ttk.Combobox):
+                    widget.set(value)
+                else:
+                    widget.delete(0, tk.END)
+                    widget.insert(0, str(value))
+
     def load_preset(self):
-        # 프리셋 불러오기
+        # 프리셋 불러오기 (이전 형식은 최신 스키마로 변환 후 검사)
         file_path = askopenfilename(filetypes=[("Engine Preset Files", "*.eng"), ("All Files", "*.*")])
         if file_path:
             try:
-                with open(file_path, 'r') as f:
-                    preset_data = json.load(f)
-                for key, value in preset_data.items():
-                    if key in self.inputs:
-                        widget = self.inputs[key]
-                        if isinstance(widget, ttk.Combobox):
-                            widget.set(value)
-                        else:
-                            widget.delete(0, tk.END)
-                            widget.insert(0, str(value))
+                preset_data, problems = load_eng(file_path)
+                if problems:
+                    messagebox.showerror("불러오기 실패", "프리셋 파일에 문제가 있습니다:\n" + "\n".join(problems))
+                    return
+                self.apply_preset(preset_data)
                 messagebox.showinfo("Preset Loaded", f"프리셋 파일이 성공적으로 불러와졌습니다.")
             except Exception as e:
                 messagebox.showerror("불러오기 실패", f"파일을 불러오는 중 오류가 발생했습니다:\n{e}")
@@ -224,7 +278,10 @@ class DynoSimulatorApp:
         config = {}
         for key, widget in self.inputs.items():
             val = widget.get()
-            config[key] = val.lower() if isinstance(widget, ttk.Combobox) else float(val) if key in ["bore", "stroke", "compression_ratio", "boost", "redline", "vvl_rpm"] else int(val) if key == "cylinders" else val
+            config[key] = val.lower() if isinstance(widget, ttk.Combobox) else float(val) if key in FLOAT_FIELDS else int(val) if key in INT_FIELDS else val
+        for key in TABLE_FIELDS:
+            config[key] = parse_table(config[key])
+        config["schema_version"] = SCHEMA_VERSION
 
         file_path = asksaveasfilename(defaultextension=".eng", filetypes=[("Engine Preset Files", "*.eng"), ("All Files", "*.*")])
         if file_path:
@@ -267,12 +324,22 @@ class DynoSimulatorApp:
             "🔸 Engine Type: na / turbo / supercharger / twin-turbo / twincharged\n"
             "🔸 Fuel Type: gasoline / high-octane / diesel / e85 / methanol / lpg\n"
             "🔸 Layout: inline / v / boxer\n"
-            "🔸 Ambient: 주행 환경\n"
+            "🔸 Ambient: 주행 환경 (custom 선택 시 온도/기압/습도/고도로 SAE 보정)\n"
             "🔸 VVL: 가변 밸브 리프트\n"
             "🔸 VVL Profile: mild (완만), aggressive (고출력)\n"
             "🔸 VVL RPM: 전환 시점\n"
             "🔸 Forced Induction Type: 여러 과급기 종류 선택\n"
-            "🔸 Boost Pressure: 과급 압력 (bar 단위)\n\n"
+            "🔸 Boost Pressure: 과급 압력 (bar 단위)\n"
+            "🔸 Twincharged Crossover: sequential 선택 시 슈퍼차저 → 터보 전환 RPM과 전환 구간 폭\n"
+            "🔸 Boost Curve: RPM별 목표 부스트 (예: 2500:0.6, 4000:1.2, 7000:0.9), 비우면 Boost 값 사용\n"
+            "🔸 Boost Model: flat (RPM 무관 고정), map (컴프레서 맵으로 RPM별 부스트/효율 반영)\n"
+            "🔸 Cam Model: simple (VVL 고정 증가량), profile (캠 리프트 곡선으로 RPM별 체적효율 계산)\n"
+            "🔸 Cam Profile: 저회전 캠 (VVL 사용 시 전환 RPM 이후 VVL Profile 로브로 바뀜)\n"
+            "🔸 Runner Length / Diameter: 흡·배기 러너 공명으로 토크 곡선에 봉우리/골 추가 (길이 0 = 사용 안 함)\n"
+            "🔸 Torque Model: gaussian (기본 곡선), spline (Torque Curve 제어점을 잇는 곡선)\n"
+            "🔸 Torque Curve: RPM별 토크 비율 제어점 (예: 1500:0.7, 2500:1.0, 5500:1.0, 7000:0.8), 1.0 = 기본 모델 최대 토크\n"
+            "🔸 Calibration: DynoFit.py로 dyno 로그에 맞춘 상수 세트 이름 (calibrations/<이름>.json), 비우면 기본값\n\n"
+            "🔸 Similar Engines: 엔진 색인(EngineIndex.py build/add로 생성)에서 출력/토크/배기량/곡선 모양이 가장 비슷한 엔진 찾기\n\n"
             "⚙️ 'Simulate' 버튼으로 시뮬레이션 실행\n📋 'Load Preset'으로 예시 엔진 불러오기"
         )
         messagebox.showinfo("도움말", help_text)
@@ -294,8 +361,8 @@ class DynoSimulatorApp:
             self.inputs["boost"].config(state="normal")
 
         elif engine_type == "twincharged":
-            forced_type_cb["values"] = ["single", "twin-scroll", "variable-geometry", "roots", "centrifugal", "twin-screw"]
-            forced_type_cb.set("single")  # twincharged는 아무거나 기본 선택
+            forced_type_cb["values"] = ["sequential", "single", "twin-scroll", "variable-geometry", "roots", "centrifugal", "twin-screw"]
+            forced_type_cb.set("sequential")  # 저회전 슈퍼차저 → 고회전 터보 전환
             forced_type_cb.config(state="readonly")
             self.inputs["boost"].config(state="normal")
 
@@ -340,21 +407,347 @@ class DynoSimulatorApp:
             self.inputs["boost"].config(state="disabled")
 
 
-    def simulate(self):
+    def collect_config(self):
+        # 입력값 수집 및 전처리
+        return parse_config({key: widget.get() for key, widget in self.inputs.items()})
+
+    def open_sensitivity(self):
         try:
-            # 입력값 수집 및 전처리
-            config = {}
-            for key, widget in self.inputs.items():
-                val = widget.get()
-                if key in ["bore", "stroke", "compression_ratio", "boost", "redline", "vvl_rpm"]:
-                    config[key] = float(val)
-                elif key == "cylinders":
-                    config[key] = int(val)
-                else:
-                    config[key] = val.lower()
+            report = sensitivity_analysis(self.collect_config())
+        except Exception as e:
+            messagebox.showerror("오류 발생", f"입력값이 잘못되었거나 계산 중 문제가 발생했습니다.\n{e}")
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title("민감도 분석")
+        window.geometry("900x500")
+
+        figure = plt.Figure(figsize=(9, 5), dpi=100)
+        hp_ax = figure.add_subplot(121)
+        torque_ax = figure.add_subplot(122)
+        plot_tornado(hp_ax, report, "hp")
+        plot_tornado(torque_ax, report, "torque")
+        hp_ax.set_title(f"Peak HP ({int(report['base_hp'])} HP)")
+        torque_ax.set_title(f"Peak Torque ({int(report['base_torque'])} Nm)")
+        figure.tight_layout()
+
+        canvas = FigureCanvasTkAgg(figure, master=window)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        canvas.draw()
+
+    def open_monte_carlo(self):
+        samples = simpledialog.askinteger("몬테카를로 분석", "표본 수를 입력하세요:", initialvalue=20000, minvalue=100, parent=self.root)
+        if not samples:
+            return
+        try:
+            report = monte_carlo(self.collect_config(), samples=samples)
+        except Exception as e:
+            messagebox.showerror("오류 발생", f"입력값이 잘못되었거나 계산 중 문제가 발생했습니다.\n{e}")
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title("몬테카를로 공차 분석")
+        window.geometry("900x550")
+
+        figure = plt.Figure(figsize=(9, 5.5), dpi=100)
+        ax = figure.add_subplot(111)
+        plot_bands(ax, report)
+        hp_band = report["max_hp"]
+        torque_band = report["max_torque"]
+        ax.set_title(f"{samples} samples - Peak HP P5/P50/P95: {int(hp_band[5])}/{int(hp_band[50])}/{int(hp_band[95])}, "
+                     f"Peak Torque: {int(torque_band[5])}/{int(torque_band[50])}/{int(torque_band[95])}", fontsize=9)
+        ax.grid(True, color="#cccccc")
+
+        canvas = FigureCanvasTkAgg(figure, master=window)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        canvas.draw()
+
+    def show_acceleration(self):
+        try:
+            config = self.collect_config()
+            result = simulate_config(config)
+            shift_rpms = np.linspace(config["redline"] * 0.7, config["redline"], 16)
+            best = optimize_shifts(result["rpm"], result["torque"], shift_rpms)
+        except Exception as e:
+            messagebox.showerror("오류 발생", f"입력값이 잘못되었거나 계산 중 문제가 발생했습니다.\n{e}")
+            return
+
+        run = best["best"]
+        messagebox.showinfo(
+            "가속 성능",
+            f"기본 차량 기준 (1300kg, {len(best['gear_ratios'])}단)\n\n"
+            f"0-100 km/h: {run['time_100']:.2f} s\n"
+            f"400 m: {run['time_quarter']:.2f} s @ {run['trap_speed']:.0f} km/h\n"
+            f"최적 변속 RPM: {int(best['shift_rpm'])}"
+        )
+
+    def open_operating_map(self):
+        try:
+            config = self.collect_config()
+        except Exception as e:
+            messagebox.showerror("오류 발생", f"입력값이 잘못되었거나 계산 중 문제가 발생했습니다.\n{e}")
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title("운전 맵")
+        window.geometry("900x650")
+
+        controls = ttk.Frame(window)
+        controls.pack(fill=tk.X, padx=10, pady=5)
+        ttk.Label(controls, text="Map").pack(side=tk.LEFT)
+        kind_cb = ttk.Combobox(controls, values=list(MAP_KINDS), state="readonly", width=12)
+        kind_cb.set("bsfc")
+        kind_cb.pack(side=tk.LEFT, padx=5)
+        ttk.Label(controls, text="RPM points").pack(side=tk.LEFT)
+        rpm_entry = ttk.Entry(controls, width=6)
+        rpm_entry.insert(0, "200")
+        rpm_entry.pack(side=tk.LEFT, padx=5)
+        ttk.Label(controls, text="Load points").pack(side=tk.LEFT)
+        load_entry = ttk.Entry(controls, width=6)
+        load_entry.insert(0, "100")
+        load_entry.pack(side=tk.LEFT, padx=5)
+
+        figure = plt.Figure(figsize=(9, 6), dpi=100)
+        canvas = FigureCanvasTkAgg(figure, master=window)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+        def draw(event=None):
+            try:
+                result = operating_map(config, int(rpm_entry.get()), int(load_entry.get()))
+            except Exception as e:
+                messagebox.showerror("오류 발생", f"맵 계산 중 문제가 발생했습니다.\n{e}", parent=window)
+                return
+            figure.clear()
+            plot_map(figure, figure.add_subplot(111), result, kind_cb.get())
+            canvas.draw()
+
+        kind_cb.bind("<<ComboboxSelected>>", draw)
+        ttk.Button(controls, text="Draw", command=draw).pack(side=tk.LEFT, padx=5)
+        draw()
+
+    def open_altitude_sweep(self):
+        try:
+            config = self.collect_config()
+            surface = derate_surface(config, np.linspace(0, 4000, 201), np.linspace(-30, 50, 161), config.get("humidity", 0.0))
+        except Exception as e:
+            messagebox.showerror("오류 발생", f"입력값이 잘못되었거나 계산 중 문제가 발생했습니다.\n{e}")
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title("고도 / 온도 출력 보정")
+        window.geometry("800x600")
+
+        figure = plt.Figure(figsize=(8, 6), dpi=100)
+        ax = figure.add_subplot(111)
+        plot_derate(figure, ax, surface)
+        ax.set_title("SAE J1349 Power Correction")
 
-            config["vvl_enabled"] = (config["use_vvl"] == "yes")
-            config["ambient_condition"] = config["ambient"]
+        canvas = FigureCanvasTkAgg(figure, master=window)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        canvas.draw()
+
+    def open_thermal_run(self):
+        try:
+            config = self.collect_config()
+            minutes = simpledialog.askinteger("열 부하 주행", "서킷 주행 시간(분)을 입력하세요.", initialvalue=10,
+                                              minvalue=1, maxvalue=120, parent=self.root)
+            if minutes is None:
+                return
+            result = simulate_config(config, points=200)
+            load, speed = lap_profile(minutes * 60.0)
+            history = simulate_thermal(result["max_hp"], result["displacement"] / 1000, config["engine_type"],
+                                       config["forced_type"], config["boost"], load, speed, minutes * 60.0,
+                                       ambient_temp=config.get("ambient_temp", 25.0))
+        except Exception as e:
+            messagebox.showerror("오류 발생", f"입력값이 잘못되었거나 계산 중 문제가 발생했습니다.\n{e}")
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title("열 부하 주행")
+        window.geometry("800x600")
+
+        figure = plt.Figure(figsize=(8, 6), dpi=100)
+        ax_temp = figure.add_subplot(211)
+        ax_power = figure.add_subplot(212, sharex=ax_temp)
+        plot_thermal(ax_temp, ax_power, history)
+        derate_time = history["derate_time"][0]
+        note = "no derate" if np.isnan(derate_time) else f"derate from {derate_time / 60:.1f} min"
+        ax_temp.set_title(f"Max coolant {history['max_coolant'][0]:.1f}°C, "
+                          f"mean power {history['mean_power_ratio'][0] * 100:.0f}%, {note}")
+
+        canvas = FigureCanvasTkAgg(figure, master=window)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        canvas.draw()
+
+    def open_cam_profile(self):
+        try:
+            config = self.collect_config()
+            low = CamModel.CAM_PROFILES.get(config.get("cam_profile", "stock"), CamModel.CAM_PROFILES["stock"])
+            high = CamModel.VVL_LOBES.get(config["vvl_profile"], CamModel.VVL_LOBES["mild"]) if config["vvl_enabled"] else None
+            cams = [low] if high is None else [low, high]
+            rpm = np.linspace(1000, config["redline"], 300)[None, :].repeat(len(cams), axis=0)
+            ve = CamModel.volumetric_efficiency(cams, np.arange(len(cams)), [config["bore"]] * len(cams),
+                                                [config["stroke"]] * len(cams), rpm)
+        except Exception as e:
+            messagebox.showerror("오류 발생", f"입력값이 잘못되었거나 계산 중 문제가 발생했습니다.\n{e}")
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title("캠 프로파일")
+        window.geometry("900x500")
+
+        figure = plt.Figure(figsize=(9, 5), dpi=100)
+        lift_ax = figure.add_subplot(121)
+        ve_ax = figure.add_subplot(122)
+        CamModel.plot_lift(lift_ax, low, "Base", "tab:blue")
+        ve_ax.plot(rpm[0], ve[0] * 100, color="tab:blue", label="Base")
+        if high is not None:
+            CamModel.plot_lift(lift_ax, high, "VVL", "tab:red")
+            ve_ax.plot(rpm[1], ve[1] * 100, color="tab:red", label="VVL")
+            ve_ax.axvline(config["vvl_rpm"], color="gray", linestyle=":")
+        lift_ax.legend(fontsize=7)
+        lift_ax.set_title("Valve Lift")
+        ve_ax.set_xlabel("RPM")
+        ve_ax.set_ylabel("Volumetric efficiency (%)")
+        ve_ax.set_title("Volumetric Efficiency")
+        ve_ax.legend()
+        ve_ax.grid(True)
+        figure.tight_layout()
+
+        canvas = FigureCanvasTkAgg(figure, master=window)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        canvas.draw()
+
+    def open_runner_sweep(self):
+        try:
+            config = self.collect_config()
+            report = runner_sweep(config, np.arange(150, 810, 10), np.arange(300, 1220, 20))
+        except Exception as e:
+            messagebox.showerror("오류 발생", f"입력값이 잘못되었거나 계산 중 문제가 발생했습니다.\n{e}")
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title("러너 길이 스윕")
+        window.geometry("1000x500")
+
+        figure = plt.Figure(figsize=(10, 5), dpi=100)
+        sweep_ax = figure.add_subplot(121)
+        torque_ax = figure.add_subplot(122)
+        plot_runner_sweep(figure, sweep_ax, report)
+        sweep_ax.set_title(f"Best: intake {report['best_intake']:.0f} mm, exhaust {report['best_exhaust']:.0f} mm")
+
+        current = simulate_config(config, rpm=report["rpm"])
+        torque_ax.plot(report["rpm"], current["torque"], color="gray", label="Current")
+        torque_ax.plot(report["rpm"], report["best_torque"], color="blue", label="Best spread")
+        torque_ax.set_xlabel("RPM")
+        torque_ax.set_ylabel("Torque (Nm)")
+        torque_ax.legend()
+        torque_ax.grid(True)
+        figure.tight_layout()
+
+        canvas = FigureCanvasTkAgg(figure, master=window)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        canvas.draw()
+
+    def open_loss_breakdown(self):
+        try:
+            result = simulate_config(self.collect_config(), points=300, losses=True)
+        except Exception as e:
+            messagebox.showerror("오류 발생", f"입력값이 잘못되었거나 계산 중 문제가 발생했습니다.\n{e}")
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title("마찰 / 펌핑 손실")
+        window.geometry("1000x500")
+
+        figure = plt.Figure(figsize=(10, 5), dpi=100)
+        power_ax = figure.add_subplot(121)
+        mep_ax = figure.add_subplot(122)
+        plot_losses(power_ax, result)
+        idx = int(np.argmax(result["hp"]))
+        power_ax.set_title(f"Mechanical efficiency at peak power: {result['hp'][idx] / result['indicated_hp'][idx] * 100:.1f}%")
+
+        mep_ax.plot(result["rpm"], result["fmep"], color="tab:red", label="FMEP")
+        mep_ax.plot(result["rpm"], result["pmep"], color="tab:orange", label="PMEP")
+        mep_ax.set_xlabel("RPM")
+        mep_ax.set_ylabel("Mean effective pressure (bar)")
+        mep_ax.legend()
+        mep_ax.grid(True)
+        figure.tight_layout()
+
+        canvas = FigureCanvasTkAgg(figure, master=window)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        canvas.draw()
+
+    def open_similar_engines(self):
+        try:
+            config = self.collect_config()
+            result = simulate_config(config, points=INDEX_POINTS)
+            if self.engine_index is None:
+                if not os.path.exists(INDEX_FILE):
+                    messagebox.showerror("오류 발생", "엔진 색인이 없습니다.\n"
+                                         "python EngineIndex.py build <기준 .eng> 또는 add <프리셋.eng> 로 먼저 만드세요.")
+                    return
+                self.engine_index = EngineIndex.load(INDEX_FILE)
+            distances, ids = self.engine_index.query(feature_vectors(result), k=8)
+        except Exception as e:
+            messagebox.showerror("오류 발생", f"입력값이 잘못되었거나 계산 중 문제가 발생했습니다.\n{e}")
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title("비슷한 엔진")
+        window.geometry("1000x600")
+
+        columns = ("label", "distance", "hp", "torque", "displacement")
+        table = ttk.Treeview(window, columns=columns, show="headings", height=8)
+        for column, heading in zip(columns, ["Engine", "Distance", "Peak HP @ RPM", "Peak Torque @ RPM", "Displacement"]):
+            table.heading(column, text=heading)
+        table.pack(fill=tk.X, padx=10, pady=5)
+        neighbours = [self.engine_index.entry(i) for i in ids]
+        for distance, entry in zip(distances, neighbours):
+            features = entry["features"]
+            table.insert("", tk.END, values=(
+                entry["label"], f"{distance:.2f}",
+                f"{features['max_hp']:.0f} HP @ {features['max_hp_rpm']:.0f}",
+                f"{features['max_torque']:.0f} Nm @ {features['max_torque_rpm']:.0f}",
+                f"{features['displacement']:.2f} L"))
+
+        # 설정이 저장된 이웃은 다시 계산해 토크 곡선을 겹쳐 그림
+        figure = plt.Figure(figsize=(10, 4), dpi=100)
+        ax = figure.add_subplot(111)
+        ax.plot(result["rpm"], result["torque"], color="black", linewidth=2, label="Current")
+        for entry in neighbours:
+            if entry["config"] is not None:
+                other = simulate_config(parse_config(entry["config"]), points=INDEX_POINTS)
+                ax.plot(other["rpm"], other["torque"], alpha=0.7, label=entry["label"])
+        ax.set_title(f"{len(self.engine_index)} engines indexed")
+        ax.set_xlabel("RPM")
+        ax.set_ylabel("Torque (Nm)")
+        ax.legend(fontsize=8)
+        ax.grid(True)
+        figure.tight_layout()
+
+        def add_current():
+            label = simpledialog.askstring("엔진 색인", "색인에 추가할 이름을 입력하세요:", parent=window)
+            if not label:
+                return
+            try:
+                self.engine_index.insert(feature_vectors(result), [label], [config])
+                self.engine_index.save(INDEX_FILE)
+            except Exception as e:
+                messagebox.showerror("저장 실패", f"엔진 색인을 저장하는 중 오류가 발생했습니다.\n{e}", parent=window)
+                return
+            messagebox.showinfo("엔진 색인", f"'{label}' 추가 (전체 {len(self.engine_index)}개)", parent=window)
+
+        ttk.Button(window, text="Add Current Engine", command=add_current).pack(pady=5)
+
+        canvas = FigureCanvasTkAgg(figure, master=window)
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        canvas.draw()
+
+    def simulate(self):
+        try:
+            config = self.collect_config()
 
             # VVL 입력칸 활성화/비활성화 및 값 설정
             if config["vvl_enabled"]:
@@ -376,11 +769,7 @@ class DynoSimulatorApp:
                 self.inputs["forced_type"].config(state="disabled")
 
 
-            # 단위 변환 및 변수 초기화
-            bore = config["bore"] / 1000
-            stroke = config["stroke"] / 1000
-            cylinders = config["cylinders"]
-            compression = config["compression_ratio"]
+            # 변수 초기화
             redline = config["redline"]
             engine_type = config["engine_type"]
             layout = config["layout"]
@@ -389,69 +778,18 @@ class DynoSimulatorApp:
             vvl_rpm = config["vvl_rpm"]
             vvl_profile = config["vvl_profile"]
             ambient_condition = config["ambient_condition"]
-            forced_type = config["forced_type"]
-            boost = config["boost"]
-
-            # 연료 및 온도 계수
-            fuel_hp_modifier = {
-                "gasoline": 1.00, "high-octane": 1.05, "diesel": 0.85,
-                "e85": 1.10, "methanol": 1.12, "lpg": 0.92
-            }.get(fuel_type, 1.0)
-
-            temp_power_modifier = 1.0
-            if ambient_condition == "cold":
-                temp_power_modifier = 0.92
-            elif ambient_condition == "hot":
-                temp_power_modifier = 0.95
-
-            # 기본 계산
-            displacement = (np.pi / 4) * (bore ** 2) * stroke * cylinders * 1000
-            layout_hp_modifier = {"inline": 1.0, "v": 1.05, "boxer": 0.97}.get(layout, 1.0)
-            layout_torque_rpm_modifier = {"inline": 1.0, "v": 1.1, "boxer": 0.85}.get(layout, 1.0)
-            na_base_hp = displacement * compression * 10 * layout_hp_modifier * fuel_hp_modifier * temp_power_modifier
-
-            # 과급 부스트 반영
-            boost_multiplier = 1.0
-            if engine_type == 'turbo':
-                boost_multiplier = 1 + boost * (0.95 if forced_type == 'twin-scroll' else 1.0)
-            elif engine_type == 'supercharger':
-                boost_multiplier = 1 + boost * (0.85 if forced_type == 'roots' else 0.9)
-            elif engine_type == 'twin-turbo':
-                boost_multiplier = 1 + boost * 0.97
-            elif engine_type == 'twincharged':
-                boost_multiplier = 1 + boost * 1.05
-
-            max_hp_base = na_base_hp * boost_multiplier
-            rpm = np.linspace(1000, redline, 1000)
-
-            # VVL 반영
-            vvl_hp_gain = np.ones_like(rpm)
-            vvl_torque_gain = np.ones_like(rpm)
-            if vvl_enabled:
-                for i in range(len(rpm)):
-                    if rpm[i] > vvl_rpm:
-                        scale = min((rpm[i] - vvl_rpm) / 300, 1.0)
-                        if vvl_profile == "mild":
-                            vvl_hp_gain[i] += scale * 0.05
-                            vvl_torque_gain[i] += scale * 0.05
-                        elif vvl_profile == "aggressive":
-                            vvl_hp_gain[i] += scale * 0.10
-                            vvl_torque_gain[i] += scale * 0.08
 
             # 토크 및 출력 계산
-            peak_hp_rpm = int(redline * 0.85)
-            peak_torque_rpm = int(redline * 0.65 * layout_torque_rpm_modifier)
-            max_torque = max_hp_base * 7127 / peak_hp_rpm
-
-            sigma = (redline - 1000) / 3.5
-            torque = max_torque * np.exp(-((rpm - peak_torque_rpm) ** 2) / (2 * sigma ** 2)) * vvl_torque_gain
-            hp = torque * rpm / 7127 * vvl_hp_gain
+            result = simulate_cached([config], cache=self.result_cache)[0]
+            rpm = result["rpm"]
+            torque = result["torque"]
+            hp = result["hp"]
 
             # 최고 출력 및 토크
-            max_hp_val = np.max(hp)
-            max_hp_rpm_actual = rpm[np.argmax(hp)]
-            max_torque_val = np.max(torque)
-            max_torque_rpm_actual = rpm[np.argmax(torque)]
+            max_hp_val = result["max_hp"]
+            max_hp_rpm_actual = result["max_hp_rpm"]
+            max_torque_val = result["max_torque"]
+            max_torque_rpm_actual = result["max_torque_rpm"]
 
             # 그래프 초기화 및 출력
             self.ax.clear()
@@ -0,0 +1,64 @@
+import numpy as np
+
+# 마찰(FMEP) / 펌핑(PMEP) 손실 모델
+# 기존 출력 곡선을 제동(brake) 값으로 보고, 손실을 더해 도시(indicated) 값을 만듦
+# 기준 형상(보어 86 × 스트로크 86, 직렬 4기통)에서 FMEP = 0.97 + 0.15 k + 0.05 k^2 bar (k = rpm / 1000)
+REF_BORE = 86.0       # mm
+REF_STROKE = 86.0     # mm
+REF_CYLINDERS = 4
+
+# 레이아웃별 마찰 배율 (V형/수평대향은 헤드와 캠 구동계가 두 벌)
+LAYOUT_FRICTION_MODIFIER = {"inline": 1.0, "v": 1.05, "boxer": 1.03}
+
+# FMEP 항목 (bar)
+VALVETRAIN_MEP = 0.57     # 밸브 트레인 / 기본 마찰, 실린더 배기량이 작을수록 커짐
+ACCESSORY_MEP = 0.40      # 오일/워터 펌프 등 보기류, 총 배기량이 작을수록 커짐
+BEARING_MEP = 0.05        # per 1000 rpm, 보어가 작을수록(배기량 대비 베어링이 클수록) 커짐
+PISTON_MEP = 0.10         # per 1000 rpm 기준 피스톤 속도, 링/스커트 마찰
+WINDAGE_MEP = 0.05        # per (1000 rpm 기준 피스톤 속도)^2, 크랭크실 교반 / 오일 펌프
+
+# PMEP 항목 (bar, 전부하)
+PUMPING_MEP_WOT = 0.10
+PUMPING_FLOW_MEP = 0.03   # per (1000 rpm 기준 피스톤 속도)^2, 흡·배기 유동 저항
+TURBO_BACKPRESSURE = 0.15     # 부스트 1bar당 터빈 배압
+SUPERCHARGER_DRIVE = 0.25     # 부스트 1bar당 벨트 구동 손실
+
+
+# 마찰 평균유효압력 (bar), 인자는 서로 브로드캐스트 (bore / stroke mm)
+def friction_mep(rpm, bore=REF_BORE, stroke=REF_STROKE, cylinders=REF_CYLINDERS, layout_modifier=1.0):
+    krpm = rpm / 1000
+    speed = krpm * stroke / REF_STROKE      # 기준 스트로크 대비 피스톤 속도
+    small_bore = REF_BORE / bore
+    cylinder_volume = bore ** 2 * stroke / (REF_BORE ** 2 * REF_STROKE)
+    total_volume = cylinder_volume * cylinders / REF_CYLINDERS
+    return layout_modifier * (
+        VALVETRAIN_MEP / cylinder_volume ** 0.3
+        + ACCESSORY_MEP / total_volume ** 0.5
+        + BEARING_MEP * krpm * small_bore
+        + PISTON_MEP * speed * small_bore
+        + WINDAGE_MEP * speed ** 2
+    )
+
+
+# 전부하 펌핑 평균유효압력 (bar), turbo_boost / supercharger_boost: 배기 구동 / 크랭크 구동 과급 압력 (bar)
+def pumping_mep(rpm, stroke=REF_STROKE, turbo_boost=0.0, supercharger_boost=0.0):
+    speed = rpm / 1000 * stroke / REF_STROKE
+    return (PUMPING_MEP_WOT + PUMPING_FLOW_MEP * speed ** 2
+            + TURBO_BACKPRESSURE * turbo_boost + SUPERCHARGER_DRIVE * supercharger_boost)
+
+
+# 평균유효압력(bar) → 토크(Nm), displacement: L
+def mep_torque(mep, displacement):
+    return mep * 1e5 * displacement / 1000 / (4 * np.pi)
+
+
+# 출력 분해 누적 그래프 (simulate_batch(losses=True) 결과의 한 행)
+def plot_losses(ax, result):
+    rpm = result["rpm"]
+    ax.stackplot(rpm, result["hp"], result["friction_hp"], result["pumping_hp"],
+                 labels=["Brake", "Friction", "Pumping"], colors=["tab:green", "tab:red", "tab:orange"], alpha=0.8)
+    ax.plot(rpm, result["indicated_hp"], color="black", linewidth=0.8, label="Indicated")
+    ax.set_xlabel("RPM")
+    ax.set_ylabel("Power (HP)")
+    ax.legend(loc="upper left")
+    ax.grid(True)
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from EngineModel import RPM_MIN, simulate_config
+from DriveCycle import FUEL_LHV
+
+# 부분 부하 운전 맵 (RPM × 부하)
+# 전부하 토크 곡선에 부하율을 곱해 제동 토크를 만들고, 마찰/펌핑 손실로 효율과 BSFC를 추정
+MAP_KINDS = {
+    "bsfc": "BSFC (g/kWh)",
+    "efficiency": "Brake efficiency (%)",
+    "torque": "Torque (Nm)",
+    "power": "Power (HP)",
+}
+MAX_RESOLUTION = 800
+CACHE_SIZE = 16
+PUMPING_MEP_CLOSED = 0.9   # bar, 스로틀이 거의 닫혔을 때 추가 손실 (가솔린 계열)
+
+_cache = OrderedDict()
+
+
+# 압축비 기반 도시 효율 (오토 사이클 효율 × 보정)
+def indicated_efficiency(compression):
+    return 0.75 * (1 - compression ** (1 - 1.3))
+
+
+def _config_key(config, rpm_points, load_points):
+    items = []
+    for key, val in sorted(config.items()):
+        if isinstance(val, list):
+            val = tuple(tuple(v) if isinstance(v, list) else v for v in val)
+        items.append((key, val))
+    return tuple(items), rpm_points, load_points
+
+
+def _compute_map(config, rpm_points, load_points):
+    rpm = np.linspace(RPM_MIN, config["redline"], rpm_points)
+    load = np.linspace(1.0 / load_points, 1.0, load_points)
+    wot = simulate_config(config, rpm=rpm, losses=True)
+
+    # (부하, RPM) 격자
+    torque = load[:, None] * wot["torque"][None, :]
+    power_w = torque * rpm[None, :] * 2 * np.pi / 60
+
+    displacement = wot["displacement"] / 1000  # m^3
+    cycles_per_s = rpm / 120
+    friction_w = wot["fmep"][None, :] * 1e5 * displacement * cycles_per_s[None, :]
+    throttled = 0.0 if config["fuel_type"] == "diesel" else PUMPING_MEP_CLOSED
+    pumping_mep = wot["pmep"][None, :] + throttled * (1 - load[:, None])
+    pumping_w = pumping_mep * 1e5 * displacement * cycles_per_s[None, :]
+
+    fuel_w = (power_w + friction_w + pumping_w) / indicated_efficiency(config["compression_ratio"])
+    efficiency = power_w / fuel_w
+    lhv = FUEL_LHV.get(config["fuel_type"], 43.0)
+    return {
+        "rpm": rpm,
+        "load": load,
+        "torque": torque,
+        "power": power_w / 745.7,
+        "efficiency": efficiency * 100,
+        "bsfc": 3600 / (efficiency * lhv),
+    }
+
+
+# 같은 설정/해상도의 맵은 캐시에서 바로 반환
+def operating_map(config, rpm_points=200, load_points=100):
+    rpm_points = int(min(max(rpm_points, 2), MAX_RESOLUTION))
+    load_points = int(min(max(load_points, 2), MAX_RESOLUTION))
+    key = _config_key(config, rpm_points, load_points)
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+
+    result = _compute_map(config, rpm_points, load_points)
+    _cache[key] = result
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return result
+
+
+# 히트맵 + 등고선 (imshow는 수백 × 수백 격자에서도 빠름)
+def plot_map(figure, ax, result, kind="bsfc"):
+    values = result[kind]
+    rpm = result["rpm"]
+    load = result["load"] * 100
+    # 저부하 BSFC는 매우 커지므로 상위 20%는 색 범위에서 제외
+    vmax = np.percentile(values, 80) if kind == "bsfc" else values.max()
+    image = ax.imshow(values, origin="lower", aspect="auto", cmap="viridis_r" if kind == "bsfc" else "viridis",
+                      extent=(rpm[0], rpm[-1], load[0], load[-1]), vmax=vmax)
+    ax.contour(rpm, load, values, levels=np.linspace(values.min(), vmax, 10)[1:], colors="white", linewidths=0.5)
+    figure.colorbar(image, ax=ax, label=MAP_KINDS[kind])
+    ax.set_xlabel("RPM")
+    ax.set_ylabel("Load (%)")
+    ax.set_title(MAP_KINDS[kind])
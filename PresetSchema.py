@@ -0,0 +1,283 @@
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from EngineModel import FLOAT_FIELDS, INT_FIELDS, COMBO_OPTIONS, TABLE_FIELDS
+
+# .eng 프리셋 스키마
+# 1: ES1.x 프리셋 (compression, vvl_enabled, ambient_condition 키 사용)
+# 2: es2.0 ~ es2.4 GUI 저장 형식 (schema_version 없음)
+# 3: schema_version 필드 추가
+SCHEMA_VERSION = 3
+
+REQUIRED_FIELDS = [
+    "bore", "stroke", "cylinders", "compression_ratio", "redline", "engine_type", "forced_type",
+    "boost", "layout", "fuel_type", "ambient", "use_vvl", "vvl_rpm", "vvl_profile"
+]
+OPTIONAL_FIELDS = {
+    "schema_version": SCHEMA_VERSION, "boost_model": "flat", "boost_curve": [],
+    "crossover_rpm": 0.0, "crossover_width": 1000.0,
+    "ambient_temp": 25.0, "ambient_pressure": 0.0, "humidity": 0.0, "altitude": 0.0,
+    "cam_model": "simple", "cam_profile": "stock",
+    "intake_runner_length": 0.0, "intake_runner_diameter": 0.0,
+    "exhaust_runner_length": 0.0, "exhaust_runner_diameter": 0.0,
+    "torque_model": "gaussian", "torque_curve": [], "calibration": ""
+}
+
+# 과급기 종류별로 선택 가능한 forced_type (on_engine_type_change와 동일)
+FORCED_TYPES = {
+    "na": ["na"],
+    "turbo": ["single", "twin-scroll", "variable-geometry"],
+    "twin-turbo": ["single", "twin-scroll", "variable-geometry"],
+    "supercharger": ["roots", "centrifugal", "twin-screw"],
+    "twincharged": ["single", "twin-scroll", "variable-geometry", "roots", "centrifugal", "twin-screw", "sequential"],
+}
+
+# 숫자 항목 허용 범위 (최소, 최대)
+FIELD_RANGES = {
+    "bore": (10.0, 300.0),
+    "stroke": (10.0, 300.0),
+    "cylinders": (1, 16),
+    "compression_ratio": (1.0, 30.0),
+    "redline": (1500.0, 25000.0),
+    "boost": (0.0, 10.0),
+    "vvl_rpm": (0.0, 25000.0),
+    "crossover_rpm": (0.0, 25000.0),
+    "crossover_width": (0.0, 20000.0),
+    "ambient_temp": (-60.0, 60.0),
+    "ambient_pressure": (0.0, 120.0),
+    "humidity": (0.0, 100.0),
+    "altitude": (-500.0, 9000.0),
+    "intake_runner_length": (0.0, 3000.0),
+    "intake_runner_diameter": (0.0, 200.0),
+    "exhaust_runner_length": (0.0, 3000.0),
+    "exhaust_runner_diameter": (0.0, 200.0),
+}
+# 표 항목의 값 허용 범위 (rpm 범위는 위 redline과 같음)
+TABLE_RANGES = {"boost_curve": FIELD_RANGES["boost"], "torque_curve": (0.0, 5.0)}
+
+
+def detect_version(data):
+    if "schema_version" in data:
+        return data["schema_version"]
+    if "compression" in data or "ambient_condition" in data or "vvl_enabled" in data:
+        return 1
+    return 2
+
+
+# 1 → 2: ES1.x 키 이름을 GUI 형식으로 변경
+def _migrate_1(data):
+    data = dict(data)
+    if "compression" in data:
+        data["compression_ratio"] = data.pop("compression")
+    if "ambient_condition" in data:
+        data["ambient"] = data.pop("ambient_condition")
+    if "vvl_enabled" in data:
+        data["use_vvl"] = "yes" if data.pop("vvl_enabled") else "no"
+    if data.get("vvl_profile") is None:
+        data["vvl_profile"] = "mild"
+    # ES1은 na 엔진에 None, twin-turbo / twincharged에 engine_type 이름을 넣었음 → 허용 값 중 첫 번째로
+    engine_type = data.get("engine_type")
+    allowed = FORCED_TYPES.get(engine_type.lower()) if isinstance(engine_type, str) else None
+    forced_type = data.get("forced_type")
+    if allowed is not None and not (isinstance(forced_type, str) and forced_type.lower() in allowed):
+        data["forced_type"] = allowed[0]
+    return data
+
+
+# 2 → 3: 선택형 값 소문자화, 숫자 문자열 변환, 버전 기록
+def _migrate_2(data):
+    data = dict(data)
+    for key in COMBO_OPTIONS:
+        if isinstance(data.get(key), str):
+            data[key] = data[key].lower()
+    for key in FLOAT_FIELDS + INT_FIELDS:
+        if isinstance(data.get(key), str):
+            try:
+                data[key] = int(data[key]) if key in INT_FIELDS else float(data[key])
+            except ValueError:
+                pass  # 검사 단계에서 오류로 보고
+    data["schema_version"] = 3
+    return data
+
+
+MIGRATIONS = {1: _migrate_1, 2: _migrate_2}
+
+
+def migrate(data):
+    version = detect_version(data)
+    if not isinstance(version, int) or version > SCHEMA_VERSION or version < 1:
+        raise ValueError(f"지원하지 않는 스키마 버전입니다: {version}")
+    while version < SCHEMA_VERSION:
+        data = MIGRATIONS[version](data)
+        version += 1
+    return data
+
+
+# 모든 문제를 한 번에 모아서 반환 (빈 목록이면 정상)
+def validate(data):
+    problems = []
+    for key in data:
+        if key not in REQUIRED_FIELDS and key not in OPTIONAL_FIELDS:
+            problems.append(f"알 수 없는 항목: {key}")
+    for key in REQUIRED_FIELDS:
+        if key not in data:
+            problems.append(f"필수 항목 누락: {key}")
+
+    for key in FLOAT_FIELDS + INT_FIELDS:
+        if key not in data:
+            continue
+        val = data[key]
+        if isinstance(val, bool) or not isinstance(val, (int, float)):
+            problems.append(f"{key}: 숫자가 아닙니다 ({val!r})")
+            continue
+        if key in INT_FIELDS and int(val) != val:
+            problems.append(f"{key}: 정수가 아닙니다 ({val!r})")
+        if not math.isfinite(val):
+            problems.append(f"{key}: 유한한 값이 아닙니다 ({val!r})")
+            continue
+        lo, hi = FIELD_RANGES[key]
+        if not lo <= val <= hi:
+            problems.append(f"{key}: 허용 범위({lo} ~ {hi})를 벗어났습니다 ({val!r})")
+
+    for key, options in COMBO_OPTIONS.items():
+        if key in data and (not isinstance(data[key], str) or data[key] not in options):
+            problems.append(f"{key}: 허용되지 않는 값입니다 ({data[key]!r})")
+
+    for key in TABLE_FIELDS:
+        if key in data:
+            problems.extend(_validate_table(key, data[key]))
+
+    if data.get("torque_model") == "spline" and isinstance(data.get("torque_curve"), list) and len(data["torque_curve"]) < 2:
+        problems.append("torque_curve: spline 토크 모델에는 제어점이 2개 이상 필요합니다")
+    if "calibration" in data and not isinstance(data["calibration"], str):
+        problems.append(f"calibration: 문자열이 아닙니다 ({data['calibration']!r})")
+
+    engine_type = data.get("engine_type")
+    if isinstance(engine_type, str) and engine_type in FORCED_TYPES and data.get("forced_type") in COMBO_OPTIONS["forced_type"]:
+        if data["forced_type"] not in FORCED_TYPES[engine_type]:
+            problems.append(f"forced_type: {engine_type} 엔진에 사용할 수 없습니다 ({data['forced_type']!r})")
+
+    return problems
+
+
+def _validate_table(key, table):
+    if not isinstance(table, list):
+        return [f"{key}: [rpm, 값] 목록이어야 합니다 ({table!r})"]
+    problems = []
+    lo, hi = TABLE_RANGES[key]
+    rpms = []
+    for point in table:
+        if (not isinstance(point, list) or len(point) != 2
+                or not all(isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v) for v in point)):
+            problems.append(f"{key}: 잘못된 지점입니다 ({point!r})")
+            continue
+        rpms.append(point[0])
+        if not 0 <= point[0] <= FIELD_RANGES["redline"][1]:
+            problems.append(f"{key}: rpm이 허용 범위를 벗어났습니다 ({point[0]!r})")
+        if not lo <= point[1] <= hi:
+            problems.append(f"{key}: 값이 허용 범위({lo} ~ {hi})를 벗어났습니다 ({point[1]!r})")
+    if rpms != sorted(rpms) or len(set(rpms)) != len(rpms):
+        problems.append(f"{key}: rpm은 중복 없이 오름차순이어야 합니다")
+    return problems
+
+
+# 파일 읽기 + 마이그레이션 + 검사 (GUI에서도 사용)
+def load_eng(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("최상위 값이 JSON 객체가 아닙니다.")
+    data = migrate(data)
+    return data, validate(data)
+
+
+# 임시 파일에 쓴 뒤 교체
+def write_eng(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def check_file(path, rewrite=False):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            original = json.load(f)
+        if not isinstance(original, dict):
+            return path, ["최상위 값이 JSON 객체가 아닙니다."], False
+        data = migrate(original)
+    except (OSError, ValueError) as e:
+        return path, [f"파일을 읽을 수 없습니다: {e}"], False
+
+    problems = validate(data)
+    rewritten = False
+    if rewrite and not problems and data != original:
+        write_eng(path, data)
+        rewritten = True
+    return path, problems, rewritten
+
+
+def _check_chunk(paths, rewrite):
+    return [check_file(path, rewrite) for path in paths]
+
+
+def find_presets(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                for name in sorted(filenames):
+                    if name.lower().endswith(".eng"):
+                        yield os.path.join(dirpath, name)
+        else:
+            yield path
+
+
+# 여러 파일을 프로세스 풀에서 나눠 처리 (파일 묶음 단위로 전달해 통신 비용을 줄임)
+def check_library(paths, rewrite=False, workers=None, chunk_size=200):
+    files = list(find_presets(paths))
+    chunks = [files[i:i + chunk_size] for i in range(0, len(files), chunk_size)]
+    results = []
+    if len(chunks) <= 1:
+        for chunk in chunks:
+            results.extend(_check_chunk(chunk, rewrite))
+        return results
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_results in executor.map(_check_chunk, chunks, [rewrite] * len(chunks)):
+            results.extend(chunk_results)
+    return results
+
+
+# 사용법: python PresetSchema.py [--fix] [--workers N] <폴더 또는 .eng 파일...>
+def main():
+    parser = argparse.ArgumentParser(description=".eng 프리셋 일괄 검사 / 마이그레이션")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--fix", action="store_true", help="문제가 없는 파일을 최신 스키마로 다시 저장")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    results = check_library(args.paths, rewrite=args.fix, workers=args.workers)
+    bad = 0
+    rewritten = 0
+    for path, problems, was_rewritten in results:
+        rewritten += was_rewritten
+        if problems:
+            bad += 1
+            print(path)
+            for problem in problems:
+                print(f"  - {problem}")
+    print(f"{len(results)}개 파일 검사, 문제 있는 파일 {bad}개, 다시 저장한 파일 {rewritten}개")
+    sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
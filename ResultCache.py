@@ -0,0 +1,233 @@
+import argparse
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import time
+
+import numpy as np
+
+from EngineModel import MODEL_VERSION, RPM_POINTS, compute_dtype, load_calibration, make_batch, simulate_batch
+from SweepPlanner import canonical_config
+
+# 디스크 결과 캐시 (내용 주소 방식)
+# 키 = sha256(정규화한 설정 + 모델 버전 + 보정 상수 + RPM 격자 + 계산 정밀도), 파일 이름이 곧 키이므로 같은 키는 같은 내용
+# 설정은 SweepPlanner.canonical_config로 정규화하므로 결과가 같은 설정은 캐시 항목 하나를 같이 씀
+# 파일 형식: 헤더(매직, 형식 버전, 메타 길이) + 메타 JSON(스칼라 값, 배열 이름/길이/자료형) + 배열 원본 바이트
+# 배열은 계산한 정밀도(float64 / float32) 그대로 저장하므로 float32 결과는 파일도 절반 크기
+# 여러 프로세스가 같은 폴더를 써도 되도록
+#   - 쓰기는 임시 파일에 쓴 뒤 os.replace로 교체 (반쯤 쓴 파일을 읽지 않음)
+#   - 읽다가 파일이 사라지거나 깨져 있으면 없는 것으로 처리
+#   - 용량이 넘치면 오래 안 쓴(mtime) 파일부터 삭제, 이미 지워진 파일은 무시
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "result_cache")
+MAX_BYTES = 256 * 1024 * 1024
+EVICT_RATIO = 0.9      # 정리할 때 이 비율까지 줄여 매번 정리하지 않도록 함
+MAGIC = b"ESRC"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sHI")
+SUFFIX = ".bin"
+
+
+# rpm: None이면 points개 기본 격자, 아니면 이 설정에 쓸 RPM 배열
+def result_key(config, rpm=None, points=RPM_POINTS, losses=False, dtype=np.float64):
+    if rpm is None:
+        grid = int(points)
+    else:
+        grid = hashlib.sha256(np.ascontiguousarray(rpm, dtype=float).tobytes()).hexdigest()
+    config = canonical_config(config)
+    # 보정 이름 대신 실제 상수를 넣어 보정 파일이 바뀌면 키도 바뀌게 함
+    config["calibration"] = load_calibration(config["calibration"])
+    text = json.dumps({"model": MODEL_VERSION, "config": config, "rpm": grid, "losses": bool(losses),
+                       "dtype": compute_dtype(dtype).name}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def encode_result(result):
+    scalars = {}
+    arrays = []
+    for key, val in result.items():
+        if np.ndim(val) == 0:
+            scalars[key] = [float(val), compute_dtype(np.result_type(val)).name]
+        else:
+            val = np.asarray(val)
+            arrays.append((key, np.ascontiguousarray(val, dtype=compute_dtype(val.dtype).newbyteorder("<"))))
+    meta = json.dumps({"scalars": scalars, "arrays": [[key, len(val), val.dtype.str] for key, val in arrays]},
+                      separators=(",", ":")).encode("utf-8")
+    return b"".join([HEADER.pack(MAGIC, FORMAT_VERSION, len(meta)), meta] + [val.tobytes() for _, val in arrays])
+
+
+# 형식이 맞지 않으면 ValueError
+def decode_result(data):
+    if len(data) < HEADER.size:
+        raise ValueError("캐시 파일이 너무 짧습니다.")
+    magic, version, meta_length = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("캐시 파일 형식이 다릅니다.")
+    offset = HEADER.size + meta_length
+    meta = json.loads(data[HEADER.size:offset].decode("utf-8"))
+    arrays = [(key, length, np.dtype(code)) for key, length, code in meta["arrays"]]
+    if len(data) != offset + sum(length * dtype.itemsize for _, length, dtype in arrays):
+        raise ValueError("캐시 파일 크기가 맞지 않습니다.")
+    result = {}
+    for key, length, dtype in arrays:
+        result[key] = np.frombuffer(data, dtype=dtype, count=length, offset=offset).astype(dtype.newbyteorder("="))
+        offset += length * dtype.itemsize
+    for key, (val, name) in meta["scalars"].items():
+        result[key] = compute_dtype(name).type(val)
+    return result
+
+
+class ResultCache:
+    def __init__(self, path=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None   # 이 프로세스가 아는 대략의 전체 크기 (정리할 때 다시 셈)
+
+    def _file(self, key):
+        return os.path.join(self.path, key[:2], key + SUFFIX)
+
+    def _entries(self):
+        entries = []
+        if not os.path.isdir(self.path):
+            return entries
+        for folder in os.scandir(self.path):
+            if not folder.is_dir():
+                continue
+            for entry in os.scandir(folder.path):
+                if not entry.name.endswith(SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def get(self, key):
+        path = self._file(key)
+        try:
+            with open(path, "rb") as f:
+                result = decode_result(f.read())
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            self.misses += 1
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)   # 최근 사용 표시 (정리 순서)
+        except OSError:
+            pass
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        path = self._file(key)
+        data = encode_result(result)
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            # 다른 프로세스가 같은 키를 쓰는 중이면 교체가 실패할 수 있음 (내용은 같음)
+            self._remove(tmp_path)
+            return
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        else:
+            self._size += len(data)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def _remove(self, path):
+        if path is None:
+            return
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    # 오래 안 쓴 파일부터 지워 max_bytes × EVICT_RATIO 이하로 줄임
+    def evict(self, max_bytes=None):
+        limit = (self.max_bytes if max_bytes is None else max_bytes) * EVICT_RATIO
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            self._remove(path)
+            total -= size
+        self._size = total
+        return total
+
+    def stats(self):
+        entries = self._entries()
+        return {
+            "path": self.path,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def clear(self):
+        for _, _, path in self._entries():
+            self._remove(path)
+        self._size = 0
+
+
+# 캐시에 있는 설정은 읽고, 없는 설정만 한 번에 계산해 저장 → 설정별 결과 목록
+# rpm: None, 공통 (P,) 또는 설정별 (N, P)
+def simulate_cached(configs, rpm=None, points=RPM_POINTS, losses=False, cache=None, dtype=np.float64):
+    configs = list(configs)
+    cache = cache or ResultCache()
+    if rpm is not None:
+        rpm = np.broadcast_to(np.asarray(rpm, dtype=float), (len(configs), np.shape(rpm)[-1]))
+    keys = [result_key(config, None if rpm is None else rpm[i], points, losses, dtype) for i, config in enumerate(configs)]
+    results = [cache.get(key) for key in keys]
+
+    # 없는 키만 한 번씩 계산 (키가 같은 설정은 결과도 같음)
+    missing = {}
+    for i, result in enumerate(results):
+        if result is None:
+            missing.setdefault(keys[i], []).append(i)
+    if missing:
+        first = [rows[0] for rows in missing.values()]
+        computed = simulate_batch(make_batch([canonical_config(configs[i]) for i in first]),
+                                  rpm=None if rpm is None else rpm[first], points=points, losses=losses, dtype=dtype)
+        for row, (key, rows) in enumerate(missing.items()):
+            result = {name: val[row] for name, val in computed.items()}
+            cache.put(key, result)
+            for i in rows:
+                results[i] = result
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시뮬레이션 결과 캐시 관리")
+    parser.add_argument("command", choices=["stats", "clear", "evict"])
+    parser.add_argument("--path", default=CACHE_DIR)
+    parser.add_argument("--max-mb", type=float, default=MAX_BYTES / 1024 / 1024)
+    args = parser.parse_args()
+
+    cache = ResultCache(args.path, int(args.max_mb * 1024 * 1024))
+    started = time.perf_counter()
+    if args.command == "clear":
+        cache.clear()
+    elif args.command == "evict":
+        cache.evict()
+    stats = cache.stats()
+    print(f"{stats['path']}: {stats['entries']}개, {stats['bytes'] / 1024 / 1024:.1f} / {args.max_mb:g} MB "
+          f"({time.perf_counter() - started:.2f}초)")
+
+
+if __name__ == "__main__":
+    main()
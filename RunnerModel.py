@@ -0,0 +1,48 @@
+import numpy as np
+
+# 흡·배기 러너 공명(파동 튜닝) 모델
+# 러너의 1/4 파장 공명 주파수와 실린더 흡·배기 주기의 비(차수)가 정수일 때 토크 봉우리,
+# 반정수일 때 골이 생김. 차수가 높을수록(저회전) 파동이 감쇠해 효과가 작아짐
+# 길이 / 직경은 mm, 길이 0이면 해당 러너는 계산하지 않음
+INTAKE_SOUND_SPEED = 345.0     # m/s
+EXHAUST_SOUND_SPEED = 550.0    # m/s, 배기 온도 기준
+END_CORRECTION = 0.3           # 유효 길이 = 길이 + 0.3 × 직경
+INTAKE_DIAMETER_RATIO = 0.45   # 최적 흡기 러너 직경 / 보어
+EXHAUST_DIAMETER_RATIO = 0.40  # 최적 배기 1차관 직경 / 보어
+RESONANCE_GAIN = {"intake": 0.12, "exhaust": 0.08}   # 최적 직경에서의 1차 공명 토크 증가율
+DAMPING = 0.30                 # 차수 1 증가당 감쇠 (직경이 가늘수록 마찰로 커짐)
+DIAMETER_SPREAD = 0.35         # 최적 직경에서 벗어날 때 효과 감소 폭 (log 비율)
+
+
+# 러너 하나의 RPM별 토크 배율 - 1 (배열 인자는 서로 브로드캐스트)
+def runner_gain(rpm, length, diameter, bore, sound_speed, diameter_ratio, gain):
+    length = np.asarray(length, dtype=float)
+    diameter = np.maximum(np.asarray(diameter, dtype=float), 1e-3)
+    effective = (length + END_CORRECTION * diameter) / 1000
+    # 차수 = 러너 공명 주파수 / 실린더 사이클 주파수
+    order = (sound_speed / (4 * np.maximum(effective, 1e-6))) / (rpm / 120)
+
+    optimum = diameter_ratio * np.asarray(bore, dtype=float)
+    amplitude = gain * np.exp(-np.log(diameter / optimum) ** 2 / (2 * DIAMETER_SPREAD ** 2))
+    decay = np.exp(-DAMPING * optimum / diameter * np.maximum(order - 1, 0.0))
+    # 차수 1 아래(공명보다 빠른 회전)에서는 파동이 제때 돌아오지 못해 효과가 줄어듦
+    below = np.clip(order, 0.0, 1.0) ** 2
+    wave = amplitude * decay * below * np.cos(2 * np.pi * order)
+    return np.where(length > 0, wave, 0.0)
+
+
+# 흡·배기 러너를 합친 토크 배율 (N, P)
+# rpm: (N, P), 나머지: (N,) 또는 스칼라 (mm)
+def resonance_curve(rpm, bore, intake_length, intake_diameter, exhaust_length, exhaust_diameter):
+    column = lambda val: np.asarray(val, dtype=float)[..., None] if np.ndim(val) else val
+    bore = column(bore)
+    intake = runner_gain(rpm, column(intake_length), column(intake_diameter), bore,
+                         INTAKE_SOUND_SPEED, INTAKE_DIAMETER_RATIO, RESONANCE_GAIN["intake"])
+    exhaust = runner_gain(rpm, column(exhaust_length), column(exhaust_diameter), bore,
+                          EXHAUST_SOUND_SPEED, EXHAUST_DIAMETER_RATIO, RESONANCE_GAIN["exhaust"])
+    return (1 + intake) * (1 + exhaust)
+
+
+# 주어진 RPM에서 차수 n 공명이 생기는 러너 길이 (mm, 설계 참고용)
+def tuned_length(rpm, order, diameter, sound_speed=INTAKE_SOUND_SPEED):
+    return sound_speed / (4 * order * rpm / 120) * 1000 - END_CORRECTION * diameter
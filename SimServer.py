@@ -0,0 +1,241 @@
+import argparse
+import asyncio
+import collections
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from EngineModel import RPM_POINTS, compute_dtype, parse_config
+from ResultCache import ResultCache, simulate_cached
+from SweepPlanner import simulate_planned
+
+# 로컬 시뮬레이션 서버 (HTTP/JSON)
+# POST /simulate : .eng 형식 설정 하나, 또는 {"configs": [...], "points": N, "dtype": "float32"}
+# GET  /metrics  : 요청 지연시간 / 작업 대기열 상태
+# GET  /health   : 상태 확인
+HOST = "127.0.0.1"
+PORT = 8765
+MAX_BODY = 16 * 1024 * 1024
+CHUNK_SIZE = 256  # 작업자 하나가 한 번에 계산하는 설정 수
+MIN_POINTS = 2
+MAX_POINTS = 10000  # 요청 하나가 작업자마다 만드는 배열 크기 제한
+
+_caches = {}  # 작업자 프로세스별 결과 캐시 (폴더는 프로세스끼리 공유)
+
+STATUS_TEXT = {
+    200: "OK", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"
+}
+
+
+# 작업자 프로세스에서 실행되는 계산 (cache_dir가 있으면 디스크 캐시 사용)
+def run_simulation(raw_configs, points, cache_dir=None, dtype="float64"):
+    configs = [parse_config(raw) for raw in raw_configs]
+    if cache_dir:
+        cache = _caches.setdefault(cache_dir, ResultCache(cache_dir))
+        rows = simulate_cached(configs, points=points, cache=cache, dtype=dtype)
+    else:
+        result = simulate_planned(configs, points=points, dtype=dtype)
+        rows = [{key: val[i] for key, val in result.items()} for i in range(len(configs))]
+    outputs = []
+    for row in rows:
+        outputs.append({
+            "rpm": row["rpm"].tolist(),
+            "torque": row["torque"].tolist(),
+            "hp": row["hp"].tolist(),
+            "displacement": float(row["displacement"]),
+            "max_hp": float(row["max_hp"]),
+            "max_hp_rpm": float(row["max_hp_rpm"]),
+            "max_torque": float(row["max_torque"]),
+            "max_torque_rpm": float(row["max_torque_rpm"]),
+        })
+    return outputs
+
+
+class ServerMetrics:
+    def __init__(self, window=1000):
+        self.requests = 0
+        self.errors = 0
+        self.configs = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.latencies = collections.deque(maxlen=window)
+
+    def job_started(self):
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def job_finished(self):
+        self.queue_depth -= 1
+
+    def snapshot(self):
+        latencies = np.array(self.latencies) * 1000
+        stats = {"p50": None, "p95": None, "max": None}
+        if len(latencies):
+            stats = {
+                "p50": float(np.percentile(latencies, 50)),
+                "p95": float(np.percentile(latencies, 95)),
+                "max": float(latencies.max()),
+            }
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "configs": self.configs,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "latency_ms": stats,
+        }
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class SimulationServer:
+    def __init__(self, workers=None, cache_dir=None):
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.metrics = ServerMetrics()
+        self.cache_dir = cache_dir
+
+    async def simulate(self, raw_configs, points, dtype="float64"):
+        loop = asyncio.get_running_loop()
+        jobs = []
+        for start in range(0, len(raw_configs), CHUNK_SIZE):
+            chunk = raw_configs[start:start + CHUNK_SIZE]
+            self.metrics.job_started()
+            future = loop.run_in_executor(self.executor, run_simulation, chunk, points, self.cache_dir, dtype)
+            future.add_done_callback(lambda f: self.metrics.job_finished())
+            jobs.append(future)
+        results = []
+        for outputs in await asyncio.gather(*jobs):
+            results.extend(outputs)
+        self.metrics.configs += len(raw_configs)
+        return results
+
+    async def route(self, method, path, body):
+        if path == "/health":
+            return {"status": "ok"}
+        if path == "/metrics":
+            return self.metrics.snapshot()
+        if path != "/simulate":
+            raise RequestError(404, f"알 수 없는 경로입니다: {path}")
+        if method != "POST":
+            raise RequestError(405, "POST 요청만 지원합니다.")
+
+        try:
+            payload = json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise RequestError(400, f"유효한 JSON이 아닙니다: {e}")
+        if not isinstance(payload, dict):
+            raise RequestError(400, "설정은 JSON 객체여야 합니다.")
+
+        batched = "configs" in payload
+        raw_configs = payload["configs"] if batched else [payload]
+        if not isinstance(raw_configs, list) or not raw_configs:
+            raise RequestError(400, "configs는 비어 있지 않은 목록이어야 합니다.")
+        if not all(isinstance(raw, dict) for raw in raw_configs):
+            raise RequestError(400, "configs의 각 설정은 JSON 객체여야 합니다.")
+
+        points = payload.get("points", RPM_POINTS) if batched else RPM_POINTS
+        try:
+            points = int(points)
+        except (TypeError, ValueError, OverflowError):
+            raise RequestError(400, f"points는 정수여야 합니다: {points!r}")
+        if not MIN_POINTS <= points <= MAX_POINTS:
+            raise RequestError(400, f"points는 {MIN_POINTS} ~ {MAX_POINTS} 사이여야 합니다: {points}")
+
+        try:
+            dtype = compute_dtype(payload.get("dtype", "float64") if batched else "float64").name
+            results = await self.simulate(raw_configs, points, dtype)
+        except (KeyError, ValueError, TypeError) as e:
+            raise RequestError(400, f"입력값이 잘못되었습니다: {e!r}")
+        return {"results": results} if batched else results[0]
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                method, path, version = (lines[0].split(" ") + ["", ""])[:3]
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                started = time.perf_counter()
+                self.metrics.requests += 1
+                status = 200
+                body_read = False  # 본문을 읽지 못했으면 다음 요청 경계를 알 수 없으므로 연결을 닫음
+                try:
+                    try:
+                        length = int(headers.get("content-length", 0))
+                    except ValueError:
+                        raise RequestError(400, "Content-Length가 정수가 아닙니다.")
+                    if length < 0:
+                        raise RequestError(400, "Content-Length는 0 이상이어야 합니다.")
+                    if length > MAX_BODY:
+                        raise RequestError(413, "요청 본문이 너무 큽니다.")
+                    body = await reader.readexactly(length) if length else b""
+                    body_read = True
+                    response = await self.route(method, path.split("?")[0], body)
+                except RequestError as e:
+                    status, response = e.status, {"error": str(e)}
+                except Exception as e:
+                    status, response = 500, {"error": f"계산 중 문제가 발생했습니다: {e!r}"}
+                if status != 200:
+                    self.metrics.errors += 1
+                self.metrics.latencies.append(time.perf_counter() - started)
+
+                keep_alive = body_read and version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                data = json.dumps(response).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def serve(self, host=HOST, port=PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            print(f"시뮬레이션 서버 실행 중: http://{host}:{port}")
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine Simulator 로컬 HTTP 서버")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache-dir", default=None, help="결과 디스크 캐시 폴더 (지정하지 않으면 사용 안 함)")
+    args = parser.parse_args()
+
+    server = SimulationServer(args.workers, args.cache_dir)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,195 @@
+import itertools
+
+import numpy as np
+
+from ResultCache import simulate_cached
+from SweepPlanner import simulate_planned
+
+# 스트리밍 스윕 파이프라인: 설정 생성기 → 묶음 계산 → 리듀서
+# 설정은 batch_size개씩만 만들고 계산하며, 리듀서는 필요한 요약만 남기므로 스윕 크기와 무관하게 메모리가 일정함
+#   for configs, result in evaluate(batched(grid_configs(base, axes))): ...
+#   run_pipeline(configs, [TopK(10), ParetoFront(), Histogram("max_hp", (0, 1000, 50))])
+# 리듀서는 update(configs, result) / result() 를 가진 객체, 값 이름은 결과 항목(max_hp 등) 또는 설정 항목(redline 등)
+BATCH_SIZE = 2048
+PIPELINE_POINTS = 200
+SUMMARY_FIELDS = ["max_hp", "max_hp_rpm", "max_torque", "max_torque_rpm", "displacement"]
+COMPARE_CELLS = 4000000   # 파레토 지배 비교 한 번에 만드는 최대 원소 수
+
+
+# 격자 설정 생성기 (조합을 미리 만들지 않음)
+def grid_configs(base, axes):
+    keys = list(axes)
+    for values in itertools.product(*(axes[key] for key in keys)):
+        yield dict(base, **dict(zip(keys, values)))
+
+
+def batched(configs, size=BATCH_SIZE):
+    configs = iter(configs)
+    while True:
+        chunk = list(itertools.islice(configs, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# 묶음별 (설정 목록, simulate_batch 형태 결과), cache가 있으면 디스크 결과 캐시 사용
+# dtype: 곡선 계산 정밀도, 큰 스윕은 "float32"로 메모리 절반 (EngineModel.COMPUTE_DTYPES)
+def evaluate(config_batches, points=PIPELINE_POINTS, losses=False, cache=None, dtype=np.float64):
+    for configs in config_batches:
+        if cache is None:
+            yield configs, simulate_planned(configs, points=points, losses=losses, dtype=dtype)
+        else:
+            rows = simulate_cached(configs, points=points, losses=losses, cache=cache, dtype=dtype)
+            yield configs, {key: np.stack([row[key] for row in rows]) for key in rows[0]}
+
+
+# 결과 항목 또는 설정 항목 값 (N,)
+def field_values(configs, result, name):
+    if name in result:
+        return np.asarray(result[name], dtype=float)
+    return np.array([config[name] for config in configs], dtype=float)
+
+
+def _summary(configs, result, rows):
+    return [dict({key: float(result[key][i]) for key in SUMMARY_FIELDS}, config=dict(configs[i])) for i in rows]
+
+
+# 값이 큰(largest=False면 작은) 상위 k개
+class TopK:
+    def __init__(self, k=10, metric="max_hp", largest=True):
+        self.k = k
+        self.metric = metric
+        self.largest = largest
+        self.values = np.empty(0)
+        self.items = []
+
+    def update(self, configs, result):
+        values = field_values(configs, result, self.metric)
+        sign = 1.0 if self.largest else -1.0
+        # 이번 묶음에서 후보만 먼저 골라 요약을 만듦
+        rows = np.arange(len(values))
+        if len(values) > self.k:
+            rows = np.argpartition(-sign * values, self.k - 1)[:self.k]
+        merged = np.concatenate([self.values, values[rows]])
+        items = self.items + _summary(configs, result, rows)
+        order = np.argsort(-sign * merged, kind="stable")[:self.k]
+        self.values = merged[order]
+        self.items = [items[i] for i in order]
+
+    def result(self):
+        return [dict(item, **{self.metric: float(val)}) for item, val in zip(self.items, self.values)]
+
+
+# points 각 행이 by의 어떤 행 이상(모든 값 >=)인지 (M,)
+# 첫 번째 값 순으로 정렬해 두고, 각 묶음은 첫 번째 값이 묶음 최솟값 이상인 by 행과만 비교
+def _covered(points, by):
+    covered = np.zeros(len(points), dtype=bool)
+    if not len(by) or not len(points):
+        return covered
+    by = by[np.argsort(-by[:, 0], kind="stable")]
+    descending = -by[:, 0]
+    order = np.argsort(-points[:, 0], kind="stable")
+    step = max(COMPARE_CELLS // len(by), 1)
+    for start in range(0, len(order), step):
+        rows = order[start:start + step]
+        part = points[rows]
+        candidates = by[:np.searchsorted(descending, -part[-1, 0], side="right")]
+        mask = candidates[None, :, 0] >= part[:, None, 0]
+        for j in range(1, points.shape[1]):
+            mask &= candidates[None, :, j] >= part[:, None, j]
+        covered[rows] = mask.any(axis=1)
+    return covered
+
+
+# 비지배 행 마스크, values: (M, D) 클수록 좋은 값 (같은 점은 하나만 남김)
+# 사전순 내림차순으로 정렬하면 어떤 점을 지배하는 점은 항상 그 점보다 앞에 있으므로
+# 앞에서부터 묶음 단위로 지금까지의 전선 + 묶음 안의 앞선 점과만 비교하면 됨
+def pareto_mask(values, block=256):
+    order = np.lexsort(-values.T[::-1])
+    keep = np.zeros(len(values), dtype=bool)
+    front = np.empty((0, values.shape[1]))
+    for start in range(0, len(order), block):
+        rows = order[start:start + block]
+        part = values[rows]
+        covered = _covered(part, front)
+        later = np.all(part[:, None] >= part[None], axis=2)   # [i, j]: i가 j 이상
+        covered |= np.triu(later, 1).any(axis=0)
+        keep[rows[~covered]] = True
+        front = np.concatenate([front, part[~covered]])
+    return keep
+
+
+# 파레토 전선, objectives: {값 이름: "max" 또는 "min"}
+# 기본: 최고 출력은 크게, 배기량과 레드라인은 작게 (같은 출력을 더 작고 덜 도는 엔진으로)
+PARETO_OBJECTIVES = {"max_hp": "max", "displacement": "min", "redline": "min"}
+
+
+class ParetoFront:
+    def __init__(self, objectives=PARETO_OBJECTIVES):
+        self.objectives = dict(objectives)
+        self.signs = np.array([1.0 if goal == "max" else -1.0 for goal in self.objectives.values()])
+        self.values = np.empty((0, len(self.objectives)))
+        self.items = []
+
+    def update(self, configs, result):
+        values = np.stack([field_values(configs, result, name) for name in self.objectives], axis=1) * self.signs
+        local = np.flatnonzero(pareto_mask(values))
+        # 기존 전선 점 이하인 새 점은 버리고, 남은 새 점 이하인 기존 점을 지움
+        local = local[~_covered(values[local], self.values)]
+        stale = _covered(self.values, values[local])
+        self.values = np.concatenate([self.values[~stale], values[local]])
+        self.items = [item for item, old in zip(self.items, stale) if not old] + _summary(configs, result, local)
+
+    def result(self):
+        order = np.argsort(-self.values[:, 0], kind="stable")
+        return [dict(self.items[i], **dict(zip(self.objectives, self.values[i] * self.signs))) for i in order]
+
+
+# 고정 구간 히스토그램, bins: 구간 경계 배열 또는 (최소, 최대, 구간 수)
+class Histogram:
+    def __init__(self, metric="max_hp", bins=(0.0, 1000.0, 50)):
+        if isinstance(bins, tuple):
+            bins = np.linspace(bins[0], bins[1], int(bins[2]) + 1)
+        self.metric = metric
+        self.edges = np.asarray(bins, dtype=float)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.below = 0
+        self.above = 0
+        self.total = 0
+        self.sum = 0.0
+
+    def update(self, configs, result):
+        values = field_values(configs, result, self.metric)
+        values = values[np.isfinite(values)]
+        self.counts += np.histogram(values, self.edges)[0]
+        self.below += int(np.sum(values < self.edges[0]))
+        self.above += int(np.sum(values > self.edges[-1]))
+        self.total += len(values)
+        self.sum += float(values.sum())
+
+    def result(self):
+        return {
+            "metric": self.metric,
+            "edges": self.edges,
+            "counts": self.counts,
+            "below": self.below,
+            "above": self.above,
+            "total": self.total,
+            "mean": self.sum / self.total if self.total else float("nan"),
+        }
+
+
+# 설정 묶음 생성기를 끝까지 흘려 리듀서 결과 목록과 계산한 설정 수를 반환
+def run_batches(config_batches, reducers, points=PIPELINE_POINTS, losses=False, cache=None, dtype=np.float64):
+    count = 0
+    for batch_configs, result in evaluate(config_batches, points, losses, cache, dtype):
+        for reducer in reducers:
+            reducer.update(batch_configs, result)
+        count += len(batch_configs)
+    return [reducer.result() for reducer in reducers], count
+
+
+# 설정 생성기를 batch_size개씩 묶어 run_batches
+def run_pipeline(configs, reducers, batch_size=BATCH_SIZE, points=PIPELINE_POINTS, losses=False, cache=None,
+                 dtype=np.float64):
+    return run_batches(batched(configs, batch_size), reducers, points, losses, cache, dtype)
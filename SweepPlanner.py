@@ -0,0 +1,112 @@
+import itertools
+
+import numpy as np
+
+from EngineModel import (RPM_POINTS, FLOAT_FIELDS, INT_FIELDS, TABLE_FIELDS, FUEL_HP_MODIFIER, AMBIENT_POWER_MODIFIER,
+                         LAYOUT_HP_MODIFIER, BOOST_DRIVE, parse_table, make_batch, simulate_batch)
+from PresetSchema import REQUIRED_FIELDS, OPTIONAL_FIELDS
+
+# 설정 정규화 + 스윕 계획
+# 계산 결과에 영향을 주지 않는 항목을 기본값으로 모아, 결과가 같은 설정은 정규화한 설정도 같게 만듦
+#   - na(및 모르는 engine_type): forced_type / boost / boost_curve / boost_model / 크로스오버 무시
+#   - twincharged + sequential 이외: crossover_rpm / crossover_width 무시
+#   - use_vvl "no": vvl_rpm / vvl_profile 무시
+#   - ambient가 custom이 아니면: 온도 / 기압 / 습도 / 고도 무시
+#   - cam_model "simple": cam_profile 무시, torque_model "gaussian"(또는 제어점 없음): torque_curve 무시
+#   - 러너 길이 0: 해당 러너 직경 무시
+#   - 계수표에 없는 fuel_type / layout / ambient: 계수 1.0 → gasoline / inline / normal
+# 스윕은 서로 다른 정규화 설정만 한 번씩 계산하고 결과를 원래 순서로 펼침
+DEFAULTS = {key: val for key, val in OPTIONAL_FIELDS.items() if key != "schema_version"}
+FIELD_ORDER = REQUIRED_FIELDS + [key for key in DEFAULTS if key not in REQUIRED_FIELDS]
+CONVERTERS = dict([(key, float) for key in FLOAT_FIELDS] + [(key, int) for key in INT_FIELDS]
+                  + [(key, parse_table) for key in TABLE_FIELDS])
+CROSSOVER_FIELDS = ("crossover_rpm", "crossover_width")
+AMBIENT_FIELDS = ("ambient_temp", "ambient_pressure", "humidity", "altitude")
+
+
+# 정규화한 설정 (parse_config 결과와 같은 형태, 모든 항목을 채우므로 섞어서 make_batch 가능)
+# 항목 순서가 항상 같으므로 items()를 그대로 비교 키로 쓸 수 있음
+def canonical_config(config):
+    data = {}
+    for key in FIELD_ORDER:
+        val = config[key] if key in config else DEFAULTS[key]
+        convert = CONVERTERS.get(key)
+        if convert is not None:
+            val = convert(val)
+        elif isinstance(val, str):
+            val = val.lower()
+        data[key] = val
+
+    if data["fuel_type"] not in FUEL_HP_MODIFIER:
+        data["fuel_type"] = "gasoline"
+    if data["layout"] not in LAYOUT_HP_MODIFIER:
+        data["layout"] = "inline"
+    if data["ambient"] not in AMBIENT_POWER_MODIFIER and data["ambient"] != "custom":
+        data["ambient"] = "normal"
+    if data["ambient"] != "custom":
+        data.update((key, DEFAULTS[key]) for key in AMBIENT_FIELDS)
+
+    if data["engine_type"] not in BOOST_DRIVE:
+        data.update(engine_type="na", forced_type="na", boost=0.0, boost_curve=[], boost_model=DEFAULTS["boost_model"])
+    if not (data["engine_type"] == "twincharged" and data["forced_type"] == "sequential"):
+        data.update((key, DEFAULTS[key]) for key in CROSSOVER_FIELDS)
+
+    if data["use_vvl"] != "yes":
+        data.update(use_vvl="no", vvl_rpm=0.0, vvl_profile="mild")
+    if data["cam_model"] != "profile":
+        data.update(cam_model="simple", cam_profile=DEFAULTS["cam_profile"])
+    if data["torque_model"] != "spline" or not data["torque_curve"]:
+        data.update(torque_model="gaussian", torque_curve=[])
+    for side in ("intake", "exhaust"):
+        if data[f"{side}_runner_length"] <= 0:
+            data[f"{side}_runner_length"] = 0.0
+            data[f"{side}_runner_diameter"] = 0.0
+    if data["calibration"] == "default":
+        data["calibration"] = ""
+
+    data["vvl_enabled"] = data["use_vvl"] == "yes"
+    data["ambient_condition"] = data["ambient"]
+    return data
+
+
+def _freeze(canon):
+    return tuple((key, tuple(map(tuple, val)) if isinstance(val, list) else val) for key, val in canon.items())
+
+
+# 결과가 같은 설정끼리 같은 키 (해시 가능)
+def config_key(config):
+    return _freeze(canonical_config(config))
+
+
+# 설정 목록 → (서로 다른 정규화 설정 목록, 설정별 번호 배열)
+def plan_sweep(configs):
+    index = {}
+    unique = []
+    inverse = []
+    for config in configs:
+        canon = canonical_config(config)
+        key = _freeze(canon)
+        if key not in index:
+            index[key] = len(unique)
+            unique.append(canon)
+        inverse.append(index[key])
+    return unique, np.array(inverse, dtype=np.int64)
+
+
+# 중복을 뺀 설정만 한 번의 배치로 계산한 뒤 원래 순서로 펼침 (simulate_batch와 같은 형태의 결과)
+# rpm: None 또는 공통 (P,) 격자
+def simulate_planned(configs, rpm=None, points=RPM_POINTS, losses=False, dtype=np.float64):
+    unique, inverse = plan_sweep(configs)
+    result = simulate_batch(make_batch(unique), rpm=rpm, points=points, losses=losses, dtype=dtype)
+    return {key: val[inverse] for key, val in result.items()}
+
+
+# 격자 스윕: base 설정에서 axes 항목들의 모든 조합 → (조합 목록, 결과, 실제 계산한 설정 수)
+# axes: {항목: 값 목록}
+def grid_sweep(base, axes, points=RPM_POINTS, losses=False, dtype=np.float64):
+    keys = list(axes)
+    combos = list(itertools.product(*(axes[key] for key in keys)))
+    configs = [dict(base, **dict(zip(keys, values))) for values in combos]
+    unique, inverse = plan_sweep(configs)
+    result = simulate_batch(make_batch(unique), points=points, losses=losses, dtype=dtype)
+    return combos, {key: val[inverse] for key, val in result.items()}, len(unique)
@@ -0,0 +1,190 @@
+import argparse
+import itertools
+import sys
+
+import numpy as np
+
+from EngineModel import COMBO_OPTIONS, INT_FIELDS
+from PresetSchema import FORCED_TYPES
+from SweepPipeline import BATCH_SIZE
+
+# 실험계획(DOE)용 공간 채움 샘플러
+# 숫자 항목은 [0, 1)^d 단위 점을 만들어 범위로 늘이고, 선택형 항목(COMBO_OPTIONS)의 조합과 교차함
+# 점과 설정은 묶음 단위로만 만들어 SweepPipeline.evaluate / run_batches에 바로 넣을 수 있음
+# 전체 격자 대신 수천 개 점으로 범위를 고르게 덮음 (lhs: 차원별 균등, sobol: 저불일치 수열, stratified: 칸별 무작위)
+#   run_batches(sample_configs(base, "sobol", 4096, categories=["engine_type", "fuel_type"]), [TopK(10)])
+SAMPLE_FIELDS = ["bore", "stroke", "compression_ratio", "boost", "redline", "vvl_rpm"]
+SAMPLE_RANGES = {
+    "bore": (70.0, 100.0),
+    "stroke": (65.0, 100.0),
+    "compression_ratio": (8.0, 13.0),
+    "boost": (0.0, 2.0),
+    "redline": (5000.0, 9000.0),
+    "vvl_rpm": (3000.0, 7000.0),
+}
+SAMPLE_METHODS = ["lhs", "sobol", "stratified", "random"]
+
+# Sobol 방향수 (Joe & Kuo, new-joe-kuo-6.21201): 차원 2부터 (s, a, m_1 ... m_s)
+# 차원 1은 모든 m = 1 (반 나누기 수열)
+SOBOL_BITS = 30
+SOBOL_DIRECTIONS = [
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+]
+
+
+# 차원별 방향수 (d, SOBOL_BITS) 정수, 비트 k의 값은 2^(SOBOL_BITS - 1 - k) 단위
+def sobol_directions(dims):
+    if dims > len(SOBOL_DIRECTIONS) + 1:
+        raise ValueError(f"Sobol 샘플러는 {len(SOBOL_DIRECTIONS) + 1}차원까지 지원합니다: {dims}")
+    table = np.zeros((dims, SOBOL_BITS), dtype=np.int64)
+    table[0] = 1 << np.arange(SOBOL_BITS - 1, -1, -1)
+    for d in range(1, dims):
+        s, a, m = SOBOL_DIRECTIONS[d - 1]
+        v = [m[k] << (SOBOL_BITS - 1 - k) for k in range(min(s, SOBOL_BITS))]
+        for k in range(s, SOBOL_BITS):
+            value = v[k - s] ^ (v[k - s] >> s)
+            for j in range(1, s):
+                if (a >> (s - 1 - j)) & 1:
+                    value ^= v[k - j]
+            v.append(value)
+        table[d] = v
+    return table
+
+
+# Sobol 수열 (index번째 점들), 같은 index는 항상 같은 점이므로 묶음마다 따로 계산 가능
+# shift: 차원별 디지털 시프트(XOR) 정수, 넷 성질을 유지한 채 무작위화
+def sobol_points(index, directions, shift=None):
+    gray = index ^ (index >> 1)
+    points = np.zeros((len(index), len(directions)), dtype=np.int64)
+    # 묶음 안에서 어떤 비트가 비어 있어도 더 높은 비트는 켜져 있을 수 있으므로 모든 비트를 봄
+    for bit in range(SOBOL_BITS):
+        on = ((gray >> bit) & 1).astype(bool)
+        if on.any():
+            points[on] ^= directions[:, bit]
+    if shift is not None:
+        points ^= shift
+    return points / float(1 << SOBOL_BITS)
+
+
+# 단위 점 생성기: (묶음 크기, dims) 배열을 차례로 반환
+def unit_points(method, samples, dims, chunk_size=BATCH_SIZE, seed=None, strata=None):
+    rng = np.random.default_rng(seed)
+    if method == "lhs":
+        # 차원마다 구간 순서를 섞어 두고(정수 배열만 미리 만듦), 구간 안 위치는 묶음마다 뽑음
+        order = np.stack([rng.permutation(samples) for _ in range(dims)], axis=1)
+        for start in range(0, samples, chunk_size):
+            cells = order[start:start + chunk_size]
+            yield (cells + rng.random(cells.shape)) / samples
+    elif method == "sobol":
+        directions = sobol_directions(dims)
+        shift = None if seed is None else rng.integers(0, 1 << SOBOL_BITS, dims)
+        for start in range(0, samples, chunk_size):
+            yield sobol_points(np.arange(start, min(start + chunk_size, samples), dtype=np.int64), directions, shift)
+    elif method == "stratified":
+        # 차원마다 strata개 구간, 모든 칸(strata^dims)에 samples개씩 무작위 점
+        strata = strata or 2
+        cells = strata ** dims
+        total = cells * samples
+        for start in range(0, total, chunk_size):
+            cell = np.arange(start, min(start + chunk_size, total)) // samples
+            digits = np.stack(np.unravel_index(cell, (strata,) * dims), axis=1)
+            yield (digits + rng.random(digits.shape)) / strata
+    elif method == "random":
+        for start in range(0, samples, chunk_size):
+            yield rng.random((min(chunk_size, samples - start), dims))
+    else:
+        raise ValueError(f"알 수 없는 샘플링 방법입니다: {method}")
+
+
+# 선택형 항목 조합 목록, categories: 항목 이름 목록(모든 값) 또는 {항목: 값 목록}
+# forced_type은 engine_type에 맞는 값만 남기고, 교차하지 않을 때는 base 값이 맞지 않으면 첫 번째 허용 값 사용
+def category_combos(base, categories=None):
+    if not categories:
+        return [{}]
+    if not isinstance(categories, dict):
+        categories = {key: COMBO_OPTIONS[key] for key in categories}
+    keys = list(categories)
+    combos = []
+    for values in itertools.product(*(categories[key] for key in keys)):
+        combo = dict(zip(keys, values))
+        engine_type = combo.get("engine_type", base.get("engine_type"))
+        allowed = FORCED_TYPES.get(engine_type)
+        if allowed is not None:
+            if "forced_type" in combo and combo["forced_type"] not in allowed:
+                continue
+            if "engine_type" in combo and "forced_type" not in combo and base.get("forced_type") not in allowed:
+                combo["forced_type"] = allowed[0]
+        if "use_vvl" in combo:
+            combo["vvl_enabled"] = combo["use_vvl"] == "yes"
+        if "ambient" in combo:
+            combo["ambient_condition"] = combo["ambient"]
+        combos.append(combo)
+    return combos
+
+
+# 설정 묶음 생성기: 숫자 점 하나마다 모든 선택형 조합을 붙임 (묶음 크기는 약 chunk_size)
+# samples: lhs / sobol / random은 점 개수, stratified는 칸당 점 개수
+def sample_configs(base, method="lhs", samples=1024, ranges=None, categories=None, chunk_size=BATCH_SIZE,
+                   seed=None, strata=None):
+    ranges = dict(ranges or {key: SAMPLE_RANGES[key] for key in SAMPLE_FIELDS})
+    fields = list(ranges)
+    lo = np.array([ranges[key][0] for key in fields], dtype=float)
+    hi = np.array([ranges[key][1] for key in fields], dtype=float)
+    combos = category_combos(base, categories)
+    rows = max(chunk_size // len(combos), 1)
+
+    for unit in unit_points(method, samples, len(fields), rows, seed, strata):
+        values = lo + unit * (hi - lo)
+        chunk = []
+        for row in values:
+            numbers = {key: int(round(val)) if key in INT_FIELDS else float(val) for key, val in zip(fields, row)}
+            for combo in combos:
+                chunk.append(dict(base, **combo, **numbers))
+        yield chunk
+
+
+# 묶음 크기와 상관없이 같은 점이 나오는지 확인 (Sobol은 한 번에 만든 수열과 같아야 하고, 모든 방법은 중복이 없어야 함)
+def check_chunking(samples=100000, dims=len(SAMPLE_FIELDS), chunk_sizes=(22, 1000, BATCH_SIZE)):
+    problems = []
+    whole = sobol_points(np.arange(samples, dtype=np.int64), sobol_directions(dims))
+    for size in chunk_sizes:
+        chunked = np.concatenate(list(unit_points("sobol", samples, dims, size)))
+        if not np.array_equal(chunked, whole):
+            problems.append(f"sobol: 묶음 {size}개 결과가 한 번에 만든 수열과 다릅니다 "
+                            f"({int(np.sum(np.any(chunked != whole, axis=1)))}개 점)")
+        for method in ("lhs", "random"):
+            unique = len(np.unique(np.concatenate(list(unit_points(method, samples, dims, size, seed=0))), axis=0))
+            if unique != samples:
+                problems.append(f"{method}: 묶음 {size}개에서 서로 다른 점이 {unique} / {samples}개입니다")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DOE 샘플러 점검")
+    parser.add_argument("--samples", type=int, default=100000)
+    parser.add_argument("--dims", type=int, default=len(SAMPLE_FIELDS))
+    args = parser.parse_args()
+
+    problems = check_chunking(args.samples, args.dims)
+    for problem in problems:
+        print(f"  - {problem}")
+    print("문제 없음" if not problems else f"{len(problems)}개 문제")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import numpy as np
+
+from EngineModel import boost_factor
+
+# 냉각수 / 흡기 온도 시간 적분 모델
+# 출력의 일부가 냉각수로 들어오고 라디에이터가 속도에 비례해 열을 내보냄
+# 냉각수가 과열되면 ECU가 출력을 줄이고, 흡기 온도가 오르면 공기 밀도만큼 출력이 줄어듦
+THERMOSTAT_OPEN = 88.0      # °C, 이 온도부터 라디에이터 유량 증가
+THERMOSTAT_FULL = 98.0      # °C
+DERATE_START = 110.0        # °C, 냉각수 보호 출력 제한 시작
+DERATE_FULL = 125.0         # °C, 이 온도에서 출력 50%
+DERATE_MIN = 0.5
+COOLANT_HEAT_SHARE = 0.9    # 제동 출력 대비 냉각수로 가는 열
+DESIGN_LOAD = 0.7           # 라디에이터 설계 기준: 설계 속도에서 이 부하를 계속 내도 105°C 유지
+DESIGN_SPEED = 100.0        # km/h
+DESIGN_COOLANT = 105.0
+FAN_SPEED = 30.0            # km/h, 정차/저속에서도 팬이 만드는 풍속
+INTERCOOLER_EFFECTIVENESS = 0.75
+IAT_TIME_CONSTANT = 40.0    # s
+UNDERHOOD_SOAK = 0.15       # 냉각수-외기 온도차 중 흡기로 전해지는 비율
+
+
+# 시간 적분 (배치 전체를 한 번에, 고정 시간 간격)
+# max_hp, displacement, engine_type, forced_type, boost: (N,) 엔진 정보 (simulate_batch 결과와 설정)
+# load: 최고 출력 대비 요구 출력 비율, speed: 차속(km/h) — 스칼라, (T,), (N, T) 모두 가능
+def simulate_thermal(max_hp, displacement, engine_type, forced_type, boost, load, speed, duration=600.0,
+                     dt=0.5, ambient_temp=25.0, record_every=1):
+    max_hp = np.atleast_1d(np.asarray(max_hp, dtype=float))
+    n = len(max_hp)
+    steps = int(round(duration / dt))
+    displacement = np.broadcast_to(np.asarray(displacement, dtype=float), (n,))
+    boost = np.broadcast_to(np.asarray(boost, dtype=float), (n,))
+    boosted = np.broadcast_to(boost_factor(engine_type, forced_type), (n,)) > 0
+
+    def profile(val):
+        arr = np.asarray(val, dtype=float)
+        if arr.ndim == 0:
+            return np.full((n, steps), float(arr))
+        return np.broadcast_to(arr[..., :steps], (n, steps))
+
+    load = profile(load)
+    speed = profile(speed)
+
+    rated_w = max_hp * 745.7
+    heat_capacity = 60000.0 + 25000.0 * displacement  # J/K (냉각수 + 엔진 블록)
+    radiator_ua = DESIGN_LOAD * rated_w * COOLANT_HEAT_SHARE / ((DESIGN_COOLANT - ambient_temp) * (DESIGN_SPEED + FAN_SPEED))
+
+    # 과급 시 압축 온도 상승 (단열 압축, 효율 0.7)
+    pressure_ratio = 1 + np.where(boosted, boost, 0.0) / 1.013
+    compressor_rise = (ambient_temp + 273.15) * (pressure_ratio ** 0.286 - 1) / 0.7
+
+    coolant = np.full(n, ambient_temp + 60.0)  # 웜업된 상태에서 시작
+    iat = np.full(n, ambient_temp)
+    records = max(steps // record_every, 1)
+    history = {key: np.empty((n, records)) for key in ("coolant", "iat", "derate", "power")}
+    first_derate = np.full(n, np.nan)
+
+    for step in range(steps):
+        # 출력 제한 (냉각수 보호 × 흡기 밀도)
+        protect = 1 - (1 - DERATE_MIN) * np.clip((coolant - DERATE_START) / (DERATE_FULL - DERATE_START), 0.0, 1.0)
+        density = (ambient_temp + 273.15) / (iat + 273.15)
+        derate = protect * density
+        power = load[:, step] * derate * rated_w
+
+        # 냉각수
+        opening = np.clip((coolant - THERMOSTAT_OPEN) / (THERMOSTAT_FULL - THERMOSTAT_OPEN), 0.05, 1.0)
+        rejected = radiator_ua * (speed[:, step] + FAN_SPEED) * opening * (coolant - ambient_temp)
+        coolant = coolant + (power * COOLANT_HEAT_SHARE - rejected) / heat_capacity * dt
+
+        # 흡기 온도 (인터쿨러를 거친 압축 열 + 엔진룸 열, 1차 지연)
+        target = (ambient_temp + compressor_rise * load[:, step] * (1 - INTERCOOLER_EFFECTIVENESS)
+                  + UNDERHOOD_SOAK * (coolant - ambient_temp) * FAN_SPEED / (speed[:, step] + FAN_SPEED))
+        iat = iat + (target - iat) * dt / IAT_TIME_CONSTANT
+
+        started = np.isnan(first_derate) & (protect < 0.99)
+        first_derate[started] = step * dt
+        if step % record_every == 0 and step // record_every < records:
+            i = step // record_every
+            history["coolant"][:, i] = coolant
+            history["iat"][:, i] = iat
+            history["derate"][:, i] = derate
+            history["power"][:, i] = power / 745.7
+
+    history["time"] = np.arange(records) * dt * record_every
+    history["max_coolant"] = history["coolant"].max(axis=1)
+    history["max_iat"] = history["iat"].max(axis=1)
+    history["mean_power_ratio"] = history["power"].mean(axis=1) / np.maximum(max_hp, 1e-9)
+    history["derate_time"] = first_derate
+    return history
+
+
+# 서킷 주행 형태의 부하 (직선 전부하 / 코너 부분 부하 반복)
+def lap_profile(duration=600.0, dt=0.5, straight=12.0, corner=8.0, corner_load=0.35):
+    t = np.arange(int(round(duration / dt))) * dt
+    phase = t % (straight + corner)
+    load = np.where(phase < straight, 1.0, corner_load)
+    speed = np.where(phase < straight, 60.0 + 140.0 * phase / straight, 90.0)
+    return load, speed
+
+
+# 온도 / 출력 시간 그래프 (row: 표시할 엔진 번호)
+def plot_thermal(ax_temp, ax_power, history, row=0):
+    time = history["time"] / 60
+    ax_temp.plot(time, history["coolant"][row], label="Coolant", color="tab:red")
+    ax_temp.plot(time, history["iat"][row], label="Intake air", color="tab:blue")
+    ax_temp.axhline(DERATE_START, color="gray", linestyle="--", linewidth=0.8)
+    ax_temp.set_ylabel("Temperature (°C)")
+    ax_temp.legend(loc="upper left")
+    ax_temp.grid(True)
+
+    ax_power.plot(time, history["power"][row], color="tab:green", linewidth=0.8, label="Power")
+    ax_power.plot(time, history["derate"][row] * history["power"][row].max(), color="black", linewidth=0.8,
+                  linestyle=":", label="Available")
+    ax_power.set_xlabel("Time (min)")
+    ax_power.set_ylabel("Power (HP)")
+    ax_power.legend(loc="lower left")
+    ax_power.grid(True)
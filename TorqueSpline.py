@@ -0,0 +1,73 @@
+import numpy as np
+
+# 제어점 기반 토크 곡선 (단조 보존 3차 스플라인, Fritsch-Carlson)
+# 제어점 사이에서 값이 튀어 오르지 않으므로 터보 엔진의 평평한 토크 구간도 그대로 표현됨
+# 계수는 설정마다 한 번 계산해 두고, 평가 시에는 구간 찾기 + 다항식 계산만 함
+
+
+# 구간별 3차 다항식 계수
+# tables: (N, K, 2) nan 채움 제어점 표 → knots (N, K), coeffs (N, max(K-1, 1), 4), count (N,)
+# 구간 k: y = c0 + c1 t + c2 t^2 + c3 t^3, t = x - knots[k]
+def spline_coefficients(tables):
+    tables = np.asarray(tables, dtype=float)
+    n, k = tables.shape[:2]
+    knots = tables[:, :, 0]
+    values = tables[:, :, 1]
+    count = np.sum(~np.isnan(knots), axis=1)
+    rows = np.arange(n)
+    coeffs = np.zeros((n, max(k - 1, 1), 4))
+    if k == 0:
+        return knots, coeffs, count
+    coeffs[:, 0, 0] = np.where(count > 0, values[:, 0], 0.0)
+    if k == 1:
+        return knots, coeffs, count
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        h = np.diff(knots, axis=1)
+        delta = np.diff(values, axis=1) / h
+
+        # 내부 기울기: 양쪽 기울기의 가중 조화평균, 부호가 다르거나 0이면 0 (극값 유지)
+        slopes = np.zeros((n, k))
+        if k > 2:
+            w1 = 2 * h[:, 1:] + h[:, :-1]
+            w2 = h[:, 1:] + 2 * h[:, :-1]
+            same = delta[:, :-1] * delta[:, 1:] > 0
+            slopes[:, 1:-1] = np.where(same, (w1 + w2) / (w1 / delta[:, :-1] + w2 / delta[:, 1:]), 0.0)
+        # 양 끝: 한쪽 기울기
+        last = np.maximum(count - 1, 1)
+        slopes[:, 0] = delta[:, 0]
+        slopes[rows, last] = delta[rows, last - 1]
+
+        m0 = slopes[:, :-1]
+        m1 = slopes[:, 1:]
+        coeffs[:, :, 0] = values[:, :-1]
+        coeffs[:, :, 1] = m0
+        coeffs[:, :, 2] = (3 * delta - 2 * m0 - m1) / h
+        coeffs[:, :, 3] = (m0 + m1 - 2 * delta) / h ** 2
+
+    # 제어점이 하나뿐인 행은 상수, 패딩 구간은 사용하지 않음
+    single = count == 1
+    coeffs[single] = 0.0
+    coeffs[single, 0, 0] = values[single, 0]
+    return knots, np.nan_to_num(coeffs), count
+
+
+# 행마다 다른 스플라인을 한 번에 평가 (x: (N, P), 제어점 범위 밖은 양 끝 값 유지)
+def evaluate_spline(knots, coeffs, count, x):
+    n, segments = coeffs.shape[:2]
+    last = np.maximum(count - 1, 0)
+    x = np.clip(x, knots[:, :1], knots[np.arange(n), last][:, None])
+
+    # 구간 번호 = 지나친 내부 제어점 수 (패딩 nan과의 비교는 항상 False)
+    # (N, P, K) 비교나 take_along_axis 대신 1차원 take로 계수를 읽음
+    idx = np.zeros(x.shape, dtype=np.int64)
+    for j in range(1, segments):
+        idx += x > knots[:, j:j + 1]
+    flat = idx + (np.arange(n) * segments)[:, None]
+
+    t = x - knots[:, :segments].ravel().take(flat)
+    y = coeffs[:, :, 3].ravel().take(flat)
+    for j in (2, 1, 0):
+        y *= t
+        y += coeffs[:, :, j].ravel().take(flat)
+    return y
@@ -1,11 +1,14 @@
-import requests
 import sys
+import hashlib
 import subprocess
 import os
 import json
 import tkinter as tk
 from tkinter import messagebox
 
+import VersionCheck
+import DeltaPatch
+
 # 파일 경로 설정
 if getattr(sys, 'frozen', False):
     BASE_DIR = os.path.dirname(sys.executable)
@@ -15,7 +18,7 @@ CURR_VER_FILE = os.path.join(BASE_DIR, "curr_ver.json")
 TARGET_PROGRAM = "EngineSim.exe"
 
 # 최신 버전 정보 URL (예: GitHub raw 링크)
-UPDATE_INFO_URL = "https://raw.githubusercontent.com/GreenRiceCake/PyEngineSimulator/main/version.json"
+UPDATE_INFO_URL = VersionCheck.UPDATE_INFO_URL
 
 # 1. 현재 버전 로드
 def load_current_version():
@@ -27,10 +30,9 @@ def load_current_version():
         return "0.0"
 
 # 2. 최신 버전 정보 가져오기
+# 앱이 방금 확인했다면 디스크 캐시를 그대로 사용
 def get_update_info():
-    response = requests.get(UPDATE_INFO_URL)
-    response.raise_for_status()
-    return response.json()
+    return VersionCheck.get_update_info(UPDATE_INFO_URL)
 
 # 3. 대상 프로그램 강제 종료
 def kill_program(process_name):
@@ -40,27 +42,62 @@ def kill_program(process_name):
         pass  # 이미 종료됐거나 실행 중이 아니면 무시
 
 # 4. 업데이트 실행
-def update_program(download_url, new_version):
+# version.json 예시:
+#   "sha256": "<새 exe의 sha256>",
+#   "patches": {"2.4": {"url": "<2.4 → 새 버전 패치 URL>", "sha256": "<패치 결과 sha256>"}}
+# 현재 버전용 패치가 있으면 패치를 받아 적용하고, 실패하거나 해시가 다르면 전체 파일을 받음
+def download_program(download_url, target_path, expected_sha256=None):
+    response = VersionCheck.get_session().get(download_url, timeout=VersionCheck.TIMEOUT, stream=True)
+    response.raise_for_status()
+
+    digest = hashlib.sha256()
+    tmp_path = target_path + ".part"
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in response.iter_content(64 * 1024):
+                digest.update(chunk)
+                f.write(chunk)
+        if expected_sha256 and digest.hexdigest() != expected_sha256.lower():
+            raise DeltaPatch.PatchError("다운로드한 파일의 해시가 일치하지 않습니다.")
+        os.replace(tmp_path, target_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def apply_update_patch(patch, target_path):
+    response = VersionCheck.get_session().get(patch["url"], timeout=VersionCheck.TIMEOUT, stream=True)
+    response.raise_for_status()
+    DeltaPatch.apply_patch(target_path, response.iter_content(64 * 1024), target_path, patch["sha256"])
+
+
+def update_program(download_url, new_version, patch=None, expected_sha256=None):
+    note = ""  # 패치 실패 사유 (전체 다운로드로 대신했을 때 완료/실패 메시지에 함께 표시)
     try:
         kill_program(TARGET_PROGRAM)
+        target_path = os.path.join(BASE_DIR, TARGET_PROGRAM)
 
-        # 파일 다운로드
-        response = requests.get(download_url)
-        response.raise_for_status()
+        patched = False
+        if patch and patch.get("sha256") and os.path.exists(target_path):
+            try:
+                apply_update_patch(patch, target_path)
+                patched = True
+            except Exception as e:
+                note = f"\n\n(패치 적용 실패로 전체 파일 다운로드 사용: {e})"
 
-        # exe 덮어쓰기
-        with open(os.path.join(BASE_DIR, TARGET_PROGRAM), "wb") as f:
-            f.write(response.content)
+        # 파일 다운로드 후 exe 덮어쓰기
+        if not patched:
+            download_program(download_url, target_path, expected_sha256)
 
         # 버전 정보 업데이트
         with open(CURR_VER_FILE, "w", encoding="utf-8") as f:
             json.dump({"version": new_version}, f, indent=4)
 
-        messagebox.showinfo("업데이트 완료", f"v{new_version}로 업데이트되었습니다. 다시 실행해주세요.")
+        messagebox.showinfo("업데이트 완료", f"v{new_version}로 업데이트되었습니다. 다시 실행해주세요.{note}")
         sys.exit()
 
     except Exception as e:
-        messagebox.showerror("업데이트 실패", f"업데이트 중 오류가 발생했습니다:\n{e}")
+        messagebox.showerror("업데이트 실패", f"업데이트 중 오류가 발생했습니다:\n{e}{note}")
 
 # 5. 메인 로직 (GUI)
 def main():
@@ -69,6 +106,8 @@ def main():
     latest_version = data["version"]
     changelog = data.get("changelog", "")
     download_url = data["download_url"]
+    patch = data.get("patches", {}).get(current_version)
+    expected_sha256 = data.get("sha256")
 
     if latest_version > current_version:
         root = tk.Tk()
@@ -89,7 +128,7 @@ def main():
         frame = tk.Frame(root)
         frame.pack(pady=10)
 
-        update_button = tk.Button(frame, text="Update", command=lambda: update_program(download_url, latest_version))
+        update_button = tk.Button(frame, text="Update", command=lambda: update_program(download_url, latest_version, patch, expected_sha256))
         update_button.grid(row=0, column=0, padx=10)
 
         ignore_button = tk.Button(frame, text="Ignore", command=root.destroy)
@@ -0,0 +1,172 @@
+import numpy as np
+
+from EngineModel import RPM_MIN
+
+# 차량 기본값 (소형 후륜 스포츠카 기준)
+DEFAULT_VEHICLE = {
+    "mass": 1300.0,              # kg (운전자 포함)
+    "gear_ratios": [3.63, 2.19, 1.54, 1.21, 1.00, 0.81],
+    "final_drive": 4.1,
+    "tire_radius": 0.31,         # m
+    "drag_coefficient": 0.32,
+    "frontal_area": 2.1,         # m^2
+    "rolling_resistance": 0.012,
+    "drivetrain_efficiency": 0.88,
+    "tire_grip": 1.0,            # 노면 마찰계수
+    "drive_weight": 0.55,        # 구동륜 하중 비율
+    "shift_time": 0.25,          # s, 변속 중에는 구동력 없음
+    "launch_rpm": 3000.0,
+}
+AIR_DENSITY = 1.204
+GRAVITY = 9.81
+INERTIA_FACTOR = 1.05  # 회전 관성 보정
+
+SPEED_100 = 100 / 3.6
+QUARTER_MILE = 402.336
+
+
+# 균등 간격 RPM 격자 위의 곡선을 행별로 선형 보간 (simulate_batch의 rpm은 행마다 linspace)
+def interp_curve(rpm_grid, curve, rpm):
+    lo = rpm_grid[:, :1]
+    hi = rpm_grid[:, -1:]
+    points = curve.shape[-1]
+    pos = np.clip((rpm - lo) / (hi - lo) * (points - 1), 0, points - 1)
+    idx = np.minimum(pos.astype(np.int64), points - 2)
+    frac = pos - idx
+    left = np.take_along_axis(curve, idx, axis=-1)
+    right = np.take_along_axis(curve, idx + 1, axis=-1)
+    return left + (right - left) * frac
+
+
+# 기어비 목록들을 (배치, 최대 단수) 배열로 정리 (빈 칸은 nan)
+def gear_table(gear_sets):
+    count = max(len(gears) for gears in gear_sets)
+    table = np.full((len(gear_sets), count), np.nan)
+    for i, gears in enumerate(gear_sets):
+        table[i, :len(gears)] = gears
+    return table
+
+
+# 가속 시뮬레이션: 0-100km/h 시간, 400m(1/4마일) 시간과 통과 속도
+# rpm_grid, torque: (배치, 지점) 엔진 곡선, shift_rpm: (배치,) 없으면 레드라인, gears: (배치, 단수)
+def simulate_acceleration(rpm_grid, torque, shift_rpm=None, gears=None, vehicle=DEFAULT_VEHICLE, dt=0.01, max_time=60.0):
+    rpm_grid = np.atleast_2d(rpm_grid)
+    torque = np.atleast_2d(torque)
+    if shift_rpm is None:
+        shift_rpm = rpm_grid[:, -1]
+    if gears is None:
+        gears = gear_table([vehicle["gear_ratios"]])
+    n = max(len(rpm_grid), np.size(shift_rpm), len(gears))
+    rpm_grid = np.broadcast_to(rpm_grid, (n, rpm_grid.shape[-1]))
+    torque = np.broadcast_to(torque, (n, torque.shape[-1]))
+    shift_rpm = np.broadcast_to(np.asarray(shift_rpm, dtype=float), (n,))
+    gears = np.broadcast_to(np.atleast_2d(gears), (n, np.shape(np.atleast_2d(gears))[-1]))
+    last_gear = np.sum(~np.isnan(gears), axis=1) - 1
+    redline = rpm_grid[:, -1]
+
+    mass = vehicle["mass"]
+    radius = vehicle["tire_radius"]
+    drive_ratio = vehicle["final_drive"] / radius
+    max_traction = vehicle["tire_grip"] * mass * GRAVITY * vehicle["drive_weight"]
+    rolling = vehicle["rolling_resistance"] * mass * GRAVITY
+    drag = 0.5 * AIR_DENSITY * vehicle["drag_coefficient"] * vehicle["frontal_area"]
+    rpm_per_speed = drive_ratio * 60 / (2 * np.pi)
+
+    rows = np.arange(n)
+    speed = np.zeros(n)
+    distance = np.zeros(n)
+    gear = np.zeros(n, dtype=np.int64)
+    shift_timer = np.zeros(n)
+    time_100 = np.full(n, np.nan)
+    time_quarter = np.full(n, np.nan)
+    trap_speed = np.full(n, np.nan)
+
+    t = 0.0
+    while t < max_time:
+        ratio = gears[rows, gear]
+        engine_rpm = speed * ratio * rpm_per_speed
+        # 변속 시점 도달 시 다음 단으로
+        up = (engine_rpm >= shift_rpm) & (gear < last_gear) & (shift_timer <= 0)
+        gear = gear + up
+        shift_timer = np.where(up, vehicle["shift_time"], shift_timer - dt)
+        ratio = gears[rows, gear]
+        engine_rpm = np.maximum(speed * ratio * rpm_per_speed, np.where(gear == 0, vehicle["launch_rpm"], RPM_MIN))
+
+        engine_torque = interp_curve(rpm_grid, torque, engine_rpm[:, None])[:, 0]
+        engine_torque = np.where((engine_rpm > redline) | (shift_timer > 0), 0.0, engine_torque)
+        drive_force = np.minimum(engine_torque * ratio * drive_ratio * vehicle["drivetrain_efficiency"], max_traction)
+        accel = (drive_force - rolling - drag * speed ** 2) / (mass * INERTIA_FACTOR)
+
+        speed = np.maximum(speed + accel * dt, 0.0)
+        distance = distance + speed * dt
+        t += dt
+
+        hit_100 = np.isnan(time_100) & (speed >= SPEED_100)
+        time_100[hit_100] = t
+        hit_quarter = np.isnan(time_quarter) & (distance >= QUARTER_MILE)
+        time_quarter[hit_quarter] = t
+        trap_speed[hit_quarter] = speed[hit_quarter] * 3.6
+        if not np.isnan(time_quarter).any() and not np.isnan(time_100).any():
+            break
+
+    return {"time_100": time_100, "time_quarter": time_quarter, "trap_speed": trap_speed}
+
+
+# 여러 엔진의 변속 RPM × 기어 세트 조합을 한꺼번에 계산해 엔진별로 가장 빠른 조합을 찾음 (스윕용)
+# rpm_grid, torque: (엔진 수, 지점), shift_rpms: 공통 (후보 수,) 또는 엔진별 (엔진 수, 후보 수)
+# 엔진 × 후보 행을 chunk_rows개 정도씩 묶어 simulate_acceleration 한 번으로 계산
+SHIFT_CHUNK_ROWS = 16384
+
+
+def optimize_shifts_batch(rpm_grid, torque, shift_rpms, gear_sets=None, vehicle=DEFAULT_VEHICLE, target="time_100",
+                          chunk_rows=SHIFT_CHUNK_ROWS):
+    if gear_sets is None:
+        gear_sets = [vehicle["gear_ratios"]]
+    table = gear_table(gear_sets)
+    rpm_grid = np.atleast_2d(rpm_grid)
+    torque = np.atleast_2d(torque)
+    shift_rpms = np.atleast_2d(np.asarray(shift_rpms, dtype=float))
+    engines = max(len(rpm_grid), len(torque), len(shift_rpms))
+    rpm_grid = np.broadcast_to(rpm_grid, (engines, rpm_grid.shape[-1]))
+    torque = np.broadcast_to(torque, (engines, torque.shape[-1]))
+    shift_rpms = np.broadcast_to(shift_rpms, (engines, shift_rpms.shape[-1]))
+
+    # 후보 k: 변속 RPM k // 기어 세트 수, 기어 세트 k % 기어 세트 수
+    shift = np.repeat(shift_rpms, len(gear_sets), axis=1)
+    gear_index = np.tile(np.arange(len(gear_sets)), shift_rpms.shape[1])
+    candidates = len(gear_index)
+    results = {}
+    step = max(chunk_rows // candidates, 1)
+    for start in range(0, engines, step):
+        stop = min(start + step, engines)
+        count = stop - start
+        result = simulate_acceleration(np.repeat(rpm_grid[start:stop], candidates, axis=0),
+                                       np.repeat(torque[start:stop], candidates, axis=0),
+                                       shift[start:stop].ravel(), np.tile(table[gear_index], (count, 1)), vehicle)
+        for key, val in result.items():
+            results.setdefault(key, np.empty((engines, candidates)))[start:stop] = val.reshape(count, candidates)
+
+    score = np.where(np.isnan(results[target]), np.inf, results[target])
+    best = np.argmin(score, axis=1)
+    rows = np.arange(engines)
+    return {
+        "shift_rpm": shift[rows, best],
+        "gear_index": gear_index[best],
+        "best": {key: val[rows, best] for key, val in results.items()},
+        "shift_rpms": shift,
+        "results": results,
+    }
+
+
+# 엔진 하나의 변속 RPM × 기어 세트 조합 중 가장 빠른 조합
+def optimize_shifts(rpm_grid, torque, shift_rpms, gear_sets=None, vehicle=DEFAULT_VEHICLE, target="time_100"):
+    if gear_sets is None:
+        gear_sets = [vehicle["gear_ratios"]]
+    batch = optimize_shifts_batch(rpm_grid, torque, shift_rpms, gear_sets, vehicle, target)
+    return {
+        "shift_rpm": batch["shift_rpm"][0],
+        "gear_ratios": gear_sets[batch["gear_index"][0]],
+        "best": {key: val[0] for key, val in batch["best"].items()},
+        "shift_rpms": batch["shift_rpms"][0],
+        "results": {key: val[0] for key, val in batch["results"].items()},
+    }
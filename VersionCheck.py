@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 앱(EngineSim)과 Updater가 함께 쓰는 버전 정보 조회 모듈
+# 연결을 재사용하는 세션 하나와 version.json 디스크 캐시(ETag / Last-Modified 재검증)를 사용함
+if getattr(sys, 'frozen', False):
+    BASE_DIR = os.path.dirname(sys.executable)
+else:
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILE = os.path.join(BASE_DIR, "version_cache.json")
+
+UPDATE_INFO_URL = "https://raw.githubusercontent.com/GreenRiceCake/PyEngineSimulator/main/version.json"
+TIMEOUT = (3.05, 10)  # (연결, 읽기) 초
+MAX_AGE = 300  # 이 시간(초) 안에 받은 정보는 서버에 다시 묻지 않음 (앱 → Updater 연속 실행)
+
+_session = None
+
+
+# 1. 공용 세션
+def get_session():
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=1)
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+    return _session
+
+
+# 2. 캐시 읽기 / 쓰기
+def load_cache(cache_path=CACHE_FILE):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cache(entry, cache_path=CACHE_FILE):
+    # 다른 프로세스가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # 캐시를 못 써도 조회 결과는 그대로 사용
+
+
+# 3. 최신 버전 정보 가져오기 (캐시가 신선하면 네트워크 요청 없음, 아니면 조건부 GET)
+def get_update_info(url=UPDATE_INFO_URL, cache_path=CACHE_FILE, max_age=MAX_AGE, session=None):
+    session = session or get_session()
+    cache = load_cache(cache_path)
+    if cache is not None and cache.get("url") != url:
+        cache = None
+
+    if cache is not None and time.time() - cache.get("fetched_at", 0) < max_age:
+        return cache["data"]
+
+    headers = {}
+    if cache is not None:
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+    response = session.get(url, headers=headers, timeout=TIMEOUT)
+    if response.status_code == 304 and cache is not None:
+        cache["fetched_at"] = time.time()
+        save_cache(cache, cache_path)
+        return cache["data"]
+
+    response.raise_for_status()
+    data = response.json()
+    save_cache({
+        "url": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "fetched_at": time.time(),
+        "data": data,
+    }, cache_path)
+    return data
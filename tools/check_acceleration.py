@@ -0,0 +1,57 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import Vehicle
+
+# 가속 시뮬레이션 / 변속 최적화 확인 (python tools/check_acceleration.py)
+# 1/4마일 통과 속도가 100km/h 미만인 느린 차도 0-100km/h 시간이 나와야 하고, 기어 세트를 배열로 넘겨도 동작해야 함
+
+# 70Nm 평탄 토크 + 1800kg 차량: 400m 통과 속도가 약 87km/h
+SLOW_RPM = np.linspace(1000.0, 6000.0, 50)
+SLOW_TORQUE = np.full(50, 70.0)
+SLOW_VEHICLE = dict(Vehicle.DEFAULT_VEHICLE, mass=1800.0)
+
+
+def check_slow_car():
+    problems = []
+    result = Vehicle.simulate_acceleration(SLOW_RPM, SLOW_TORQUE, vehicle=SLOW_VEHICLE)
+    if not result["trap_speed"][0] < 100:
+        problems.append(f"느린 차 조건이 아닙니다 (통과 속도 {result['trap_speed'][0]:.1f} km/h)")
+    if not np.isfinite(result["time_100"][0]):
+        problems.append("1/4마일 통과 후 0-100km/h 시간이 nan입니다")
+    elif not result["time_100"][0] > result["time_quarter"][0]:
+        problems.append(f"0-100km/h 시간이 1/4마일 시간보다 짧습니다 ({result['time_100'][0]:.2f} s)")
+
+    shift_rpms = np.linspace(4000.0, 6000.0, 5)
+    batch = Vehicle.optimize_shifts_batch(SLOW_RPM, SLOW_TORQUE, shift_rpms, vehicle=SLOW_VEHICLE)
+    if not np.isfinite(batch["results"]["time_100"]).all():
+        problems.append("변속 RPM 후보 중 0-100km/h 시간이 nan인 경우가 있습니다")
+    expected = shift_rpms[np.argmin(batch["results"]["time_100"][0])]
+    if batch["shift_rpm"][0] != expected:
+        problems.append(f"가장 빠른 변속 RPM을 고르지 않았습니다 ({batch['shift_rpm'][0]} != {expected})")
+    return problems
+
+
+def check_gear_array():
+    problems = []
+    gear_sets = np.array([Vehicle.DEFAULT_VEHICLE["gear_ratios"], [3.2, 2.0, 1.45, 1.15, 0.95, 0.78]])
+    try:
+        run = Vehicle.optimize_shifts(SLOW_RPM, SLOW_TORQUE, [5000.0, 6000.0], gear_sets, SLOW_VEHICLE)
+    except ValueError as e:
+        return [f"기어 세트 배열을 처리하지 못했습니다: {e}"]
+    if len(run["results"]["time_100"]) != 4:
+        problems.append(f"후보 수가 맞지 않습니다 ({len(run['results']['time_100'])} != 4)")
+    if not any(np.array_equal(run["gear_ratios"], gears) for gears in gear_sets):
+        problems.append(f"고른 기어비가 후보에 없습니다 ({run['gear_ratios']!r})")
+    return problems
+
+
+if __name__ == "__main__":
+    problems = check_slow_car() + check_gear_array()
+    for problem in problems:
+        print(f"  - {problem}")
+    print("문제 없음" if not problems else f"{len(problems)}개 문제")
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import VersionCheck
+
+# VersionCheck 재검증 흐름 확인 (python tools/check_version_cache.py)
+# 로컬 HTTP 대역 서버가 version.json을 ETag / Last-Modified와 함께 내려주고, 조건부 요청이 맞으면 304로 응답함
+# 200 저장 → 신선한 캐시는 요청 없음 → 만료 후 조건부 요청 + 304 → 내용이 바뀌면 200
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        body = json.dumps(server.version_data).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag or (
+                "If-None-Match" not in self.headers and self.headers.get("If-Modified-Since") == server.last_modified):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", server.last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def check_revalidation():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+    server.requests = []
+    server.version_data = {"version": "2.4", "url": "EngineSim.exe"}
+    server.last_modified = "Mon, 19 Oct 2026 00:00:00 GMT"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/version.json"
+    problems = []
+    try:
+        with tempfile.TemporaryDirectory() as folder:
+            cache_path = os.path.join(folder, "version_cache.json")
+            session = requests.Session()
+
+            # 처음: 200, 캐시 저장
+            data = VersionCheck.get_update_info(url, cache_path, session=session)
+            if data != server.version_data or len(server.requests) != 1:
+                problems.append(f"첫 조회가 200 응답을 저장하지 않았습니다 ({data!r}, 요청 {len(server.requests)}회)")
+            # MAX_AGE 안: 요청 없이 캐시 사용
+            VersionCheck.get_update_info(url, cache_path, session=session)
+            if len(server.requests) != 1:
+                problems.append("신선한 캐시가 있는데 서버에 다시 요청했습니다")
+            # 만료 후 같은 내용: 조건부 요청 → 304 → 캐시 값
+            data = VersionCheck.get_update_info(url, cache_path, max_age=0, session=session)
+            last = server.requests[-1] if len(server.requests) == 2 else {}
+            if "If-None-Match" not in last or "If-Modified-Since" not in last:
+                problems.append(f"만료된 캐시로 조건부 요청을 보내지 않았습니다 ({last!r})")
+            if data != server.version_data:
+                problems.append(f"304 응답 뒤 캐시 값을 돌려주지 않았습니다 ({data!r})")
+            # 내용이 바뀌면 200으로 새 값
+            server.version_data = {"version": "2.5", "url": "EngineSim.exe"}
+            data = VersionCheck.get_update_info(url, cache_path, max_age=0, session=session)
+            if data != server.version_data or VersionCheck.load_cache(cache_path)["data"] != server.version_data:
+                problems.append(f"바뀐 내용을 받지 못했습니다 ({data!r})")
+            session.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    return problems
+
+
+if __name__ == "__main__":
+    try:
+        problems = check_revalidation()
+    except (requests.RequestException, ValueError, KeyError) as e:
+        problems = [f"조회 중 오류가 발생했습니다: {e!r}"]
+    for problem in problems:
+        print(f"  - {problem}")
+    print("문제 없음" if not problems else f"{len(problems)}개 문제")
+    sys.exit(1 if problems else 0)